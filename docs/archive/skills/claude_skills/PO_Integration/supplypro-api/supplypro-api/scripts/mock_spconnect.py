@@ -0,0 +1,182 @@
+"""
+Mock SPConnect Server
+Local stand-in for the SupplyPro OAuth and inbound endpoints, for testing
+supplypro_client.py without credentials.
+
+Counts token requests, API calls and TCP connections so connection reuse
+and single-flight token refresh can be checked.
+
+Usage:
+    python mock_spconnect.py            # run the client checks against it
+    python mock_spconnect.py --serve    # just run the server on port 8766
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class MockState:
+    def __init__(self, expires_in: int = 3600, latency: float = 0.02):
+        self.expires_in = expires_in
+        self.latency = latency
+        self.tokens = set()
+        self.token_requests = 0
+        self.api_calls = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def issue_token(self) -> str:
+        with self.lock:
+            self.token_requests += 1
+            token = f"mock-token-{self.token_requests}"
+            self.tokens.add(token)
+            return token
+
+    def revoke_all(self):
+        """Simulate server-side token expiry"""
+        with self.lock:
+            self.tokens.clear()
+
+
+def make_handler(state: MockState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, so clients can reuse connections
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            time.sleep(state.latency)
+
+            if self.path == "/tokens":
+                form = parse_qs(body.decode())
+                if form.get("grant_type") != ["client_credentials"]:
+                    return self._json(400, {"error": "unsupported_grant_type"})
+                return self._json(200, {
+                    "access_token": state.issue_token(),
+                    "token_type": "Bearer",
+                    "expires_in": state.expires_in,
+                })
+
+            if self.path not in ("/inbound/v1/orderResponse", "/inbound/v1/advanceShipmentNotice"):
+                return self._json(404, {"error": "not found"})
+
+            token = (self.headers.get("Authorization") or "")[len("Bearer "):]
+            if token not in state.tokens:
+                return self._json(401, {"error": "invalid_token"})
+
+            with state.lock:
+                state.api_calls += 1
+            header = json.loads(body or b"{}").get("header", {})
+            return self._json(200, {"status": "Success", "orderId": header.get("orderId")})
+
+    return Handler
+
+
+def start_mock_server(state: MockState, port: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _order_requests(count: int) -> list:
+    return [
+        {
+            "builder_id": "builder-guid",
+            "builder_account_number": "12345",
+            "order_id": 1000 + i,
+            "response_type": "Accepted",
+        }
+        for i in range(count)
+    ]
+
+
+def run_checks(count: int = 50) -> bool:
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from supplypro_client import SupplyProClient, AsyncSupplyProClient, httpx
+
+    state = MockState()
+    server = start_mock_server(state)
+    base = f"http://127.0.0.1:{server.server_port}"
+    settings = dict(oauth_uri=f"{base}/tokens", client_id="id", client_secret="secret", base_uri=base, pool_size=4)
+    ok = True
+
+    def report(name: str, passed: bool, detail: str):
+        nonlocal ok
+        ok = ok and passed
+        print(f"{'ok    ' if passed else 'FAILED'} {name}: {detail}")
+
+    with SupplyProClient(**settings) as client:
+        started = time.perf_counter()
+        results = client.send_order_responses(_order_requests(count), max_workers=4, rate_per_second=0)
+        elapsed = time.perf_counter() - started
+        report(
+            "sync batch",
+            all(r["ok"] for r in results) and state.token_requests == 1 and state.connections <= 5,
+            f"{count} responses in {elapsed:.2f}s, {state.token_requests} token request(s), {state.connections} connection(s)",
+        )
+
+        state.revoke_all()
+        client.send_order_responses(_order_requests(8), max_workers=4, rate_per_second=0)
+        report("sync 401 refresh", state.token_requests == 2, f"{state.token_requests} token requests after revoke")
+
+        started = time.perf_counter()
+        client.send_order_responses(_order_requests(6), max_workers=4, rate_per_second=20)
+        elapsed = time.perf_counter() - started
+        report("rate limit", elapsed >= 5 / 20, f"6 responses at 20/s took {elapsed:.2f}s")
+
+    if httpx is None:
+        print("skip   async: httpx not installed")
+    else:
+        async def async_checks():
+            state.token_requests = state.connections = 0
+            state.revoke_all()
+            async with AsyncSupplyProClient(**settings) as client:
+                started = time.perf_counter()
+                results = await client.send_order_responses(_order_requests(count), concurrency=8, rate_per_second=0)
+                elapsed = time.perf_counter() - started
+                report(
+                    "async batch",
+                    all(r["ok"] for r in results) and state.token_requests == 1 and state.connections <= 5,
+                    f"{count} responses in {elapsed:.2f}s, {state.token_requests} token request(s), {state.connections} connection(s)",
+                )
+
+        asyncio.run(async_checks())
+
+    server.shutdown()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock SPConnect server")
+    parser.add_argument("--serve", action="store_true", help="Only run the server")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    if args.serve:
+        start_mock_server(MockState(), args.port)
+        print(f"Mock SPConnect on http://127.0.0.1:{args.port} (token endpoint /tokens)")
+        threading.Event().wait()
+    sys.exit(0 if run_checks() else 1)
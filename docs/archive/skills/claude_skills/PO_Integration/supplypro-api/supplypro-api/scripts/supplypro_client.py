@@ -1,14 +1,169 @@
 """
 SupplyPro SPConnect API Client
 Handles authentication and API calls to Hyphen SupplyPro SPConnect API v13
+
+SupplyProClient (requests) and AsyncSupplyProClient (httpx) share one
+pooled HTTP session per client, so repeated calls reuse connections. The
+OAuth token is refreshed single-flight: when many threads or tasks find
+it expired, one fetches a new token and the others wait for it. Batches
+of order responses are sent with bounded concurrency and a rate limit.
 """
 
 import requests
 import json
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import time
 
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # only needed for AsyncSupplyProClient
+    httpx = None
+
+
+# Refresh tokens this long before they expire
+TOKEN_EXPIRY_BUFFER_SECONDS = 60
+
+
+# =============================================================================
+# PAYLOADS
+# =============================================================================
+
+def build_order_response_payload(
+    builder_id: str,
+    builder_account_number: str,
+    order_id: int,
+    response_type: str,
+    po_number: Optional[str] = None,
+    seller_order_number: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    response_note: Optional[str] = None,
+    items: Optional[List[Dict]] = None
+) -> Dict[str, Any]:
+    """Order response body (see SupplyProClient.send_order_response)"""
+    payload = {
+        "header": {
+            "builderId": builder_id,
+            "builderAccNum": builder_account_number,
+            "type": "OrderResponse",
+            "responseType": response_type,
+            "purpose": "Original",
+            "orderId": order_id,
+            "issueDate": datetime.now().isoformat()
+        }
+    }
+    
+    # Add optional fields
+    if po_number:
+        payload["header"]["poNumber"] = po_number
+    if seller_order_number:
+        payload["header"]["sellerOrderNumber"] = seller_order_number
+    if start_date:
+        payload["header"]["startDate"] = start_date
+    if end_date:
+        payload["header"]["endDate"] = end_date
+    if response_note:
+        payload["header"]["responseNote"] = response_note
+    if items:
+        payload["items"] = items
+    return payload
+
+
+def build_delivery_notice_payload(
+    order_id: int,
+    builder_id: str,
+    builder_account_number: str,
+    notice_type: str,
+    status: str,
+    date_delivered: Optional[str] = None,
+    date_shipped: Optional[str] = None,
+    seller_order_ref: Optional[str] = None,
+    note: Optional[str] = None,
+    items: Optional[List[Dict]] = None
+) -> Dict[str, Any]:
+    """Advanced Shipment Notice body (see SupplyProClient.send_delivery_notice)"""
+    payload = {
+        "header": {
+            "orderId": order_id,
+            "builderId": builder_id,
+            "builderAccNum": builder_account_number,
+            "type": notice_type,
+            "status": status,
+            "issueDate": datetime.now().isoformat(),
+            "purpose": "Original"
+        }
+    }
+    
+    # Add conditional required fields
+    if notice_type == "Shipped" and date_delivered:
+        payload["header"]["dateDelivered"] = date_delivered
+    if notice_type in ["Delivered", "UndoComplete"] and date_shipped:
+        payload["header"]["dateShipped"] = date_shipped
+    
+    # Add optional fields
+    if seller_order_ref:
+        payload["header"]["sellerReferenceNumber"] = seller_order_ref
+    if note:
+        payload["header"]["note"] = note
+    if items:
+        payload["items"] = items
+    return payload
+
+
+# =============================================================================
+# RATE LIMITING
+# =============================================================================
+
+class RateLimiter:
+    """
+    Spaces calls at least 1/rate_per_second apart across threads and tasks.
+    A rate of 0 disables limiting.
+    """
+    
+    def __init__(self, rate_per_second: float = 0):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """Claim the next free slot; returns seconds to wait for it"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+    
+    def wait(self):
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def wait_async(self):
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def _batch_result(request: Dict[str, Any], response: Any = None, error: Optional[Exception] = None) -> Dict[str, Any]:
+    result = {"order_id": request.get("order_id"), "ok": error is None}
+    if error is None:
+        result["response"] = response
+    else:
+        result["error"] = str(error)
+    return result
+
+
+# =============================================================================
+# SYNC CLIENT
+# =============================================================================
 
 class SupplyProClient:
     """Client for interacting with Hyphen SupplyPro SPConnect API"""
@@ -20,7 +175,9 @@ class SupplyProClient:
         client_secret: str,
         base_uri: str,
         api_key: Optional[str] = None,
-        auth_type: str = "oauth"
+        auth_type: str = "oauth",
+        pool_size: int = 10,
+        timeout: float = 30.0
     ):
         """
         Initialize SupplyPro API client
@@ -32,6 +189,8 @@ class SupplyProClient:
             base_uri: Base API URI for orders/responses
             api_key: Optional API key if using API key authentication
             auth_type: 'oauth' or 'api_key'
+            pool_size: Connections kept open per host
+            timeout: Request timeout in seconds
         """
         self.oauth_uri = oauth_uri
         self.client_id = client_id
@@ -39,10 +198,28 @@ class SupplyProClient:
         self.base_uri = base_uri
         self.api_key = api_key
         self.auth_type = auth_type
+        self.timeout = timeout
         
         self.access_token = None
         self.token_expiry = None
+        self._token_lock = threading.Lock()
         
+        # One session per client: keep-alive connections are reused across calls
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
     def _get_oauth_token(self) -> str:
         """Get OAuth 2.0 access token using client credentials flow"""
         payload = {
@@ -52,10 +229,11 @@ class SupplyProClient:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.oauth_uri,
                 data=payload,
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                timeout=self.timeout
             )
             response.raise_for_status()
             
@@ -64,20 +242,30 @@ class SupplyProClient:
             
             # Calculate expiry (default 3600 seconds if not provided)
             expires_in = token_data.get("expires_in", 3600)
-            self.token_expiry = datetime.now() + timedelta(seconds=expires_in - 60)  # 60s buffer
+            self.token_expiry = datetime.now() + timedelta(seconds=expires_in - TOKEN_EXPIRY_BUFFER_SECONDS)
             
             return self.access_token
-            
+        
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to obtain OAuth token: {str(e)}")
     
+    def _token_valid(self) -> bool:
+        return bool(self.access_token) and not (self.token_expiry and datetime.now() >= self.token_expiry)
+    
     def _ensure_valid_token(self):
-        """Ensure we have a valid access token"""
-        if self.auth_type == "api_key":
+        """Ensure we have a valid access token (one refresh at a time)"""
+        if self.auth_type == "api_key" or self._token_valid():
             return
-            
-        if not self.access_token or (self.token_expiry and datetime.now() >= self.token_expiry):
-            self._get_oauth_token()
+        with self._token_lock:
+            # Another thread may have refreshed while we waited
+            if not self._token_valid():
+                self._get_oauth_token()
+    
+    def _invalidate_token(self, token: Optional[str]):
+        """Drop a token the API rejected, unless another thread already replaced it"""
+        with self._token_lock:
+            if self.access_token == token:
+                self.access_token = None
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with authentication"""
@@ -93,6 +281,21 @@ class SupplyProClient:
                 "Content-Type": "application/json"
             }
     
+    def _post(self, path: str, payload: Dict[str, Any], action: str) -> Dict[str, Any]:
+        """POST with auth; a 401 refreshes the token and retries once"""
+        endpoint = f"{self.base_uri}{path}"
+        try:
+            for attempt in range(2):
+                headers = self._get_headers()
+                response = self.session.post(endpoint, json=payload, headers=headers, timeout=self.timeout)
+                if response.status_code == 401 and self.auth_type == "oauth" and attempt == 0:
+                    self._invalidate_token(headers["Authorization"][len("Bearer "):])
+                    continue
+                response.raise_for_status()
+                return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Failed to {action}: {str(e)}")
+    
     def send_order_response(
         self,
         builder_id: str,
@@ -120,49 +323,15 @@ class SupplyProClient:
             end_date: Delivery end date (ISO format)
             response_note: Note to attach to order
             items: List of item responses (optional)
-            
+        
         Returns:
             Response from API
         """
-        endpoint = f"{self.base_uri}/inbound/v1/orderResponse"
-        
-        payload = {
-            "header": {
-                "builderId": builder_id,
-                "builderAccNum": builder_account_number,
-                "type": "OrderResponse",
-                "responseType": response_type,
-                "purpose": "Original",
-                "orderId": order_id,
-                "issueDate": datetime.now().isoformat()
-            }
-        }
-        
-        # Add optional fields
-        if po_number:
-            payload["header"]["poNumber"] = po_number
-        if seller_order_number:
-            payload["header"]["sellerOrderNumber"] = seller_order_number
-        if start_date:
-            payload["header"]["startDate"] = start_date
-        if end_date:
-            payload["header"]["endDate"] = end_date
-        if response_note:
-            payload["header"]["responseNote"] = response_note
-        if items:
-            payload["items"] = items
-        
-        try:
-            response = requests.post(
-                endpoint,
-                json=payload,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to send order response: {str(e)}")
+        payload = build_order_response_payload(
+            builder_id, builder_account_number, order_id, response_type,
+            po_number, seller_order_number, start_date, end_date, response_note, items
+        )
+        return self._post("/inbound/v1/orderResponse", payload, "send order response")
     
     def send_delivery_notice(
         self,
@@ -183,7 +352,7 @@ class SupplyProClient:
         Args:
             order_id: Order ID from original order
             builder_id: Builder GUID
-            builder_account_number: Builder account number  
+            builder_account_number: Builder account number
             notice_type: 'Shipped', 'Delivered', or 'UndoComplete'
             status: 'CompleteOrder' or 'PartialOrder'
             date_delivered: Delivery date if type is 'Shipped'
@@ -191,49 +360,45 @@ class SupplyProClient:
             seller_order_ref: Supplier's order reference number
             note: Note to save to order
             items: List of completed items
-            
+        
         Returns:
             Response from API
         """
-        endpoint = f"{self.base_uri}/inbound/v1/advanceShipmentNotice"
+        payload = build_delivery_notice_payload(
+            order_id, builder_id, builder_account_number, notice_type, status,
+            date_delivered, date_shipped, seller_order_ref, note, items
+        )
+        return self._post("/inbound/v1/advanceShipmentNotice", payload, "send delivery notice")
+    
+    def send_order_responses(
+        self,
+        responses: List[Dict[str, Any]],
+        max_workers: int = 4,
+        rate_per_second: float = 5.0
+    ) -> List[Dict[str, Any]]:
+        """
+        Send many order responses concurrently
         
-        payload = {
-            "header": {
-                "orderId": order_id,
-                "builderId": builder_id,
-                "builderAccNum": builder_account_number,
-                "type": notice_type,
-                "status": status,
-                "issueDate": datetime.now().isoformat(),
-                "purpose": "Original"
-            }
-        }
+        Args:
+            responses: List of send_order_response keyword arguments
+            max_workers: Requests in flight at once (keep <= pool_size)
+            rate_per_second: Maximum requests started per second (0 = unlimited)
         
-        # Add conditional required fields
-        if notice_type == "Shipped" and date_delivered:
-            payload["header"]["dateDelivered"] = date_delivered
-        if notice_type in ["Delivered", "UndoComplete"] and date_shipped:
-            payload["header"]["dateShipped"] = date_shipped
-            
-        # Add optional fields
-        if seller_order_ref:
-            payload["header"]["sellerReferenceNumber"] = seller_order_ref
-        if note:
-            payload["header"]["note"] = note
-        if items:
-            payload["items"] = items
+        Returns:
+            One result per response, in order:
+            {"order_id", "ok", "response"} or {"order_id", "ok": False, "error"}
+        """
+        limiter = RateLimiter(rate_per_second)
         
-        try:
-            response = requests.post(
-                endpoint,
-                json=payload,
-                headers=self._get_headers()
-            )
-            response.raise_for_status()
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Failed to send delivery notice: {str(e)}")
+        def send(request):
+            limiter.wait()
+            try:
+                return _batch_result(request, self.send_order_response(**request))
+            except Exception as e:
+                return _batch_result(request, error=e)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(send, responses))
     
     def get_order_status(self, order_id: int) -> Dict[str, Any]:
         """
@@ -242,7 +407,7 @@ class SupplyProClient:
         
         Args:
             order_id: Order ID to retrieve
-            
+        
         Returns:
             Order status data
         """
@@ -251,6 +416,129 @@ class SupplyProClient:
         raise NotImplementedError("Get order status endpoint not defined in v13 spec")
 
 
+# =============================================================================
+# ASYNC CLIENT
+# =============================================================================
+
+class AsyncSupplyProClient:
+    """asyncio variant of SupplyProClient (requires httpx)"""
+    
+    def __init__(
+        self,
+        oauth_uri: str,
+        client_id: str,
+        client_secret: str,
+        base_uri: str,
+        api_key: Optional[str] = None,
+        auth_type: str = "oauth",
+        pool_size: int = 10,
+        timeout: float = 30.0
+    ):
+        if httpx is None:
+            raise ImportError("AsyncSupplyProClient requires httpx (pip install httpx)")
+        self.oauth_uri = oauth_uri
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_uri = base_uri
+        self.api_key = api_key
+        self.auth_type = auth_type
+        
+        self.access_token = None
+        self.token_expiry = None
+        self._token_lock = asyncio.Lock()
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+    
+    async def aclose(self):
+        await self.client.aclose()
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.aclose()
+    
+    def _token_valid(self) -> bool:
+        return bool(self.access_token) and not (self.token_expiry and datetime.now() >= self.token_expiry)
+    
+    async def _ensure_valid_token(self):
+        """Single-flight refresh: concurrent callers wait for one token request"""
+        if self.auth_type == "api_key" or self._token_valid():
+            return
+        async with self._token_lock:
+            if self._token_valid():
+                return
+            try:
+                response = await self.client.post(
+                    self.oauth_uri,
+                    data={
+                        "grant_type": "client_credentials",
+                        "client_id": self.client_id,
+                        "client_secret": self.client_secret
+                    }
+                )
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                raise Exception(f"Failed to obtain OAuth token: {str(e)}")
+            token_data = response.json()
+            expires_in = token_data.get("expires_in", 3600)
+            self.token_expiry = datetime.now() + timedelta(seconds=expires_in - TOKEN_EXPIRY_BUFFER_SECONDS)
+            self.access_token = token_data.get("access_token")
+    
+    async def _get_headers(self) -> Dict[str, str]:
+        if self.auth_type == "api_key":
+            return {"x-api-key": self.api_key, "Content-Type": "application/json"}
+        await self._ensure_valid_token()
+        return {"Authorization": f"Bearer {self.access_token}", "Content-Type": "application/json"}
+    
+    async def _post(self, path: str, payload: Dict[str, Any], action: str) -> Dict[str, Any]:
+        endpoint = f"{self.base_uri}{path}"
+        try:
+            for attempt in range(2):
+                headers = await self._get_headers()
+                response = await self.client.post(endpoint, json=payload, headers=headers)
+                if response.status_code == 401 and self.auth_type == "oauth" and attempt == 0:
+                    if self.access_token == headers["Authorization"][len("Bearer "):]:
+                        self.access_token = None
+                    continue
+                response.raise_for_status()
+                return response.json()
+        except httpx.HTTPError as e:
+            raise Exception(f"Failed to {action}: {str(e)}")
+    
+    async def send_order_response(self, **kwargs) -> Dict[str, Any]:
+        """Same arguments as SupplyProClient.send_order_response"""
+        payload = build_order_response_payload(**kwargs)
+        return await self._post("/inbound/v1/orderResponse", payload, "send order response")
+    
+    async def send_delivery_notice(self, **kwargs) -> Dict[str, Any]:
+        """Same arguments as SupplyProClient.send_delivery_notice"""
+        payload = build_delivery_notice_payload(**kwargs)
+        return await self._post("/inbound/v1/advanceShipmentNotice", payload, "send delivery notice")
+    
+    async def send_order_responses(
+        self,
+        responses: List[Dict[str, Any]],
+        concurrency: int = 8,
+        rate_per_second: float = 5.0
+    ) -> List[Dict[str, Any]]:
+        """Send many order responses; see SupplyProClient.send_order_responses"""
+        limiter = RateLimiter(rate_per_second)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def send(request):
+            async with semaphore:
+                await limiter.wait_async()
+                try:
+                    return _batch_result(request, await self.send_order_response(**request))
+                except Exception as e:
+                    return _batch_result(request, error=e)
+        
+        return await asyncio.gather(*(send(r) for r in responses))
+
+
 def create_client_from_config(config: Dict[str, Any]) -> SupplyProClient:
     """
     Create SupplyPro client from configuration dictionary
@@ -263,7 +551,7 @@ def create_client_from_config(config: Dict[str, Any]) -> SupplyProClient:
             - client_secret: OAuth client secret (if oauth)
             - api_key: API key value (if api_key)
             - base_uri: Base API URI
-            
+    
     Returns:
         Configured SupplyProClient instance
     """
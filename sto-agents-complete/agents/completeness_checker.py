@@ -9,12 +9,20 @@ Checks Customer Files/{Builder}/{Subdivision}/{Lot}/ folders for:
 Generates reports of incomplete jobs needing attention.
 """
 
+import os
 import logging
+import json
 import re
+import time
+import tempfile
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass, field
+from contextlib import ExitStack
+
+from services.fs_scanner import snapshot_for
+from services.folder_index import FolderIndex, indexed_snapshot
 
 # Setup logging
 logger = logging.getLogger('completeness_checker')
@@ -37,6 +45,10 @@ except ImportError:
     def get_active_jobs(builder_key, subdivision=None):
         return []
 
+# Threads for check_all_active: one subdivision per work unit. Sized for
+# network-synced folders, where each stat/listing waits on the network.
+CHECK_WORKERS = int(os.environ.get("STO_CHECK_WORKERS", "8"))
+
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
@@ -67,7 +79,85 @@ class JobCompleteness:
 # DOCUMENT DETECTION
 # =============================================================================
 
-def find_document(folder: Path, doc_type: str, patterns: dict = None) -> Optional[Path]:
+class DocumentMatcher:
+    """
+    One builder's document requirements (required, optional, patterns),
+    compiled once.
+    
+    A file matches a document type if the type name appears in its stem
+    (case-insensitive) or one of the type's patterns matches its name. A
+    pattern applies to a type when either name contains the other.
+    """
+    
+    def __init__(self, requirements: dict):
+        self.required = list(requirements.get("required", []))
+        self.optional = list(requirements.get("optional", []))
+        self.doc_types = self.required + self.optional
+        self.signature = json.dumps(requirements, sort_keys=True, default=str)
+        
+        patterns = [
+            (name.lower(), re.compile(pattern, re.IGNORECASE))
+            for name, pattern in requirements.get("patterns", {}).items()
+        ]
+        # doc type -> (lowercase name, [compiled patterns that apply to it])
+        self._rules = {
+            doc_type: (
+                doc_type.lower(),
+                [regex for name, regex in patterns if name in doc_type.lower() or doc_type.lower() in name],
+            )
+            for doc_type in self.doc_types
+        }
+    
+    def classify(self, name: str) -> list:
+        """Document types a file name satisfies (in requirements order)"""
+        stem = Path(name).stem.lower()
+        return [
+            doc_type for doc_type, (doc_lower, regexes) in self._rules.items()
+            if doc_lower in stem or any(regex.search(name) for regex in regexes)
+        ]
+    
+    def match_files(self, files: list, classified: bool = False) -> dict:
+        """
+        Pick the file for each document type in one pass over files.
+        
+        Pattern matches win over name matches (earlier pattern first), then
+        file order - the same file find_document would return. With
+        classified=True only the types in each FileEntry.doc_types are tried.
+        
+        Returns dict of doc type -> FileEntry for the types found.
+        """
+        by_pattern = {}     # doc type -> (pattern index, file)
+        by_name = {}        # doc type -> file
+        for f in files:
+            stem = f.stem.lower()
+            for doc_type in (f.doc_types if classified else self.doc_types):
+                rule = self._rules.get(doc_type)
+                if rule is None:
+                    continue
+                doc_lower, regexes = rule
+                best = by_pattern.get(doc_type)
+                for i, regex in enumerate(regexes[:best[0]] if best else regexes):
+                    if regex.search(f.name):
+                        by_pattern[doc_type] = (i, f)
+                        break
+                if doc_type not in by_name and doc_lower in stem:
+                    by_name[doc_type] = f
+        
+        found = dict(by_name)
+        found.update({doc_type: f for doc_type, (i, f) in by_pattern.items()})
+        return found
+
+_matchers = {}
+
+def matcher_for(builder_key: str) -> DocumentMatcher:
+    """The compiled DocumentMatcher for a builder (rebuilt if REQUIRED_DOCUMENTS changed)"""
+    requirements = REQUIRED_DOCUMENTS.get(builder_key, {})
+    matcher = _matchers.get(builder_key)
+    if matcher is None or matcher.signature != json.dumps(requirements, sort_keys=True, default=str):
+        matcher = _matchers[builder_key] = DocumentMatcher(requirements)
+    return matcher
+
+def find_document(folder: Path, doc_type: str, patterns: dict = None, files: list = None) -> Optional[Path]:
     """
     Search for a document type in a folder.
     
@@ -75,35 +165,26 @@ def find_document(folder: Path, doc_type: str, patterns: dict = None) -> Optiona
         folder: Folder to search (recursively)
         doc_type: Document type name (e.g., "ARCH DRAWINGS")
         patterns: Optional regex patterns for matching
+        files: Files under folder (FileEntry list from the folder snapshot);
+               looked up from the shared snapshot if not given
     
     Returns:
         Path to found document, or None
     """
-    if not folder.exists():
-        return None
-    
-    doc_lower = doc_type.lower()
-    
-    # Check if we have a custom pattern
-    if patterns:
-        for pattern_name, pattern in patterns.items():
-            if pattern_name.lower() in doc_lower or doc_lower in pattern_name.lower():
-                regex = re.compile(pattern, re.IGNORECASE)
-                for f in folder.rglob("*"):
-                    if f.is_file() and regex.search(f.name):
-                        return f
-    
-    # Default: look for doc_type in filename
-    for f in folder.rglob("*"):
-        if f.is_file():
-            # Exact match
-            if doc_lower in f.stem.lower():
-                return f
-            # Word boundary match
-            if re.search(rf'\b{re.escape(doc_lower)}\b', f.stem, re.IGNORECASE):
-                return f
-    
-    return None
+    if files is None:
+        snapshot = snapshot_for(folder)
+        if not snapshot.exists(folder):
+            return None
+        files = snapshot.files_under(folder)
+    
+    matcher = DocumentMatcher({"required": [doc_type], "patterns": patterns or {}})
+    found = matcher.match_files(files).get(doc_type)
+    return found.path if found else None
+
+def document_classifier(builder_key: str) -> tuple:
+    """(classify(name), signature) for indexing a builder's Customer Files"""
+    matcher = matcher_for(builder_key)
+    return matcher.classify, matcher.signature
 
 def check_job_completeness(job_path: Path, builder_key: str) -> JobCompleteness:
     """
@@ -129,14 +210,20 @@ def check_job_completeness(job_path: Path, builder_key: str) -> JobCompleteness:
     )
     
     # Get requirements for this builder
-    requirements = REQUIRED_DOCUMENTS.get(builder_key, {})
-    required_docs = requirements.get("required", [])
-    optional_docs = requirements.get("optional", [])
-    patterns = requirements.get("patterns", {})
+    matcher = matcher_for(builder_key)
+    
+    # One pass over the job's files (from the shared snapshot) for all document
+    # types; indexed snapshots already know which types each file satisfies
+    snapshot = snapshot_for(job_path)
+    files = snapshot.files_under(job_path) if snapshot.exists(job_path) else []
+    matches = {
+        doc_type: f.path
+        for doc_type, f in matcher.match_files(files, classified=snapshot.classified).items()
+    }
     
     # Check required documents
-    for doc_type in required_docs:
-        found_path = find_document(job_path, doc_type, patterns)
+    for doc_type in matcher.required:
+        found_path = matches.get(doc_type)
         check = DocumentCheck(
             doc_type=doc_type,
             required=True,
@@ -152,8 +239,8 @@ def check_job_completeness(job_path: Path, builder_key: str) -> JobCompleteness:
             result.missing_required.append(doc_type)
     
     # Check optional documents
-    for doc_type in optional_docs:
-        found_path = find_document(job_path, doc_type, patterns)
+    for doc_type in matcher.optional:
+        found_path = matches.get(doc_type)
         check = DocumentCheck(
             doc_type=doc_type,
             required=False,
@@ -177,41 +264,105 @@ def check_job_completeness(job_path: Path, builder_key: str) -> JobCompleteness:
 # BATCH CHECKING
 # =============================================================================
 
-def check_subdivision(builder_key: str, subdivision: str) -> list:
+def check_subdivision(builder_key: str, subdivision: str, customer_path: Path = None) -> list:
     """
     Check all jobs in a subdivision.
     
-    Returns list of JobCompleteness objects.
+    Returns list of JobCompleteness objects, ordered by lot folder name.
     """
-    builder = BUILDERS.get(builder_key)
-    if not builder:
-        logger.error(f"Unknown builder: {builder_key}")
-        return []
+    if customer_path is None:
+        builder = BUILDERS.get(builder_key)
+        if not builder:
+            logger.error(f"Unknown builder: {builder_key}")
+            return []
+        customer_path = builder.get("customer_files_path")
     
-    customer_path = builder.get("customer_files_path")
     if not customer_path:
         logger.error(f"No customer files path for builder: {builder_key}")
         return []
     
     sub_path = customer_path / subdivision
-    if not sub_path.exists():
+    snapshot = snapshot_for(sub_path)
+    if not snapshot.exists(sub_path):
         logger.warning(f"Subdivision folder not found: {sub_path}")
         return []
     
     results = []
     
     # Find all lot folders
-    for lot_folder in sub_path.iterdir():
-        if lot_folder.is_dir() and not lot_folder.name.startswith('.'):
-            result = check_job_completeness(lot_folder, builder_key)
-            results.append(result)
+    for lot_folder in snapshot.subdirs(sub_path):
+        result = check_job_completeness(lot_folder, builder_key)
+        results.append(result)
     
     return results
 
-def check_all_active(builder_key: str = None) -> dict:
+def summarize_subdivision(sub_results: list) -> dict:
+    """Counts and incomplete-job details for one subdivision's results"""
+    complete_count = sum(1 for r in sub_results if r.is_complete)
+    return {
+        "total": len(sub_results),
+        "complete": complete_count,
+        "incomplete": len(sub_results) - complete_count,
+        "incomplete_jobs": [
+            {
+                "lot": r.lot,
+                "missing_required": r.missing_required,
+                "missing_optional": r.missing_optional,
+                "found": r.found_documents,
+            }
+            for r in sub_results if not r.is_complete
+        ]
+    }
+
+def check_builder(builder_key: str, builder: dict, full_rescan: bool = False,
+                  workers: int = CHECK_WORKERS, index: FolderIndex = None) -> dict:
+    """
+    Check every subdivision of one builder.
+    
+    The folder index refresh, where the filesystem I/O happens, runs one
+    subdivision per work unit on a pool of `workers` threads (1 = serial).
+    The subdivision checks only read that snapshot, so they run serially,
+    in subdivision order, and reports and CSVs come out the same either way.
+    """
+    builder_results = {
+        "name": builder["name"],
+        "subdivisions": {},
+        "total_jobs": 0,
+        "complete": 0,
+        "incomplete": 0,
+    }
+    
+    customer_path = builder.get("customer_files_path")
+    if not customer_path:
+        return builder_results
+    
+    classify, signature = document_classifier(builder_key)
+    snapshot = indexed_snapshot(customer_path, classify, signature, full_rescan, workers, index)
+    
+    # Auto-detect subdivisions
+    subdivisions = [sub.name for sub in snapshot.subdirs(customer_path)]
+    logger.info(f"Checking {builder['name']}: {len(subdivisions)} subdivisions ({workers} worker(s))")
+    
+    for subdivision in subdivisions:
+        sub_results = check_subdivision(builder_key, subdivision, customer_path)
+        if not sub_results:
+            continue
+        sub_summary = summarize_subdivision(sub_results)
+        builder_results["subdivisions"][subdivision] = sub_summary
+        builder_results["total_jobs"] += sub_summary["total"]
+        builder_results["complete"] += sub_summary["complete"]
+        builder_results["incomplete"] += sub_summary["incomplete"]
+    
+    return builder_results
+
+def check_all_active(builder_key: str = None, full_rescan: bool = False, workers: int = CHECK_WORKERS) -> dict:
     """
     Check all active subdivisions for all builders (or specific builder).
     
+    Folder listings and document matches come from the persistent folder
+    index, refreshed first (only changed folders are re-listed unless
+    full_rescan). workers sets the thread pool size (1 = serial).
+    
     Returns dict with results organized by builder and subdivision.
     """
     results = {
@@ -231,43 +382,7 @@ def check_all_active(builder_key: str = None) -> dict:
         if not builder or not builder.get("active"):
             continue
         
-        builder_results = {
-            "name": builder["name"],
-            "subdivisions": {},
-            "total_jobs": 0,
-            "complete": 0,
-            "incomplete": 0,
-        }
-        
-        # Auto-detect subdivisions
-        subdivisions = get_active_subdivisions(bkey)
-        logger.info(f"Checking {builder['name']}: {len(subdivisions)} subdivisions")
-        
-        for subdivision in subdivisions:
-            sub_results = check_subdivision(bkey, subdivision)
-            
-            if sub_results:
-                complete_count = sum(1 for r in sub_results if r.is_complete)
-                incomplete_count = len(sub_results) - complete_count
-                
-                builder_results["subdivisions"][subdivision] = {
-                    "total": len(sub_results),
-                    "complete": complete_count,
-                    "incomplete": incomplete_count,
-                    "incomplete_jobs": [
-                        {
-                            "lot": r.lot,
-                            "missing_required": r.missing_required,
-                            "missing_optional": r.missing_optional,
-                            "found": r.found_documents,
-                        }
-                        for r in sub_results if not r.is_complete
-                    ]
-                }
-                
-                builder_results["total_jobs"] += len(sub_results)
-                builder_results["complete"] += complete_count
-                builder_results["incomplete"] += incomplete_count
+        builder_results = check_builder(bkey, builder, full_rescan, workers)
         
         results["builders"][bkey] = builder_results
         results["summary"]["total_jobs"] += builder_results["total_jobs"]
@@ -276,6 +391,61 @@ def check_all_active(builder_key: str = None) -> dict:
     
     return results
 
+def _delayed(function, seconds: float):
+    """function, sleeping `seconds` before each call"""
+    def delayed(*args, **kwargs):
+        time.sleep(seconds)
+        return function(*args, **kwargs)
+    return delayed
+
+def run_benchmark(subdivisions: int = 50, lots: int = 200, workers: int = CHECK_WORKERS, root: Path = None,
+                  latency_ms: float = 0.0) -> dict:
+    """
+    Time check_builder serially and with `workers` threads on a synthetic
+    subdivisions x lots tree (3 documents per lot). Build the tree under
+    root (e.g. inside the synced SharePoint folder) to measure real
+    network latency; defaults to a local temp folder. latency_ms adds a
+    sleep to every os.stat and os.scandir call while timing, to mimic a
+    network folder without one.
+    """
+    from unittest import mock
+    
+    builder_key = next(iter(REQUIRED_DOCUMENTS), "benchmark")
+    required = REQUIRED_DOCUMENTS.get(builder_key, {}).get("required", ["ARCH DRAWINGS"])
+    
+    with tempfile.TemporaryDirectory(dir=root) as tmp:
+        tree = Path(tmp) / "Customer Files"
+        for s in range(subdivisions):
+            for n in range(lots):
+                lot = tree / f"Subdivision {s:02d}" / f"Lot {n:03d}"
+                lot.mkdir(parents=True)
+                for doc_type in required[:2] + ["NOTES"]:
+                    (lot / f"Lot {n:03d} {doc_type}.pdf").write_bytes(b"")
+        builder = {"name": "Benchmark", "customer_files_path": tree}
+        
+        timings = {}
+        reports = {}
+        with ExitStack() as stack:
+            if latency_ms:
+                for name in ("stat", "scandir"):
+                    stack.enter_context(mock.patch.object(os, name, _delayed(getattr(os, name), latency_ms / 1000)))
+            for label, count in (("serial", 1), (f"{workers} workers", workers)):
+                index = FolderIndex(Path(tmp) / f"index_{count}.db")
+                for run in ("full", "incremental"):
+                    started = time.perf_counter()
+                    builder_results = check_builder(builder_key, builder, full_rescan=(run == "full"), workers=count, index=index)
+                    timings[f"{label}, {run}"] = round(time.perf_counter() - started, 3)
+                reports[label] = json.dumps(builder_results["subdivisions"])
+                index.close()
+        
+        return {
+            "tree": f"{subdivisions} subdivisions x {lots} lots",
+            "root": str(root or tempfile.gettempdir()),
+            "latency_ms": latency_ms,
+            "seconds": timings,
+            "same_results": len(set(reports.values())) == 1,
+        }
+
 # =============================================================================
 # REPORTING
 # =============================================================================
@@ -350,20 +520,23 @@ def generate_csv_report(results: dict, output_path: Path = None) -> str:
 # MAIN ENTRY POINT
 # =============================================================================
 
-def run_completeness_check(builder_key: str = None, send_teams: bool = True) -> dict:
+def run_completeness_check(builder_key: str = None, send_teams: bool = True, full_rescan: bool = False,
+                           workers: int = CHECK_WORKERS) -> dict:
     """
     Run completeness check on all active jobs.
     
     Args:
         builder_key: Optional - only check this builder
         send_teams: Send notification to Teams
+        full_rescan: Re-list every folder instead of only changed ones
+        workers: Thread pool size (1 = serial)
     
     Returns:
         dict with results
     """
     logger.info("Starting completeness check")
     
-    results = check_all_active(builder_key)
+    results = check_all_active(builder_key, full_rescan, workers)
     
     # Format report
     report = format_completeness_report(results)
@@ -393,7 +566,6 @@ def run_completeness_check(builder_key: str = None, send_teams: bool = True) ->
 
 if __name__ == "__main__":
     import argparse
-    import json
     
     parser = argparse.ArgumentParser(description="Document Completeness Checker")
     parser.add_argument("--builder", type=str, 
@@ -403,10 +575,24 @@ if __name__ == "__main__":
     parser.add_argument("--csv", type=str, help="Output CSV report to file")
     parser.add_argument("--json", action="store_true", help="Output raw JSON")
     parser.add_argument("--no-teams", action="store_true", help="Skip Teams notification")
+    parser.add_argument("--full-rescan", action="store_true", help="Re-list every folder, not just changed ones")
+    parser.add_argument("--live", action="store_true", help="Report from the folder watcher's live state (no folder checks)")
+    parser.add_argument("--workers", type=int, default=CHECK_WORKERS,
+                        help=f"Threads, one subdivision per work unit (default {CHECK_WORKERS}; 1 = serial)")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Time serial vs --workers on a synthetic 50 x 200 lot tree")
+    parser.add_argument("--root", type=Path, help="Build the benchmark tree under this folder (default: temp folder)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Benchmark: sleep added to every stat/scandir, to mimic a network folder")
     
     args = parser.parse_args()
     
-    if args.subdivision and args.builder:
+    if args.benchmark:
+        print(json.dumps(run_benchmark(workers=args.workers, root=args.root, latency_ms=args.latency_ms), indent=2))
+    elif args.live:
+        from services.live_state import LiveState
+        print(format_completeness_report(LiveState().completeness_results(BUILDERS)))
+    elif args.subdivision and args.builder:
         # Check specific subdivision
         results = check_subdivision(args.builder, args.subdivision)
         for r in results:
@@ -414,7 +600,7 @@ if __name__ == "__main__":
             print(f"{status} {r.lot}: {len(r.found_documents)} docs, missing: {r.missing_required}")
     else:
         # Full check
-        results = check_all_active(args.builder)
+        results = check_all_active(args.builder, args.full_rescan, args.workers)
         
         if args.csv:
             generate_csv_report(results, Path(args.csv))
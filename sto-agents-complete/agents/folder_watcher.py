@@ -0,0 +1,328 @@
+"""
+Folder Watcher Agent
+Keeps completeness results and PDSS document counts current as files land
+in Customer Files and 00_Intake, instead of waiting for the next morning
+routine.
+
+Watches every active builder's Customer Files and intake folders with
+watchdog. Events are coalesced per lot folder and handled once that lot
+has been quiet for STO_WATCH_DEBOUNCE seconds, so a batch of uploads is
+checked once. Only the affected lots are re-checked; results go to the
+live state store (services/live_state.py) that reports read instantly.
+
+Usage:
+    python -m agents.folder_watcher [--debounce 10] [--full-rescan]
+    python run.py --watch
+"""
+
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+from services.fs_scanner import invalidate, snapshot_for
+from services.folder_index import indexed_snapshot
+from services.live_state import LiveState
+from agents.completeness_checker import check_job_completeness, document_classifier
+from agents.pdss_sync import generate_job_id, sync_pdss_jobs
+
+# Setup logging
+logger = logging.getLogger('folder_watcher')
+
+# Import settings
+try:
+    from config.settings import BUILDERS, get_intake_files
+except ImportError:
+    logger.warning("Could not import settings, using defaults")
+    BUILDERS = {}
+
+    def get_intake_files(builder_key=None):
+        return []
+
+# Seconds a lot must be quiet before it is re-checked
+WATCH_DEBOUNCE_SECONDS = float(os.environ.get("STO_WATCH_DEBOUNCE", "10"))
+
+# How often the worker looks for lots that are due
+POLL_SECONDS = 1.0
+
+# watchdog event types that don't change anything on disk
+IGNORED_EVENTS = {"opened", "closed_no_write"}
+
+# =============================================================================
+# EVENT ROUTING
+# =============================================================================
+
+def _relative_parts(path: str, root: Optional[Path]) -> Optional[tuple]:
+    """Parts of path below root (original case), or None if outside root"""
+    if not root:
+        return None
+    path = os.path.normpath(path)
+    root = os.path.normpath(str(root))
+    if os.path.normcase(path) == os.path.normcase(root):
+        return ()
+    prefix = os.path.normcase(root.rstrip(os.sep) + os.sep)
+    if not os.path.normcase(path).startswith(prefix):
+        return None
+    return tuple(path[len(prefix):].split(os.sep))
+
+def locate(path: str) -> Optional[tuple]:
+    """
+    Map a changed path to the unit that needs re-checking:
+    ("lot", builder_key, lot_folder), ("subdivision", builder_key, subdivision_folder)
+    or ("intake", builder_key, intake_path). None if nothing is affected.
+    """
+    for bkey, builder in BUILDERS.items():
+        if not builder.get("active"):
+            continue
+
+        customer_path = builder.get("customer_files_path")
+        parts = _relative_parts(path, customer_path)
+        if parts is not None:
+            if not parts or any(p.startswith('.') for p in parts):
+                return None
+            if len(parts) == 1:
+                # Subdivision folder added/removed/renamed (or a stray file in it)
+                return ("subdivision", bkey, customer_path / parts[0])
+            return ("lot", bkey, customer_path / parts[0] / parts[1])
+
+        intake_path = builder.get("intake_path")
+        if _relative_parts(path, intake_path) is not None:
+            return ("intake", bkey, intake_path)
+
+    return None
+
+class EventCoalescer:
+    """Collects keys and releases each one once it has been quiet for `delay` seconds"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending = {}      # key -> monotonic time of last event
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        with self._lock:
+            self._pending[key] = time.monotonic()
+
+    def due(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            ready = [key for key, last in self._pending.items() if now - last >= self.delay]
+            for key in ready:
+                del self._pending[key]
+        return ready
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+class FolderEventHandler(FileSystemEventHandler):
+    """Route watchdog events to the coalescer by lot/subdivision/intake"""
+
+    def __init__(self, coalescer: EventCoalescer):
+        self.coalescer = coalescer
+        self.events = 0
+
+    def on_any_event(self, event):
+        if event.event_type in IGNORED_EVENTS:
+            return
+        self.events += 1
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            target = locate(path) if path else None
+            if target:
+                self.coalescer.add(target)
+
+# =============================================================================
+# WATCHER
+# =============================================================================
+
+def _lot_folders(subdivision_path: Path) -> list:
+    """Lot folders currently in a subdivision (one directory listing)"""
+    try:
+        with os.scandir(subdivision_path) as entries:
+            return [
+                subdivision_path / entry.name for entry in entries
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.')
+            ]
+    except OSError:
+        return []
+
+class FolderWatcher:
+    """Re-checks only the lots touched by filesystem events"""
+
+    def __init__(self, state: LiveState = None, debounce: float = WATCH_DEBOUNCE_SECONDS):
+        self.state = state or LiveState()
+        self.coalescer = EventCoalescer(debounce)
+        self.handler = FolderEventHandler(self.coalescer)
+        self.stats = {"events": 0, "batches": 0, "lots_checked": 0, "lots_removed": 0}
+
+    def seed(self, full_rescan: bool = False):
+        """Fill the live state for every lot (from the folder index) before watching"""
+        lots = []
+        for bkey, builder in BUILDERS.items():
+            customer_path = builder.get("customer_files_path")
+            if not builder.get("active") or not customer_path:
+                continue
+            classify, signature = document_classifier(bkey)
+            snapshot = indexed_snapshot(customer_path, classify, signature, full_rescan)
+            for sub in snapshot.subdirs(customer_path):
+                lots.extend(("lot", bkey, lot) for lot in snapshot.subdirs(sub))
+            lots.append(("intake", bkey, builder.get("intake_path")))
+
+        # Lots that were in the saved state but whose folders are gone
+        known = {("lot", r["builder"], Path(r["path"])) for r in self.state.lots().values()}
+        self.process(lots + sorted(known - set(lots), key=str), use_index=True)
+
+    def process(self, targets: list, use_index: bool = False) -> dict:
+        """
+        Re-check the given lots/subdivisions/intake folders, update PDSS
+        document counts for them and save the live state.
+        """
+        lots = {}
+        for kind, bkey, path in targets:
+            if kind == "lot":
+                lots[path] = bkey
+            elif kind == "subdivision":
+                # Lots added or removed with the subdivision folder
+                known = {
+                    Path(r["path"]) for r in self.state.lots().values()
+                    if r["builder"] == bkey and r["subdivision"] == path.name
+                }
+                for lot in set(_lot_folders(path)) ^ known:
+                    lots[lot] = bkey
+            elif kind == "intake" and path:
+                self.state.set_intake(bkey, len(get_intake_files(bkey)))
+
+        folder_jobs, removed = [], []
+        for lot_path, bkey in lots.items():
+            job_id = generate_job_id(bkey, lot_path.parent.name, lot_path.name)
+            if not use_index:
+                # Re-list just this lot; drops the stale cached tree snapshot
+                invalidate(lot_path)
+            snapshot = snapshot_for(lot_path)
+
+            if not snapshot.exists(lot_path):
+                self.state.remove_lot(job_id)
+                removed.append(job_id)
+                self.stats["lots_removed"] += 1
+                continue
+
+            result = check_job_completeness(lot_path, bkey)
+            document_count = snapshot.file_count(lot_path)
+            self.state.update_lot(job_id, {
+                "builder": bkey,
+                "subdivision": result.subdivision,
+                "lot": result.lot,
+                "path": str(lot_path),
+                "is_complete": result.is_complete,
+                "missing_required": result.missing_required,
+                "missing_optional": result.missing_optional,
+                "found": result.found_documents,
+                "document_count": document_count,
+            })
+            folder_jobs.append({
+                "job_id": job_id,
+                "builder": bkey,
+                "subdivision": result.subdivision,
+                "lot": result.lot,
+                "path": lot_path,
+                "document_count": document_count,
+            })
+            if not use_index:
+                invalidate(lot_path)
+            self.stats["lots_checked"] += 1
+
+        sync_results = sync_pdss_jobs(folder_jobs, removed) if (folder_jobs or removed) else {}
+        self.state.save()
+        self.stats["batches"] += 1
+
+        logger.info(f"Re-checked {len(folder_jobs)} lot(s), removed {len(removed)}")
+        return sync_results
+
+    def watch_paths(self) -> list:
+        paths = []
+        for builder in BUILDERS.values():
+            if not builder.get("active"):
+                continue
+            for key in ("customer_files_path", "intake_path"):
+                path = builder.get(key)
+                if path and path.exists():
+                    paths.append(path)
+        return paths
+
+    def run(self, stop_event: threading.Event = None):
+        """Watch until stop_event is set (or Ctrl+C)"""
+        stop_event = stop_event or threading.Event()
+        observer = Observer()
+        for path in self.watch_paths():
+            observer.schedule(self.handler, str(path), recursive=True)
+            logger.info(f"Watching: {path}")
+        observer.start()
+
+        try:
+            while not stop_event.wait(POLL_SECONDS):
+                due = self.coalescer.due()
+                if due:
+                    try:
+                        self.process(due)
+                    except Exception as e:
+                        # Retry after another debounce period instead of dropping the batch
+                        logger.error(f"Failed to re-check {len(due)} folder(s), will retry: {e}")
+                        for target in due:
+                            self.coalescer.add(target)
+        except KeyboardInterrupt:
+            logger.info("Stopping...")
+        finally:
+            observer.stop()
+            observer.join()
+            self.stats["events"] = self.handler.events
+
+# =============================================================================
+# MAIN ENTRY POINT
+# =============================================================================
+
+def run_folder_watcher(debounce: float = None, full_rescan: bool = False, stop_event: threading.Event = None) -> dict:
+    """
+    Seed the live state, then keep it current until stopped.
+
+    Args:
+        debounce: Seconds a lot must be quiet before re-checking
+        full_rescan: Re-list every folder when seeding
+        stop_event: Optional event to stop watching (runs until Ctrl+C otherwise)
+
+    Returns:
+        dict with watcher stats
+    """
+    if Observer is None:
+        logger.error("watchdog not installed: pip install watchdog")
+        return {"error": "watchdog not installed"}
+
+    watcher = FolderWatcher(debounce=WATCH_DEBOUNCE_SECONDS if debounce is None else debounce)
+    logger.info("Seeding live state from folder index")
+    watcher.seed(full_rescan)
+    watcher.run(stop_event)
+    return watcher.stats
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(levelname)s | %(message)s')
+
+    parser = argparse.ArgumentParser(description="Folder Watcher - live completeness and PDSS counts")
+    parser.add_argument("--debounce", type=float, help=f"Quiet seconds per lot (default {WATCH_DEBOUNCE_SECONDS:g})")
+    parser.add_argument("--full-rescan", action="store_true", help="Re-list every folder when seeding")
+
+    args = parser.parse_args()
+    print(run_folder_watcher(args.debounce, args.full_rescan))
@@ -32,6 +32,7 @@ from config.settings import (
     get_path
 )
 from services.teams_notify import send_teams_notification
+from services.pdss_store import get_pdss_store
 
 # Configure logging
 logging.basicConfig(
@@ -208,35 +209,27 @@ def add_to_pdss(intake_data: dict, dry_run: bool = False) -> dict:
         logger.info(f"[DRY RUN] Would add to PDSS: {pdss_entry['subdivision']}")
         return {'added': True, 'entry': pdss_entry}
     
-    # Load existing PDSS data
-    pdss_data = {'subdivisions': {}}
-    if pdss_path.exists():
-        try:
-            with open(pdss_path, 'r', encoding='utf-8') as f:
-                pdss_data = json.load(f)
-        except Exception as e:
-            logger.warning(f"Could not load existing PDSS data: {e}")
-    
-    # Add new subdivision
     sub_key = f"{pdss_entry['builder']}_{pdss_entry['subdivision'].replace(' ', '_').lower()}"
     
-    if sub_key in pdss_data.get('subdivisions', {}):
-        logger.warning(f"Subdivision {pdss_entry['subdivision']} already exists in PDSS")
-        return {'added': False, 'reason': 'already_exists', 'entry': pdss_entry}
-    
-    pdss_data.setdefault('subdivisions', {})[sub_key] = pdss_entry
-    pdss_data['last_updated'] = datetime.now().isoformat()
-    
-    # Save updated PDSS
+    # Add new subdivision - one row, checked and inserted in one transaction
     try:
-        pdss_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(pdss_path, 'w', encoding='utf-8') as f:
-            json.dump(pdss_data, f, indent=2)
+        store = get_pdss_store(legacy_json=pdss_path)
+        with store.transaction():
+            if not store.add_subdivision(sub_key, pdss_entry):
+                logger.warning(f"Subdivision {pdss_entry['subdivision']} already exists in PDSS")
+                return {'added': False, 'reason': 'already_exists', 'entry': pdss_entry}
+            store.set_meta('last_updated', datetime.now().isoformat())
         logger.info(f"Added {pdss_entry['subdivision']} to PDSS tracker")
-        return {'added': True, 'entry': pdss_entry}
     except Exception as e:
         logger.error(f"Failed to update PDSS: {e}")
         return {'added': False, 'reason': str(e), 'entry': pdss_entry}
+    
+    # Other machines see the new subdivision through the shared file
+    try:
+        store.export_json(pdss_path)
+    except Exception as e:
+        logger.error(f"Added {pdss_entry['subdivision']} but could not export PDSS JSON: {e}")
+    return {'added': True, 'entry': pdss_entry}
 
 
 # ==============================================================================
@@ -7,15 +7,26 @@ PDSS tracks:
 - Takeoff status
 - Quote status
 - Notes and dates
+
+Jobs live in the PDSS store (services/pdss_store.py); pdss_tracker.json
+is imported on first use, edits other machines make to the shared file
+are merged in before each read, and it is re-exported after each full
+sync and job update.
 """
 
 import logging
-import json
+import sqlite3
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 import csv
 
+from services.folder_index import indexed_snapshot
+from services.pdss_store import JOB_COLUMNS, get_pdss_store
+from services.pdss_frame import (
+    HAVE_PANDAS, due_window, export_frame, load_jobs_frame, status_by_group, summarize_jobs
+)
+
 # Setup logging
 logger = logging.getLogger('pdss_sync')
 
@@ -35,24 +46,8 @@ except ImportError:
 # PDSS DATA STRUCTURE
 # =============================================================================
 
-PDSS_COLUMNS = [
-    "job_id",
-    "builder",
-    "subdivision",
-    "lot",
-    "address",
-    "plan_code",
-    "plan_status",      # New, In Progress, Complete
-    "takeoff_status",   # Not Started, In Progress, Complete
-    "quote_status",     # Not Started, Sent, Approved
-    "documents_complete",
-    "assigned_to",
-    "priority",         # High, Medium, Low
-    "due_date",
-    "notes",
-    "created_date",
-    "updated_date",
-]
+# One column per field in the PDSS store
+PDSS_COLUMNS = JOB_COLUMNS
 
 # =============================================================================
 # PDSS FILE OPERATIONS
@@ -64,53 +59,49 @@ def get_pdss_path() -> Path:
     pdss_dir.mkdir(parents=True, exist_ok=True)
     return pdss_dir / "pdss_tracker.json"
 
+def get_store():
+    """The PDSS store (pdss_tracker.json is imported the first time, then merged when it changes)"""
+    return get_pdss_store(legacy_json=get_pdss_path())
+
 def load_pdss_data() -> dict:
-    """Load PDSS data from JSON file"""
-    pdss_path = get_pdss_path()
-    
-    if pdss_path.exists():
-        try:
-            with open(pdss_path, 'r') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            logger.error(f"Invalid JSON in PDSS file: {pdss_path}")
-            return {"jobs": {}, "last_sync": None}
-    
-    return {"jobs": {}, "last_sync": None}
+    """Load PDSS data in pdss_tracker.json's shape (a snapshot of the store)"""
+    return get_store().to_dict()
 
 def save_pdss_data(data: dict) -> bool:
-    """Save PDSS data to JSON file"""
-    pdss_path = get_pdss_path()
-    
+    """Upsert the jobs/subdivisions of a pdss_tracker.json-shaped dict into the store"""
     try:
-        # Backup existing file
-        if pdss_path.exists():
-            backup_path = pdss_path.with_suffix('.json.bak')
-            pdss_path.rename(backup_path)
-        
-        with open(pdss_path, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
-        
-        logger.info(f"PDSS data saved to {pdss_path}")
+        store = get_store()
+        with store.transaction():
+            store.upsert_jobs([dict(job, job_id=job_id) for job_id, job in data.get("jobs", {}).items()])
+            for sub_key, entry in data.get("subdivisions", {}).items():
+                store.upsert_subdivision(sub_key, entry)
+            if data.get("last_sync"):
+                store.set_meta("last_sync", data["last_sync"])
         return True
-    except Exception as e:
+    except sqlite3.Error as e:
         logger.error(f"Failed to save PDSS data: {e}")
         return False
 
+def export_pdss_json(output_path: Path = None) -> str:
+    """Write the store as pdss_tracker.json for anything that still reads the file"""
+    return get_store().export_json(output_path or get_pdss_path())
+
 def export_pdss_csv(output_path: Path = None) -> str:
     """Export PDSS data to CSV"""
-    data = load_pdss_data()
-    
     if output_path is None:
         output_path = OPERATIONS / "PDSS" / f"pdss_export_{datetime.now().strftime('%Y%m%d')}.csv"
     
+    if HAVE_PANDAS:
+        return export_frame(load_jobs_frame(get_store(), PDSS_COLUMNS), output_path, PDSS_COLUMNS)
+    
+    jobs = get_store().jobs()
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     with open(output_path, 'w', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=PDSS_COLUMNS)
         writer.writeheader()
         
-        for job_id, job_data in data.get("jobs", {}).items():
+        for job_id, job_data in jobs.items():
             row = {col: job_data.get(col, "") for col in PDSS_COLUMNS}
             row["job_id"] = job_id
             writer.writerow(row)
@@ -126,9 +117,11 @@ def generate_job_id(builder: str, subdivision: str, lot: str) -> str:
     """Generate unique job ID"""
     return f"{builder[:3].upper()}-{subdivision[:10].upper().replace(' ', '_')}-{lot}"
 
-def scan_folder_structure() -> list:
+def scan_folder_structure(full_rescan: bool = False) -> list:
     """
     Scan Customer Files folder structure to find all jobs.
+    Reads the persistent folder index, re-listing only changed folders
+    (every folder if full_rescan).
     Returns list of job dicts.
     """
     jobs = []
@@ -138,21 +131,18 @@ def scan_folder_structure() -> list:
             continue
         
         customer_path = builder.get("customer_files_path")
-        if not customer_path or not customer_path.exists():
+        if not customer_path:
+            continue
+        snapshot = indexed_snapshot(customer_path, full_rescan=full_rescan)
+        if not snapshot.exists(customer_path):
             continue
         
-        for subdivision_folder in customer_path.iterdir():
-            if not subdivision_folder.is_dir() or subdivision_folder.name.startswith('.'):
-                continue
-            
-            for lot_folder in subdivision_folder.iterdir():
-                if not lot_folder.is_dir() or lot_folder.name.startswith('.'):
-                    continue
-                
+        for subdivision_folder in snapshot.subdirs(customer_path):
+            for lot_folder in snapshot.subdirs(subdivision_folder):
                 job_id = generate_job_id(builder_key, subdivision_folder.name, lot_folder.name)
                 
                 # Count documents
-                doc_count = sum(1 for f in lot_folder.rglob("*") if f.is_file())
+                doc_count = snapshot.file_count(lot_folder)
                 
                 jobs.append({
                     "job_id": job_id,
@@ -165,7 +155,85 @@ def scan_folder_structure() -> list:
     
     return jobs
 
-def sync_pdss_with_folders() -> dict:
+def apply_folder_job(pdss_data: dict, job: dict, sync_results: dict):
+    """Add a job found in the folders to PDSS, or update its document count"""
+    job_id = job["job_id"]
+    
+    if job_id not in pdss_data["jobs"]:
+        # New job - add to PDSS
+        pdss_data["jobs"][job_id] = {
+            "job_id": job_id,
+            "builder": job["builder"],
+            "subdivision": job["subdivision"],
+            "lot": job["lot"],
+            "address": "",
+            "plan_code": "",
+            "plan_status": "New",
+            "takeoff_status": "Not Started",
+            "quote_status": "Not Started",
+            "documents_complete": job["document_count"] > 0,
+            "assigned_to": "",
+            "priority": "Medium",
+            "due_date": "",
+            "notes": "",
+            "created_date": datetime.now().isoformat(),
+            "updated_date": datetime.now().isoformat(),
+        }
+        sync_results["new_jobs"].append(job_id)
+        logger.info(f"Added new job: {job_id}")
+    else:
+        # Existing job - update document count
+        existing = pdss_data["jobs"][job_id]
+        if existing.get("document_count", 0) != job["document_count"]:
+            existing["document_count"] = job["document_count"]
+            existing["documents_complete"] = job["document_count"] > 0
+            existing["updated_date"] = datetime.now().isoformat()
+            sync_results["updated_jobs"].append(job_id)
+        else:
+            sync_results["unchanged"] += 1
+
+def archive_job(pdss_data: dict, job_id: str, sync_results: dict):
+    """Mark a PDSS job whose folder is gone as Archived"""
+    job = pdss_data["jobs"].get(job_id)
+    if job and job.get("plan_status") != "Archived":
+        job["plan_status"] = "Archived"
+        job["updated_date"] = datetime.now().isoformat()
+        sync_results["archived_jobs"].append(job_id)
+        logger.info(f"Archived job (folder missing): {job_id}")
+
+def _changed_jobs(pdss_data: dict, sync_results: dict) -> list:
+    """Job records added, updated or archived during a sync"""
+    changed = sync_results["new_jobs"] + sync_results["updated_jobs"] + sync_results["archived_jobs"]
+    return [pdss_data["jobs"][job_id] for job_id in dict.fromkeys(changed)]
+
+def sync_pdss_jobs(folder_jobs: list, removed_job_ids: list = ()) -> dict:
+    """
+    Update PDSS for just these jobs (used by the folder watcher):
+    add/update the given folder jobs and archive the removed ones.
+    Reads and writes only those rows.
+    """
+    sync_results = {
+        "new_jobs": [],
+        "updated_jobs": [],
+        "archived_jobs": [],
+        "unchanged": 0,
+    }
+    
+    store = get_store()
+    with store.transaction():
+        job_ids = [job["job_id"] for job in folder_jobs] + list(removed_job_ids)
+        pdss_data = {"jobs": store.get_jobs(job_ids)}
+        
+        for job in folder_jobs:
+            apply_folder_job(pdss_data, job, sync_results)
+        for job_id in removed_job_ids:
+            archive_job(pdss_data, job_id, sync_results)
+        
+        store.upsert_jobs(_changed_jobs(pdss_data, sync_results))
+    
+    return sync_results
+
+def sync_pdss_with_folders(full_rescan: bool = False) -> dict:
     """
     Synchronize PDSS tracker with folder structure.
     - Add new jobs found in folders
@@ -174,8 +242,8 @@ def sync_pdss_with_folders() -> dict:
     """
     logger.info("Starting PDSS sync with folder structure")
     
-    pdss_data = load_pdss_data()
-    folder_jobs = scan_folder_structure()
+    # Scan before taking the store's write lock
+    folder_jobs = scan_folder_structure(full_rescan)
     
     sync_results = {
         "new_jobs": [],
@@ -184,62 +252,26 @@ def sync_pdss_with_folders() -> dict:
         "unchanged": 0,
     }
     
-    # Track which jobs exist in folders
-    folder_job_ids = set()
-    
-    # Process folder jobs
-    for job in folder_jobs:
-        job_id = job["job_id"]
-        folder_job_ids.add(job_id)
+    store = get_store()
+    with store.transaction():
+        pdss_data = {"jobs": store.jobs()}
         
-        if job_id not in pdss_data["jobs"]:
-            # New job - add to PDSS
-            pdss_data["jobs"][job_id] = {
-                "job_id": job_id,
-                "builder": job["builder"],
-                "subdivision": job["subdivision"],
-                "lot": job["lot"],
-                "address": "",
-                "plan_code": "",
-                "plan_status": "New",
-                "takeoff_status": "Not Started",
-                "quote_status": "Not Started",
-                "documents_complete": job["document_count"] > 0,
-                "assigned_to": "",
-                "priority": "Medium",
-                "due_date": "",
-                "notes": "",
-                "created_date": datetime.now().isoformat(),
-                "updated_date": datetime.now().isoformat(),
-            }
-            sync_results["new_jobs"].append(job_id)
-            logger.info(f"Added new job: {job_id}")
-        else:
-            # Existing job - update document count
-            existing = pdss_data["jobs"][job_id]
-            if existing.get("document_count", 0) != job["document_count"]:
-                existing["document_count"] = job["document_count"]
-                existing["documents_complete"] = job["document_count"] > 0
-                existing["updated_date"] = datetime.now().isoformat()
-                sync_results["updated_jobs"].append(job_id)
-            else:
-                sync_results["unchanged"] += 1
-    
-    # Check for archived jobs (in PDSS but not in folders)
-    for job_id in list(pdss_data["jobs"].keys()):
-        if job_id not in folder_job_ids:
-            job = pdss_data["jobs"][job_id]
-            if job.get("plan_status") != "Archived":
-                job["plan_status"] = "Archived"
-                job["updated_date"] = datetime.now().isoformat()
-                sync_results["archived_jobs"].append(job_id)
-                logger.info(f"Archived job (folder missing): {job_id}")
-    
-    # Update last sync time
-    pdss_data["last_sync"] = datetime.now().isoformat()
-    
-    # Save updated data
-    save_pdss_data(pdss_data)
+        # Track which jobs exist in folders
+        folder_job_ids = set()
+        
+        # Process folder jobs
+        for job in folder_jobs:
+            folder_job_ids.add(job["job_id"])
+            apply_folder_job(pdss_data, job, sync_results)
+        
+        # Check for archived jobs (in PDSS but not in folders)
+        for job_id in list(pdss_data["jobs"].keys()):
+            if job_id not in folder_job_ids:
+                archive_job(pdss_data, job_id, sync_results)
+        
+        # Save only the changed jobs, and the last sync time
+        store.upsert_jobs(_changed_jobs(pdss_data, sync_results))
+        store.set_meta("last_sync", datetime.now().isoformat())
     
     return sync_results
 
@@ -251,33 +283,38 @@ def update_job_status(job_id: str, updates: dict) -> bool:
         job_id: Job identifier
         updates: dict of field:value to update
     """
-    pdss_data = load_pdss_data()
+    fields = {field: value for field, value in updates.items() if field in PDSS_COLUMNS}
+    fields["updated_date"] = datetime.now().isoformat()
     
-    if job_id not in pdss_data["jobs"]:
+    if not get_store().update_job(job_id, fields):
         logger.error(f"Job not found: {job_id}")
         return False
     
-    job = pdss_data["jobs"][job_id]
-    
-    for field, value in updates.items():
-        if field in PDSS_COLUMNS:
-            job[field] = value
-    
-    job["updated_date"] = datetime.now().isoformat()
-    
-    save_pdss_data(pdss_data)
     logger.info(f"Updated job {job_id}: {updates}")
     
+    # Other machines see the edit through the shared file
+    try:
+        export_pdss_json()
+    except (OSError, sqlite3.Error) as e:
+        logger.error(f"Updated job {job_id} but could not export PDSS JSON: {e}")
+    
     return True
 
 # =============================================================================
 # REPORTING
 # =============================================================================
 
+def _field(job: dict, field: str, default: str) -> str:
+    """Job field, with default for missing or null values (as in the frame summary)"""
+    value = job.get(field)
+    return default if value is None else value
+
 def get_pdss_summary() -> dict:
-    """Get summary statistics from PDSS data"""
-    pdss_data = load_pdss_data()
-    jobs = pdss_data.get("jobs", {})
+    """Get summary statistics from PDSS data (column-wise with pandas)"""
+    if HAVE_PANDAS:
+        return summarize_jobs(load_jobs_frame(get_store()))
+    
+    jobs = get_store().jobs()
     
     summary = {
         "total_jobs": len(jobs),
@@ -298,18 +335,18 @@ def get_pdss_summary() -> dict:
     
     for job_id, job in jobs.items():
         # Count by status
-        status = job.get("plan_status", "New")
+        status = _field(job, "plan_status", "New")
         if status in summary["by_status"]:
             summary["by_status"][status] += 1
         
         # Count by builder
-        builder = job.get("builder", "Unknown")
+        builder = _field(job, "builder", "Unknown")
         if builder not in summary["by_builder"]:
             summary["by_builder"][builder] = 0
         summary["by_builder"][builder] += 1
         
         # Count by priority
-        priority = job.get("priority", "Medium")
+        priority = _field(job, "priority", "Medium")
         if priority in summary["by_priority"]:
             summary["by_priority"][priority] += 1
         
@@ -363,13 +400,14 @@ def format_pdss_report(summary: dict) -> str:
 # MAIN ENTRY POINT
 # =============================================================================
 
-def run_pdss_sync(export_csv: bool = False, send_teams: bool = True) -> dict:
+def run_pdss_sync(export_csv: bool = False, send_teams: bool = True, full_rescan: bool = False) -> dict:
     """
     Run PDSS synchronization.
     
     Args:
         export_csv: Export PDSS to CSV after sync
         send_teams: Send notification to Teams
+        full_rescan: Re-list every folder instead of only changed ones
     
     Returns:
         dict with sync results
@@ -377,7 +415,10 @@ def run_pdss_sync(export_csv: bool = False, send_teams: bool = True) -> dict:
     logger.info("Starting PDSS sync")
     
     # Sync with folder structure
-    sync_results = sync_pdss_with_folders()
+    sync_results = sync_pdss_with_folders(full_rescan)
+    
+    # Keep pdss_tracker.json current for readers of the file
+    sync_results["json_export"] = export_pdss_json()
     
     # Get summary
     summary = get_pdss_summary()
@@ -427,8 +468,13 @@ if __name__ == "__main__":
     parser.add_argument("--sync", action="store_true", help="Run sync with folders")
     parser.add_argument("--summary", action="store_true", help="Show summary only")
     parser.add_argument("--export", action="store_true", help="Export to CSV")
+    parser.add_argument("--export-json", action="store_true", help="Write pdss_tracker.json from the store")
+    parser.add_argument("--export-parquet", type=Path, metavar="PATH", help="Export jobs to Parquet (pandas + pyarrow)")
+    parser.add_argument("--by-subdivision", action="store_true", help="Job counts per subdivision and status (pandas)")
+    parser.add_argument("--due", type=int, metavar="DAYS", help="Open jobs due within DAYS, overdue included (pandas)")
     parser.add_argument("--no-teams", action="store_true", help="Skip Teams notification")
     parser.add_argument("--update", type=str, help="Update job (format: JOB_ID:field=value)")
+    parser.add_argument("--full-rescan", action="store_true", help="Re-list every folder, not just changed ones")
     
     args = parser.parse_args()
     
@@ -444,13 +490,25 @@ if __name__ == "__main__":
     elif args.summary:
         summary = get_pdss_summary()
         print(format_pdss_report(summary))
+    elif (args.export_parquet or args.by_subdivision or args.due is not None) and not HAVE_PANDAS:
+        print("pandas not installed: pip install pandas")
+    elif args.export_parquet:
+        print(f"Exported to: {export_frame(load_jobs_frame(get_store(), PDSS_COLUMNS), args.export_parquet, PDSS_COLUMNS)}")
+    elif args.by_subdivision:
+        print(status_by_group(load_jobs_frame(get_store())).to_string())
+    elif args.due is not None:
+        due = due_window(load_jobs_frame(get_store()), args.due)
+        print(due[["job_id", "subdivision", "lot", "plan_status", "due_date", "overdue"]].to_string(index=False))
+    elif args.export_json:
+        print(f"Exported to: {export_pdss_json()}")
     elif args.export:
         path = export_pdss_csv()
         print(f"Exported to: {path}")
     else:
         results = run_pdss_sync(
             export_csv=args.export,
-            send_teams=not args.no_teams
+            send_teams=not args.no_teams,
+            full_rescan=args.full_rescan,
         )
         print(f"\nNew: {len(results['sync_results']['new_jobs'])}")
         print(f"Updated: {len(results['sync_results']['updated_jobs'])}")
@@ -10,11 +10,17 @@ For manual intake workflow:
 
 import logging
 import shutil
+import time
 import re
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+from services.fs_scanner import invalidate, snapshot_for
+from services.file_transfer import TRANSFER_WORKERS, TransferJournal, TransferTask, transfer_files
+from services.dedupe import DUPLICATE_ACTION, find_copy, settle_duplicate
+
 # Setup logging
 logger = logging.getLogger('plan_intake')
 
@@ -34,16 +40,122 @@ except ImportError:
 # FILE ROUTING LOGIC
 # =============================================================================
 
-def parse_filename(filename: str) -> dict:
-    """
-    Parse a filename to extract lot number, document type, subdivision, etc.
+# Words that indicate document types, not subdivision names
+DOC_TYPE_WORDS = frozenset({
+    'approved', 'combined', 'plans', 'plan', 'drawings', 'drawing',
+    'arch', 'structural', 'struct', 'calcs', 'calc', 'truss',
+    'layout', 'layouts', 'spec', 'specs', 'report', 'reports',
+    'jio', 'hco', 'plot', 'foundation', 'framing', 'roof',
+    'floor', 'elevations', 'sections', 'details', 'schedules',
+    'colorizations', 'renderings', 'permit', 'permits'
+})
+
+# Location-type words subdivision names usually contain (Ridge, Heights, ...)
+SUBDIVISION_INDICATORS = frozenset({
+    'ridge', 'heights', 'estates', 'meadows', 'landing',
+    'crossing', 'grove', 'hills', 'park', 'village',
+    'place', 'creek', 'haven', 'springs', 'woods',
+    'reserve', 'phase'
+})
+
+def looks_like_subdivision(text: str) -> bool:
+    """Check if text looks like a subdivision name vs document type"""
+    words = text.lower().split()
+    # If all words are doc type words, it's not a subdivision
+    if all(w in DOC_TYPE_WORDS for w in words):
+        return False
+    # If it's just 1-2 generic words, probably not a subdivision
+    if len(words) <= 2 and any(w in DOC_TYPE_WORDS for w in words):
+        return False
+    if any(w in SUBDIVISION_INDICATORS for w in words):
+        return True
+    # Check for proper capitalization pattern (Title Case)
+    if text != text.lower() and text != text.upper():
+        return True
+    return False
+
+def _lot_id_subdivision(match, name: str, result: dict):
+    # "13601047 - Coyote Ridge Lot 47 - Spec Home Report"
+    result["lot_id"] = match.group(1)
+    potential_sub = match.group(2).strip()
+    result["lot_number"] = match.group(3)
+    
+    # Get doc type from rest of string
+    rest = name[match.end():].strip(' -_')
+    if rest:
+        result["doc_type"] = rest
+    
+    # Only set subdivision if it looks like one
+    if looks_like_subdivision(potential_sub):
+        result["subdivision"] = potential_sub
+    elif result["doc_type"]:
+        # It was probably a doc type, so include it
+        result["doc_type"] = f"{potential_sub} {result['doc_type']}"
+    else:
+        result["doc_type"] = potential_sub
+
+def _lot_id_text(match, name: str, result: dict):
+    # "13601047 - APPROVED Combined plans lot 47"
+    result["lot_id"] = match.group(1)
+    result["lot_number"] = match.group(3)
+    potential_text = match.group(2).strip()
     
-    Common patterns:
-    - "33750127 JIO.pdf" -> lot=33750127, type=JIO
-    - "ARCH DRAWINGS LOT 127.pdf" -> lot=127, type=ARCH DRAWINGS
-    - "G892 - Ironwood.pdf" -> plan=G892, name=Ironwood
-    - "13601047 - Coyote Ridge Lot 47 - Spec Home Report.pdf" -> lot_id=13601047, subdivision=Coyote Ridge, lot=47
-    """
+    if looks_like_subdivision(potential_text):
+        result["subdivision"] = potential_text
+    else:
+        result["doc_type"] = potential_text
+
+def _lot_id_prefix(match, name: str, result: dict):
+    # "33750127 JIO"
+    result["lot_id"] = match.group(1)
+    result["lot_number"] = match.group(1)
+    result["doc_type"] = match.group(2).strip()
+
+LOT_KEYWORD = re.compile(r'LOT\s*[-_]?\s*(\d+)', re.IGNORECASE)
+
+def _lot_keyword(match, name: str, result: dict):
+    # "ARCH DRAWINGS LOT 127"
+    result["lot_number"] = match.group(1)
+    result["doc_type"] = LOT_KEYWORD.sub('', name).strip()
+
+def _plan_code(match, name: str, result: dict):
+    # "G892 - Ironwood"
+    result["plan_code"] = match.group(1).upper()
+    result["doc_type"] = match.group(2).strip()
+
+def _lot_number_only(match, name: str, result: dict):
+    # "33750127"
+    result["lot_number"] = match.group(1)
+
+# Filename rules, tried in order - the first pattern that matches the stem wins.
+# (pattern, method, handler); method is "match" (anchored) or "search".
+FILENAME_RULES = (
+    (re.compile(r'^(\d{7,8})\s*[-_]\s*([A-Za-z][A-Za-z\s]+?)\s+[Ll]ot\s*(\d+)'), "match", _lot_id_subdivision),
+    (re.compile(r'^(\d{7,8})\s*[-_]\s*(.+?)\s+[Ll]ot\s*(\d+)'), "match", _lot_id_text),
+    (re.compile(r'^(\d{8})\s*[-_]?\s*(.+)$'), "match", _lot_id_prefix),
+    (LOT_KEYWORD, "search", _lot_keyword),
+    (re.compile(r'^([A-Z]\d{2,4}[A-Z]?)\s*[-_]?\s*(.+)$', re.IGNORECASE), "match", _plan_code),
+    (re.compile(r'^(\d{5,8})$'), "match", _lot_number_only),
+)
+
+# Real intake names with their expected parse (checked by --parse-benchmark)
+PARSE_EXAMPLES = (
+    ("33750127 JIO.pdf", {"lot_id": "33750127", "lot_number": "33750127", "doc_type": "JIO"}),
+    ("ARCH DRAWINGS LOT 127.pdf", {"lot_number": "127", "doc_type": "ARCH DRAWINGS"}),
+    ("G892 - Ironwood.pdf", {"plan_code": "G892", "doc_type": "Ironwood"}),
+    ("13601047 - Coyote Ridge Lot 47 - Spec Home Report.pdf",
+     {"lot_id": "13601047", "subdivision": "Coyote Ridge", "lot_number": "47", "doc_type": "Spec Home Report"}),
+    ("13601047 - APPROVED Combined plans lot 47.pdf",
+     {"lot_id": "13601047", "lot_number": "47", "doc_type": "APPROVED Combined plans"}),
+    ("13601047 - Truss Layout Lot 47.pdf",
+     {"lot_id": "13601047", "lot_number": "47", "doc_type": "Truss Layout"}),
+    ("33750127.pdf", {"lot_id": None, "lot_number": "33750127", "doc_type": None}),
+    ("12345.pdf", {"lot_number": "12345"}),
+    ("Plot Plan.pdf", {"doc_type": "Plot Plan"}),
+)
+
+@lru_cache(maxsize=4096)
+def _parse_filename(filename: str) -> dict:
     result = {
         "lot_number": None,
         "lot_id": None,
@@ -55,109 +167,72 @@ def parse_filename(filename: str) -> dict:
     
     name = Path(filename).stem
     
-    # Words that indicate document types, not subdivision names
-    DOC_TYPE_WORDS = {
-        'approved', 'combined', 'plans', 'plan', 'drawings', 'drawing', 
-        'arch', 'structural', 'struct', 'calcs', 'calc', 'truss', 
-        'layout', 'layouts', 'spec', 'specs', 'report', 'reports',
-        'jio', 'hco', 'plot', 'foundation', 'framing', 'roof',
-        'floor', 'elevations', 'sections', 'details', 'schedules',
-        'colorizations', 'renderings', 'permit', 'permits'
-    }
-    
-    def looks_like_subdivision(text: str) -> bool:
-        """Check if text looks like a subdivision name vs document type"""
-        words = text.lower().split()
-        # If all words are doc type words, it's not a subdivision
-        if all(w in DOC_TYPE_WORDS for w in words):
-            return False
-        # If it's just 1-2 generic words, probably not a subdivision
-        if len(words) <= 2 and any(w in DOC_TYPE_WORDS for w in words):
-            return False
-        # Subdivision names usually have proper nouns (capitalized)
-        # or location-type words (Ridge, Heights, Estates, etc.)
-        subdivision_indicators = {'ridge', 'heights', 'estates', 'meadows', 'landing', 
-                                  'crossing', 'grove', 'hills', 'park', 'village',
-                                  'place', 'creek', 'haven', 'springs', 'woods',
-                                  'reserve', 'phase'}
-        if any(w in subdivision_indicators for w in words):
-            return True
-        # Check for proper capitalization pattern (Title Case)
-        if text != text.lower() and text != text.upper():
-            return True
-        return False
-    
-    # Pattern 0: Lot ID with subdivision name
-    # "13601047 - Coyote Ridge Lot 47 - Spec Home Report"
-    match = re.match(r'^(\d{7,8})\s*[-_]\s*([A-Za-z][A-Za-z\s]+?)\s+[Ll]ot\s*(\d+)', name)
-    if match:
-        result["lot_id"] = match.group(1)
-        potential_sub = match.group(2).strip()
-        result["lot_number"] = match.group(3)
-        
-        # Get doc type from rest of string
-        rest = name[match.end():].strip(' -_')
-        if rest:
-            result["doc_type"] = rest
-        
-        # Only set subdivision if it looks like one
-        if looks_like_subdivision(potential_sub):
-            result["subdivision"] = potential_sub
-        else:
-            # It was probably a doc type, so include it
-            if result["doc_type"]:
-                result["doc_type"] = f"{potential_sub} {result['doc_type']}"
-            else:
-                result["doc_type"] = potential_sub
-        
-        return result
-    
-    # Pattern 0b: Lot ID with text but no clear subdivision
-    # "13601047 - APPROVED Combined plans lot 47"
-    match = re.match(r'^(\d{7,8})\s*[-_]\s*(.+?)\s+[Ll]ot\s*(\d+)', name)
-    if match:
-        result["lot_id"] = match.group(1)
-        result["lot_number"] = match.group(3)
-        potential_text = match.group(2).strip()
-        
-        if looks_like_subdivision(potential_text):
-            result["subdivision"] = potential_text
-        else:
-            result["doc_type"] = potential_text
-        return result
-    
-    # Pattern 1: Lot ID at start (e.g., "33750127 JIO")
-    match = re.match(r'^(\d{8})\s*[-_]?\s*(.+)$', name)
-    if match:
-        result["lot_id"] = match.group(1)
-        result["lot_number"] = match.group(1)
-        result["doc_type"] = match.group(2).strip()
-        return result
-    
-    # Pattern 2: LOT keyword (e.g., "ARCH DRAWINGS LOT 127")
-    match = re.search(r'LOT\s*[-_]?\s*(\d+)', name, re.IGNORECASE)
-    if match:
-        result["lot_number"] = match.group(1)
-        result["doc_type"] = re.sub(r'LOT\s*[-_]?\s*\d+', '', name, flags=re.IGNORECASE).strip()
-        return result
-    
-    # Pattern 3: Plan code (e.g., "G892 - Ironwood")
-    match = re.match(r'^([A-Z]\d{2,4}[A-Z]?)\s*[-_]?\s*(.+)$', name, re.IGNORECASE)
-    if match:
-        result["plan_code"] = match.group(1).upper()
-        result["doc_type"] = match.group(2).strip()
-        return result
-    
-    # Pattern 4: Just lot number
-    match = re.match(r'^(\d{5,8})$', name)
-    if match:
-        result["lot_number"] = match.group(1)
-        return result
+    for pattern, method, handler in FILENAME_RULES:
+        match = pattern.match(name) if method == "match" else pattern.search(name)
+        if match:
+            handler(match, name, result)
+            return result
     
     # No pattern matched - use full name as doc type
     result["doc_type"] = name
     return result
 
+def parse_filename(filename: str) -> dict:
+    """
+    Parse a filename to extract lot number, document type, subdivision, etc.
+    
+    Common patterns:
+    - "33750127 JIO.pdf" -> lot=33750127, type=JIO
+    - "ARCH DRAWINGS LOT 127.pdf" -> lot=127, type=ARCH DRAWINGS
+    - "G892 - Ironwood.pdf" -> plan=G892, name=Ironwood
+    - "13601047 - Coyote Ridge Lot 47 - Spec Home Report.pdf" -> lot_id=13601047, subdivision=Coyote Ridge, lot=47
+    
+    Results are cached per filename; callers get their own copy.
+    """
+    return dict(_parse_filename(filename))
+
+def parse_many(filenames) -> list:
+    """parse_filename() for a list of names, parsing each distinct name once"""
+    parsed = {name: _parse_filename(name) for name in dict.fromkeys(filenames)}
+    return [dict(parsed[name]) for name in filenames]
+
+def run_parse_benchmark(filenames: list = None, repeat: int = 20) -> dict:
+    """
+    Check PARSE_EXAMPLES and time parse_many() over real file names
+    (intake files plus everything under active Customer Files by default).
+    """
+    failures = []
+    for filename, expected in PARSE_EXAMPLES:
+        parsed = parse_filename(filename)
+        wrong = {k: parsed[k] for k, v in expected.items() if parsed[k] != v}
+        if wrong:
+            failures.append({"file": filename, "expected": expected, "got": wrong})
+    
+    if filenames is None:
+        filenames = [f["filename"] for f in scan_intake_folder()]
+        for builder in BUILDERS.values():
+            customer_path = builder.get("customer_files_path")
+            if builder.get("active") and customer_path:
+                filenames.extend(f.path.name for f in snapshot_for(customer_path).files_under(customer_path))
+    
+    _parse_filename.cache_clear()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        parse_many(filenames)
+    seconds = time.perf_counter() - started
+    parsed = parse_many(filenames)
+    
+    return {
+        "examples": len(PARSE_EXAMPLES),
+        "example_failures": failures,
+        "filenames": len(filenames),
+        "distinct": len(set(filenames)),
+        "with_lot_number": sum(1 for p in parsed if p["lot_number"]),
+        "with_subdivision": sum(1 for p in parsed if p["subdivision"]),
+        "repeat": repeat,
+        "seconds": round(seconds, 4),
+        "cache": _parse_filename.cache_info()._asdict(),
+    }
 
 def detect_subdivision_from_files(files: list) -> dict:
     """
@@ -167,12 +242,8 @@ def detect_subdivision_from_files(files: list) -> dict:
     """
     detected = {}
     
-    for file_info in files:
-        if file_info.get("subdivision"):
-            continue  # Already has subdivision
-            
-        parsed = parse_filename(file_info["filename"])
-        
+    pending = [f for f in files if not f.get("subdivision")]  # Skip files that already have one
+    for file_info, parsed in zip(pending, parse_many([f["filename"] for f in pending])):
         if parsed.get("subdivision"):
             sub_name = parsed["subdivision"]
             if sub_name not in detected:
@@ -263,6 +334,7 @@ def prompt_create_subdivision(subdivision_info: dict, auto_create: bool = False)
                         moved += 1
                     except Exception as e:
                         logger.error(f"Failed to move {src.name}: {e}")
+                invalidate(intake_path)
                 
                 return {
                     "action": "created",
@@ -322,6 +394,7 @@ def prompt_create_subdivision(subdivision_info: dict, auto_create: bool = False)
                     moved += 1
                 except Exception as e:
                     logger.error(f"Failed to move {src.name}: {e}")
+            invalidate(sub_intake_path)
             
             print(f"\n✅ Created folders for {sub_name}")
             print(f"   Moved {moved} files to 00_Intake/{builder_display}/{sub_name}/")
@@ -382,56 +455,62 @@ def determine_destination(file_path: Path, builder_key: str, subdivision: str =
     
     return None
 
+# Category keywords, compiled once (substring match, case-insensitive)
+PLAN_KEYWORDS = re.compile(
+    '|'.join(['arch', 'drawing', 'plan', 'truss', 'calc', 'structural',
+              'floor', 'roof', 'elevation', 'layout']),
+    re.IGNORECASE,
+)
+PO_KEYWORDS = re.compile('|'.join(['po', 'purchase', 'order', 'jio', 'hco', 'epo']), re.IGNORECASE)
+
 def categorize_document(filename: str) -> str:
     """
     Categorize document into subfolder based on filename.
     Returns subfolder name: "Plans and Layouts", "POs", etc.
     """
-    name_lower = filename.lower()
-    
     # Plans category
-    plan_keywords = ['arch', 'drawing', 'plan', 'truss', 'calc', 'structural', 
-                     'floor', 'roof', 'elevation', 'layout']
-    if any(kw in name_lower for kw in plan_keywords):
+    if PLAN_KEYWORDS.search(filename):
         return "Plans and Layouts"
     
     # PO category
-    po_keywords = ['po', 'purchase', 'order', 'jio', 'hco', 'epo']
-    if any(kw in name_lower for kw in po_keywords):
+    if PO_KEYWORDS.search(filename):
         return "POs"
     
     # Default to Plans
     return "Plans and Layouts"
 
-def route_file(file_path: Path, builder_key: str, subdivision: str, lot_folder: str = None) -> dict:
+def plan_route(file_path: Path, builder_key: str, subdivision: str, lot_folder: str = None,
+               reserved: set = None) -> dict:
     """
-    Route a single file from Intake to Customer Files.
+    Work out where a file from Intake goes, without touching Customer Files.
     
     Args:
         file_path: Source file in Intake folder
         builder_key: Builder identifier
         subdivision: Subdivision name
         lot_folder: Optional lot folder name (e.g., "Lot 127")
+        reserved: Destinations already planned in this run; the chosen one
+                  is added, so two intake files never target the same path
     
     Returns:
-        dict with success status and destination
+        dict with "destination" (Path) and its lot/subdivision "folder", or "error"
     """
-    result = {
-        "source": str(file_path),
-        "success": False,
+    plan = {
+        "source": file_path,
         "destination": None,
+        "folder": None,
         "error": None,
     }
     
     builder = BUILDERS.get(builder_key)
     if not builder:
-        result["error"] = f"Unknown builder: {builder_key}"
-        return result
+        plan["error"] = f"Unknown builder: {builder_key}"
+        return plan
     
     customer_path = builder.get("customer_files_path")
     if not customer_path:
-        result["error"] = "No customer files path configured"
-        return result
+        plan["error"] = "No customer files path configured"
+        return plan
     
     # Determine destination
     if lot_folder:
@@ -445,38 +524,89 @@ def route_file(file_path: Path, builder_key: str, subdivision: str, lot_folder:
             # Plan-level document
             dest_folder = customer_path / subdivision
     
-    # Create destination folder if needed
-    dest_folder.mkdir(parents=True, exist_ok=True)
-    
     # Categorize into subfolder
-    subfolder = categorize_document(file_path.name)
-    final_dest = dest_folder / subfolder
-    final_dest.mkdir(parents=True, exist_ok=True)
-    
-    # Copy file
+    final_dest = dest_folder / categorize_document(file_path.name)
     dest_file = final_dest / file_path.name
     
+    # Add timestamp to avoid overwrite (and a counter within one run)
+    reserved = reserved if reserved is not None else set()
+    if dest_file.exists() or dest_file in reserved:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        candidate = final_dest / f"{dest_file.stem}_{timestamp}{dest_file.suffix}"
+        n = 1
+        while candidate.exists() or candidate in reserved:
+            n += 1
+            candidate = final_dest / f"{dest_file.stem}_{timestamp}_{n}{dest_file.suffix}"
+        dest_file = candidate
+    
+    reserved.add(dest_file)
+    plan["destination"] = dest_file
+    plan["folder"] = dest_folder
+    return plan
+
+def resolve_duplicate(plan: dict, batch: list = ()) -> Optional[dict]:
+    """
+    Check a planned file against the content already in its destination
+    folder (and `batch`, files planned for that folder earlier in this run).
+    
+    A duplicate is settled per STO_INTAKE_DUPLICATES instead of being saved
+    again as name_YYYYMMDD_HHMMSS.pdf. Returns None if the file should be
+    routed, else a dict with "duplicate_of" and "action" (skipped/linked).
+    """
+    if DUPLICATE_ACTION == "keep":
+        return None
+    
+    source = plan["source"]
     try:
-        # Check if file already exists
-        if dest_file.exists():
-            # Add timestamp to avoid overwrite
-            stem = dest_file.stem
-            suffix = dest_file.suffix
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            dest_file = final_dest / f"{stem}_{timestamp}{suffix}"
-        
-        shutil.copy2(file_path, dest_file)
-        result["success"] = True
-        result["destination"] = str(dest_file)
-        
-        # Remove from intake after successful copy
-        file_path.unlink()
-        logger.info(f"Routed: {file_path.name} -> {dest_file}")
-        
-    except Exception as e:
+        existing = find_copy(source, plan["destination"].parent, batch)
+        if not existing:
+            return None
+        # A batch match is still in Intake - nothing to link to yet
+        destination = None if existing in batch else plan["destination"]
+        action = settle_duplicate(source, existing, destination, DUPLICATE_ACTION)
+    except OSError as e:
+        logger.warning(f"Duplicate check failed for {source.name}: {e}")
+        return None
+    
+    return {"duplicate_of": str(existing), "action": action}
+
+def route_file(file_path: Path, builder_key: str, subdivision: str, lot_folder: str = None) -> dict:
+    """
+    Route a single file from Intake to Customer Files.
+    
+    Args:
+        file_path: Source file in Intake folder
+        builder_key: Builder identifier
+        subdivision: Subdivision name
+        lot_folder: Optional lot folder name (e.g., "Lot 127")
+    
+    Returns:
+        dict with success status and destination
+    """
+    result = {
+        "source": str(file_path),
+        "success": False,
+        "destination": None,
+        "error": None,
+    }
+    
+    plan = plan_route(file_path, builder_key, subdivision, lot_folder)
+    if plan["error"]:
+        result["error"] = plan["error"]
+        return result
+    
+    duplicate = resolve_duplicate(plan)
+    if duplicate:
+        result.update(duplicate, success=True)
+        return result
+    
+    try:
+        task = TransferTask.for_file(file_path, plan["destination"])
+    except OSError as e:
         result["error"] = str(e)
-        logger.error(f"Failed to route {file_path.name}: {e}")
+        return result
     
+    result.update(transfer_files([task], workers=1)[0])
     return result
 
 # =============================================================================
@@ -520,14 +650,25 @@ def scan_intake_folder(builder_key: str = None) -> list:
     
     return files
 
-def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_create: bool = False) -> dict:
+def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_create: bool = False,
+                         workers: int = TRANSFER_WORKERS) -> dict:
     """
     Process all files in intake queue.
     
+    Files with a subdivision folder are routed in two phases: a planning
+    phase (parse, categorize, pick unique destinations) and a transfer
+    phase that moves them on a pool of `workers` threads. Transfers are
+    journaled; moves left unfinished by an interrupted run are settled
+    first, so re-running never routes a file twice.
+    
+    Files whose content is already in the destination folder (or planned
+    for it earlier in the run) are settled as duplicates, not routed.
+    
     Args:
         builder_key: Optional - only process this builder
         dry_run: If True, don't actually move files
         auto_create: If True, auto-create detected subdivisions without prompting
+        workers: Concurrent transfers (1 = one at a time)
     
     Returns:
         dict with processing results
@@ -537,11 +678,16 @@ def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_cr
         "files_found": 0,
         "files_routed": 0,
         "files_skipped": 0,
+        "files_duplicate": 0,
         "files_failed": 0,
         "subdivisions_created": [],
         "details": [],
     }
     
+    journal = TransferJournal()
+    if not dry_run:
+        results["recovered"] = journal.recover()
+    
     files = scan_intake_folder(builder_key)
     results["files_found"] = len(files)
     
@@ -617,8 +763,7 @@ def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_cr
                     }
                     
                     # Extract any lot info we can
-                    for bf in builder_files:
-                        parsed = parse_filename(bf['filename'])
+                    for parsed in parse_many([bf['filename'] for bf in builder_files]):
                         if parsed.get('lot_number'):
                             orphan_info['lots'].append(parsed['lot_number'])
                         if parsed.get('lot_id') and not orphan_info['lot_prefix']:
@@ -659,6 +804,10 @@ def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_cr
         files = scan_intake_folder(builder_key)
     
     # Second pass: process files that have subdivision folders
+    # Planning phase - destinations only, nothing is moved yet
+    reserved = set()
+    planned = []
+    planned_by_folder = {}
     for file_info in files:
         if not file_info.get("subdivision"):
             # Already handled above
@@ -672,13 +821,39 @@ def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_cr
             })
             continue
         
-        # Route the file
-        route_result = route_file(
+        plan = plan_route(
             file_path=file_info["path"],
             builder_key=file_info["builder"],
             subdivision=file_info["subdivision"],
+            reserved=reserved,
         )
+        if plan["error"]:
+            results["files_failed"] += 1
+            results["details"].append({
+                "file": file_info["filename"],
+                "status": "failed",
+                "destination": None,
+                "error": plan["error"],
+            })
+            continue
         
+        batch = planned_by_folder.setdefault(plan["destination"].parent, [])
+        duplicate = resolve_duplicate(plan, batch)
+        if duplicate:
+            if duplicate["action"] == "skipped":
+                reserved.discard(plan["destination"])
+            results["files_duplicate"] += 1
+            results["details"].append(dict(duplicate, file=file_info["filename"], status="duplicate"))
+            continue
+        batch.append(file_info["path"])
+        
+        task = TransferTask(file_info["path"], plan["destination"],
+                            file_info["size"], file_info["modified"].timestamp())
+        planned.append((file_info, task))
+    
+    # Transfer phase - parallel, journaled moves
+    transfers = transfer_files([task for _, task in planned], workers=workers, journal=journal)
+    for (file_info, _), route_result in zip(planned, transfers):
         if route_result["success"]:
             results["files_routed"] += 1
         else:
@@ -691,6 +866,10 @@ def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_cr
             "error": route_result.get("error"),
         })
     
+    # Files moved into Customer Files - drop cached folder snapshots
+    if results["files_routed"] or results["files_duplicate"] or results["subdivisions_created"]:
+        invalidate()
+    
     results["end_time"] = datetime.now().isoformat()
     
     return results
@@ -784,7 +963,8 @@ def run_plan_intake(check_portals: bool = True, process_queue: bool = True) -> d
                 datetime.fromisoformat(results["start_time"])).total_seconds()
     
     logger.info(f"Plan Intake complete: {len(results['plans_downloaded'])} plans downloaded, "
-                f"{results.get('intake_processed', {}).get('files_routed', 0)} files routed")
+                f"{results.get('intake_processed', {}).get('files_routed', 0)} files routed, "
+                f"{results.get('intake_processed', {}).get('files_duplicate', 0)} duplicates")
     
     return results
 
@@ -801,16 +981,22 @@ if __name__ == "__main__":
     parser.add_argument("--process", action="store_true", help="Process intake queue")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be done")
     parser.add_argument("--builder", type=str, help="Process only this builder")
+    parser.add_argument("--workers", type=int, default=TRANSFER_WORKERS,
+                        help=f"Concurrent file transfers (default {TRANSFER_WORKERS})")
+    parser.add_argument("--parse-benchmark", action="store_true",
+                        help="Check filename parsing examples and time it over real file names")
     
     args = parser.parse_args()
     
-    if args.scan:
+    if args.parse_benchmark:
+        print(json.dumps(run_parse_benchmark(), indent=2, default=str))
+    elif args.scan:
         files = scan_intake_folder(args.builder)
         print(f"\nFound {len(files)} files in intake:")
         for f in files:
             print(f"  [{f['builder']}] {f['subdivision'] or 'root'}/{f['filename']}")
     elif args.process or args.dry_run:
-        results = process_intake_queue(args.builder, dry_run=args.dry_run)
+        results = process_intake_queue(args.builder, dry_run=args.dry_run, workers=args.workers)
         print(json.dumps(results, indent=2, default=str))
     else:
         results = run_plan_intake()
@@ -6,13 +6,17 @@ Sends formatted Teams notification with filtered community data.
 
 import os
 import json
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Optional
+from functools import lru_cache
 import re
 
+from services.community_resolver import CommunityResolver
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(levelname)s | %(message)s')
 logger = logging.getLogger('supplypro_reporter')
@@ -163,36 +167,32 @@ def extract_community_from_folder(folder: str, community_field: str = "") -> str
     
     return folder
 
+# Lot prefix to community mapping (Richmond American Portland Division specific)
+LOT_PREFIX_TO_COMMUNITY = {
+    "33750": "North Haven Phase 4",      # North Haven lots 95-148+
+    "36190": "Luden Estates Phase 3",    # Luden lots
+    "34040": "Verona Heights",           # Verona lots
+    "35800": "Reserve at Battle Creek",  # Battle Creek lots
+}
+
+@lru_cache(maxsize=16)
+def _community_resolver(communities: tuple) -> CommunityResolver:
+    return CommunityResolver(communities, LOT_PREFIX_TO_COMMUNITY)
+
 def is_monitored_community(community: str, config: dict) -> bool:
     """Check if community is in the monitored list"""
     if not community:
         return False
     
-    monitored = config.get("monitored_communities", [])
-    community_lower = community.lower()
-    
-    for m in monitored:
-        if m.lower() in community_lower or community_lower in m.lower():
-            return True
-    return False
+    monitored = tuple(config.get("monitored_communities", []))
+    return _community_resolver(monitored).is_monitored(community)
 
 def get_community_from_lot_prefix(lot_id: str) -> str:
     """
     Map lot prefix to community based on known patterns.
     This is Richmond American Portland Division specific.
     """
-    lot_prefixes = {
-        "33750": "North Haven Phase 4",      # North Haven lots 95-148+
-        "36190": "Luden Estates Phase 3",    # Luden lots
-        "34040": "Verona Heights",           # Verona lots
-        "35800": "Reserve at Battle Creek",  # Battle Creek lots
-    }
-    
-    for prefix, community in lot_prefixes.items():
-        if lot_id.startswith(prefix):
-            return community
-    
-    return "Unknown"
+    return _community_resolver(()).community_for_lot(lot_id)
 
 # =============================================================================
 # REPORT FORMATTING
@@ -497,30 +497,82 @@ def get_mock_report() -> SupplyProReport:
     return report
 
 # =============================================================================
-# PLAYWRIGHT SCRAPER (to be implemented)
+# PLAYWRIGHT SCRAPER
 # =============================================================================
 
+def _bool_cell(value: str) -> bool:
+    return (value or "").strip().lower() in ("yes", "true", "y", "1")
+
 async def scrape_supplypro(config: dict) -> SupplyProReport:
     """
     Scrape SupplyPro portal using Playwright.
     Returns a SupplyProReport with all data.
     
-    PLACEHOLDER - to be implemented when credentials are configured.
+    Logs in only when the saved browser session has expired, then loads the
+    dashboard, EPO report and new documents list in parallel (see
+    services/supplypro_scraper.py). Needs SUPPLYPRO_USER / SUPPLYPRO_PASS.
     """
-    logger.info("SupplyPro scraper would run here with Playwright")
-    logger.info("For now, returning mock data for testing")
-    
-    # TODO: Implement actual scraping:
-    # 1. Login to SupplyPro
-    # 2. Scrape dashboard numbers
-    # 3. Navigate to Reports > EPO Report
-    # 4. Run report with date filter
-    # 5. Export to Excel or scrape table
-    # 6. Navigate to New Documents List
-    # 7. Filter by date range
-    # 8. Scrape document list
-    
-    return get_mock_report()
+    from services.supplypro_scraper import SupplyProScraper
+    
+    scraper = SupplyProScraper(
+        config["url"],
+        os.environ.get("SUPPLYPRO_USER", ""),
+        os.environ.get("SUPPLYPRO_PASS", ""),
+        account=config.get("account"),
+    )
+    result = await scraper.scrape(
+        epo_days_back=config.get("epo_days_back", 30),
+        documents_days_back=config.get("documents_days_back", 7),
+    )
+    logger.info(f"Scraped SupplyPro: {len(result.epos)} EPOs, {len(result.documents)} documents "
+                f"(login: {result.logged_in}, sources: {result.sources})")
+    
+    epos = []
+    for row in result.epos:
+        job_name = row.get("job_name", "")
+        lot_number, address = parse_job_name(job_name)
+        epos.append(EPORecord(
+            account=row.get("account", ""),
+            community=row.get("community") or get_community_from_lot_prefix(job_name),
+            job_name=job_name,
+            lot_number=lot_number,
+            address=address,
+            task=row.get("task", ""),
+            supplier_order=row.get("supplier_order", ""),
+            submitted_date=row.get("submitted_date", ""),
+            task_status=row.get("task_status", ""),
+            epo_status=row.get("epo_status", ""),
+            amount=parse_amount(row.get("amount", "")),
+        ))
+    
+    documents = []
+    for row in result.documents:
+        folder = row.get("folder", "")
+        lot_number, address = parse_job_name(row.get("job_name") or folder)
+        revision = row.get("revision", "")
+        documents.append(DocumentRecord(
+            builder=row.get("builder", ""),
+            folder=folder,
+            community=(extract_community_from_folder(folder, row.get("community", ""))
+                       or get_community_from_lot_prefix(folder)),
+            lot_number=lot_number,
+            address=address,
+            doc_name=row.get("doc_name", ""),
+            doc_type=row.get("doc_type", ""),
+            size=row.get("size", ""),
+            revision=int(revision) if revision.isdigit() else 0,
+            date_added=row.get("date_added", ""),
+            uploaded_by=row.get("uploaded_by", ""),
+            viewed=_bool_cell(row.get("viewed", "")),
+        ))
+    
+    return SupplyProReport(
+        report_date=datetime.now().strftime("%B %d, %Y"),
+        dashboard=DashboardData(**result.dashboard),
+        epos=epos,
+        documents=documents,
+        errors=result.errors,
+    )
 
 # =============================================================================
 # MAIN ENTRY POINTS
@@ -540,9 +592,16 @@ def run_supplypro_report(send_teams: bool = True, save_report: bool = True) -> d
     logger.info("Starting SupplyPro Daily Report")
     
     try:
-        # For now, use mock data
-        # When Playwright is ready: report = asyncio.run(scrape_supplypro(SUPPLYPRO_CONFIG))
-        report = get_mock_report()
+        if os.environ.get("SUPPLYPRO_USER") and os.environ.get("SUPPLYPRO_PASS"):
+            from services.supplypro_scraper import ScraperUnavailable
+            try:
+                report = asyncio.run(scrape_supplypro(SUPPLYPRO_CONFIG))
+            except ScraperUnavailable as e:
+                logger.warning(f"SupplyPro scraper unavailable ({e}), using mock data")
+                report = get_mock_report()
+        else:
+            logger.warning("SUPPLYPRO_USER/SUPPLYPRO_PASS not set, using mock data")
+            report = get_mock_report()
         
         # Format reports
         teams_report = format_teams_report(report, SUPPLYPRO_CONFIG)
@@ -9,6 +9,10 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from services.community_resolver import CommunityResolver
+from services.fs_scanner import snapshot_for
+from services.folder_index import indexed_snapshot
+
 # =============================================================================
 # PATH CONFIGURATION
 # =============================================================================
@@ -166,6 +170,8 @@ LOT_PREFIX_TO_COMMUNITY = {
     "36199": "Luden Estates Phase 3",
 }
 
+LOT_RESOLVER = CommunityResolver([], LOT_PREFIX_TO_COMMUNITY)
+
 # =============================================================================
 # AUTO-DETECTION FUNCTIONS
 # =============================================================================
@@ -180,15 +186,11 @@ def get_active_subdivisions(builder_key: str) -> list:
         return []
     
     customer_path = builder.get("customer_files_path")
-    if not customer_path or not customer_path.exists():
+    if not customer_path:
         return []
     
-    subdivisions = []
-    for item in customer_path.iterdir():
-        if item.is_dir() and not item.name.startswith('.'):
-            subdivisions.append(item.name)
-    
-    return sorted(subdivisions)
+    snapshot = snapshot_for(customer_path)
+    return [item.name for item in snapshot.subdirs(customer_path)]
 
 def get_active_jobs(builder_key: str, subdivision: str = None) -> list:
     """
@@ -200,31 +202,23 @@ def get_active_jobs(builder_key: str, subdivision: str = None) -> list:
         return []
     
     customer_path = builder.get("customer_files_path")
-    if not customer_path or not customer_path.exists():
+    if not customer_path:
         return []
     
-    jobs = []
-    
+    snapshot = snapshot_for(customer_path)
     if subdivision:
-        sub_path = customer_path / subdivision
-        if sub_path.exists():
-            for lot in sub_path.iterdir():
-                if lot.is_dir() and not lot.name.startswith('.'):
-                    jobs.append({
-                        "subdivision": subdivision,
-                        "lot": lot.name,
-                        "path": lot,
-                    })
+        subdivisions = [customer_path / subdivision]
     else:
-        for sub in customer_path.iterdir():
-            if sub.is_dir() and not sub.name.startswith('.'):
-                for lot in sub.iterdir():
-                    if lot.is_dir() and not lot.name.startswith('.'):
-                        jobs.append({
-                            "subdivision": sub.name,
-                            "lot": lot.name,
-                            "path": lot,
-                        })
+        subdivisions = snapshot.subdirs(customer_path)
+    
+    jobs = []
+    for sub in subdivisions:
+        for lot in snapshot.subdirs(sub):
+            jobs.append({
+                "subdivision": sub.name,
+                "lot": lot.name,
+                "path": lot,
+            })
     
     return jobs
 
@@ -236,41 +230,30 @@ def get_intake_files(builder_key: str = None) -> list:
     files = []
     
     if builder_key:
-        builder = BUILDERS.get(builder_key)
-        if builder and builder.get("intake_path"):
-            intake_path = builder["intake_path"]
-            if intake_path.exists():
-                for f in intake_path.rglob("*"):
-                    if f.is_file():
-                        files.append({
-                            "builder": builder_key,
-                            "path": f,
-                            "name": f.name,
-                            "size": f.stat().st_size,
-                            "modified": datetime.fromtimestamp(f.stat().st_mtime),
-                        })
+        builders = {builder_key: BUILDERS.get(builder_key) or {}}
     else:
         # Scan all builders
-        for bkey, builder in BUILDERS.items():
-            if builder.get("intake_path") and builder["intake_path"].exists():
-                for f in builder["intake_path"].rglob("*"):
-                    if f.is_file():
-                        files.append({
-                            "builder": bkey,
-                            "path": f,
-                            "name": f.name,
-                            "size": f.stat().st_size,
-                            "modified": datetime.fromtimestamp(f.stat().st_mtime),
-                        })
+        builders = BUILDERS
+    
+    for bkey, builder in builders.items():
+        intake_path = builder.get("intake_path")
+        if not intake_path:
+            continue
+        # Size and mtime come from the persistent folder index, not per-file stat()
+        for f in indexed_snapshot(intake_path).files_under(intake_path):
+            files.append({
+                "builder": bkey,
+                "path": f.path,
+                "name": f.name,
+                "size": f.size,
+                "modified": datetime.fromtimestamp(f.mtime),
+            })
     
     return sorted(files, key=lambda x: x["modified"], reverse=True)
 
 def get_community_from_lot_id(lot_id: str) -> str:
     """Map a lot ID to its community based on prefix"""
-    for prefix, community in LOT_PREFIX_TO_COMMUNITY.items():
-        if lot_id.startswith(prefix):
-            return community
-    return "Unknown"
+    return LOT_RESOLVER.community_for_lot(lot_id)
 
 # =============================================================================
 # TEAMS WEBHOOK CONFIGURATION
@@ -14,6 +14,8 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
+from services.folder_index import indexed_snapshot
+
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
@@ -380,8 +382,8 @@ def show_intake_queue():
 # SUMMARY
 # =============================================================================
 
-def show_summary():
-    """Show summary of all builders and jobs"""
+def show_summary(full_rescan: bool = False):
+    """Show summary of all builders and jobs (from the persistent folder index)"""
     root = get_root_path()
     
     print("\n📊 Structure Summary:")
@@ -397,16 +399,16 @@ def show_summary():
     
     for builder in CUSTOMER_FILES_BUILDERS:
         builder_path = customer_path / builder
-        if not builder_path.exists():
+        snapshot = indexed_snapshot(builder_path, full_rescan=full_rescan)
+        if not snapshot.exists(builder_path):
             continue
         
-        subdivisions = auto_detect_subdivisions(builder)
-        job_count = 0
-        
-        for sub in subdivisions:
-            sub_path = builder_path / sub
-            lots = [d for d in sub_path.iterdir() if d.is_dir()]
-            job_count += len(lots)
+        subdivisions = [sub.name for sub in snapshot.subdirs(builder_path)]
+        lot_counts = {
+            sub: len(snapshot.subdirs(builder_path / sub, include_hidden=True))
+            for sub in subdivisions
+        }
+        job_count = sum(lot_counts.values())
         
         total_subdivisions += len(subdivisions)
         total_jobs += job_count
@@ -417,9 +419,7 @@ def show_summary():
         
         if subdivisions:
             for sub in subdivisions[:5]:
-                sub_path = builder_path / sub
-                lots = [d for d in sub_path.iterdir() if d.is_dir()]
-                print(f"      • {sub} ({len(lots)} lots)")
+                print(f"      • {sub} ({lot_counts[sub]} lots)")
             if len(subdivisions) > 5:
                 print(f"      ... and {len(subdivisions) - 5} more")
     
@@ -568,6 +568,7 @@ if __name__ == "__main__":
     parser.add_argument("--create", action="store_true", help="Create missing folders")
     parser.add_argument("--summary", action="store_true", help="Show summary")
     parser.add_argument("--intake", action="store_true", help="Show intake queue")
+    parser.add_argument("--full-rescan", action="store_true", help="Re-list every folder for --summary")
     
     args = parser.parse_args()
     
@@ -579,7 +580,7 @@ if __name__ == "__main__":
         create_missing_folders()
     elif args.summary:
         print_header()
-        show_summary()
+        show_summary(args.full_rescan)
     elif args.intake:
         print_header()
         show_intake_queue()
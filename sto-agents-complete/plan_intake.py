@@ -15,6 +15,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from services.fs_scanner import invalidate
+
 # Setup logging
 logger = logging.getLogger('plan_intake')
 
@@ -263,6 +265,7 @@ def prompt_create_subdivision(subdivision_info: dict, auto_create: bool = False)
                         moved += 1
                     except Exception as e:
                         logger.error(f"Failed to move {src.name}: {e}")
+                invalidate(intake_path)
                 
                 return {
                     "action": "created",
@@ -322,6 +325,7 @@ def prompt_create_subdivision(subdivision_info: dict, auto_create: bool = False)
                     moved += 1
                 except Exception as e:
                     logger.error(f"Failed to move {src.name}: {e}")
+            invalidate(sub_intake_path)
             
             print(f"\n✅ Created folders for {sub_name}")
             print(f"   Moved {moved} files to 00_Intake/{builder_display}/{sub_name}/")
@@ -691,6 +695,10 @@ def process_intake_queue(builder_key: str = None, dry_run: bool = False, auto_cr
             "error": route_result.get("error"),
         })
     
+    # Files moved into Customer Files - drop cached folder snapshots
+    if results["files_routed"] or results["subdivisions_created"]:
+        invalidate()
+    
     results["end_time"] = datetime.now().isoformat()
     
     return results
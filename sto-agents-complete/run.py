@@ -10,21 +10,32 @@ Manor Homes, and Sekisui House operations.
 import argparse
 import json
 import logging
+import os
 import sys
 from datetime import datetime
+from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 
-# Configure logging
+# Configure logging: one file rotated at midnight (sto_agents.log.YYYY-MM-DD)
+# instead of a new sto_agents_<date>.log per day
 LOG_DIR = Path(__file__).parent / "data" / "logs"
 LOG_DIR.mkdir(parents=True, exist_ok=True)
+LOG_RETENTION_DAYS = 30
+
+_file_handler = TimedRotatingFileHandler(
+    LOG_DIR / "sto_agents.log",
+    when='midnight',
+    backupCount=LOG_RETENTION_DAYS,
+    encoding='utf-8',
+)
 
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.environ.get("LOG_LEVEL", "INFO"),
     format='%(asctime)s | %(name)s | %(levelname)s | %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S',
     handlers=[
         logging.StreamHandler(sys.stdout),
-        logging.FileHandler(LOG_DIR / f"sto_agents_{datetime.now().strftime('%Y-%m-%d')}.log")
+        _file_handler,
     ]
 )
 logger = logging.getLogger('orchestrator')
@@ -82,6 +93,13 @@ def import_agents():
         logger.warning(f"Could not import backup_agent: {e}")
         agents['backup'] = None
     
+    try:
+        from agents.folder_watcher import run_folder_watcher
+        agents['watcher'] = run_folder_watcher
+    except ImportError as e:
+        logger.warning(f"Could not import folder_watcher: {e}")
+        agents['watcher'] = None
+    
     try:
         from agents.supplypro_reporter import run_supplypro_report
         agents['supplypro'] = run_supplypro_report
@@ -229,6 +247,7 @@ Examples:
   python run.py --agent pdss_sync      Run PDSS sync
   python run.py --agent backup         Run backup agent
   python run.py --agent supplypro      Run SupplyPro reporter
+  python run.py --watch                Keep completeness/PDSS current as files change
         """
     )
     
@@ -237,6 +256,8 @@ Examples:
                         help='Run morning routine (portal check + completeness + PDSS + SupplyPro)')
     parser.add_argument('--evening', action='store_true',
                         help='Run evening routine (PDSS sync + nightly backup)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Watch Customer Files and intake; re-check changed lots as they change')
     
     # Individual agent options
     parser.add_argument('--agent', type=str,
@@ -264,6 +285,8 @@ Examples:
         results = run_morning_routine(agents)
     elif args.evening:
         results = run_evening_routine(agents)
+    elif args.watch:
+        results = run_single_agent(agents, 'watcher')
     elif args.agent:
         kwargs = {}
         if args.agent == 'completeness' and args.builder:
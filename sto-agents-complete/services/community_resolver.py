@@ -0,0 +1,211 @@
+"""
+Community Resolver - Lot prefix and community name lookups
+
+SupplyPro rows name their community loosely ("North Haven",
+"NORTH HAVEN - PHASE 4", "Luden Estates Ph 3 Lot 12") or only carry a
+lot number ("33750115"). The reporter used to resolve these with a loop
+over the prefix table and a bidirectional substring check against every
+monitored community, for every EPO and document.
+
+This module builds both lookups once and caches results by raw string,
+since the same few names repeat on every row:
+- lot prefixes go into a character trie; the longest matching prefix wins
+- names are normalized (lowercase, separators collapsed, "Ph" -> "phase")
+  and matched with the old "a in b or b in a" check, so "North Havens"
+  still matches "North Haven"; the most specific match wins ("North Haven
+  Phase 4" over "North Haven")
+
+sto-agents-service/services/community_resolver.py is the implementation;
+sto-agents-complete/services/community_resolver.py is an identical copy
+(tests/test_community_resolver.py checks that they match).
+
+Usage:
+    resolver = CommunityResolver(["North Haven", "Luden Estates Phase 3"], {"34040": "Verona Heights"})
+    resolver.resolve("NORTH HAVEN - PHASE 4")        # "North Haven"
+    resolver.resolve("Luden Estates Ph 3 Lot 12")    # "Luden Estates Phase 3"
+    resolver.is_monitored("north havens")            # True
+    resolver.community_for_lot("34040012")           # "Verona Heights"
+
+Benchmark:
+    python -m services.community_resolver --benchmark 60000
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+UNKNOWN_COMMUNITY = "Unknown"
+
+CACHE_SIZE = 8192
+
+# Abbreviations used in portal community names
+ABBREVIATIONS = {"ph": "phase"}
+
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_community(name: str) -> str:
+    """'Luden Estates Ph. 3' -> 'luden estates phase 3'"""
+    words = _SEPARATORS.sub(" ", name.lower()).split() if name else []
+    return " ".join(ABBREVIATIONS.get(word, word) for word in words)
+
+
+# ============================================
+# RESOLVER
+# ============================================
+
+
+class CommunityResolver:
+    """Compiled lot-prefix trie and normalized names for a list of communities"""
+
+    def __init__(
+        self,
+        communities: Iterable[str],
+        lot_prefixes: Optional[Mapping[str, str]] = None,
+        cache_size: int = CACHE_SIZE,
+    ):
+        self.communities: List[str] = list(dict.fromkeys(communities))
+        self._normalized: List[str] = [normalize_community(c) for c in self.communities]
+
+        # Nested dicts keyed by character; "" holds the community of a complete prefix
+        self._trie: Dict[str, dict] = {}
+        for prefix, community in (lot_prefixes or {}).items():
+            node = self._trie
+            for char in prefix.strip():
+                node = node.setdefault(char, {})
+            node[""] = community
+
+        self._resolve = lru_cache(maxsize=cache_size)(self._resolve_uncached)
+        self._lot = lru_cache(maxsize=cache_size)(self._lot_uncached)
+
+    def _resolve_uncached(self, name: str) -> Optional[str]:
+        text = normalize_community(name)
+        if not text:
+            return None
+
+        best = None
+        best_score: Tuple[int, int] = (-1, 0)
+        for i, community in enumerate(self._normalized):
+            if community and community in text:
+                # The longest community the name mentions
+                score = (1, len(community))
+            elif text in community:
+                # The tightest community the name is part of
+                score = (0, -len(community))
+            else:
+                continue
+            if score > best_score:
+                best, best_score = i, score
+        return self.communities[best] if best is not None else None
+
+    def _lot_uncached(self, lot_id: str) -> Optional[str]:
+        node = self._trie
+        found = None
+        for char in lot_id.strip():
+            node = node.get(char)
+            if node is None:
+                break
+            found = node.get("", found)
+        return found
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Monitored community a loosely written name refers to (or None)"""
+        return self._resolve(name) if name else None
+
+    def is_monitored(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def community_for_lot(self, lot_id: str, default: str = UNKNOWN_COMMUNITY) -> str:
+        """Community of the longest known prefix of a lot ID"""
+        return (self._lot(lot_id) if lot_id else None) or default
+
+    def community_for(self, name: str, lot_id: str = "") -> Optional[str]:
+        """Resolve by name, falling back to the lot prefix"""
+        return self.resolve(name) or self.resolve(self._lot(lot_id) if lot_id else None)
+
+    def cache_info(self) -> Dict[str, object]:
+        return {"names": self._resolve.cache_info(), "lots": self._lot.cache_info()}
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+
+def _legacy_is_monitored(community: str, monitored: List[str]) -> bool:
+    """The previous approach: bidirectional substring loop"""
+    if not community:
+        return False
+    community_lower = community.lower()
+    for m in monitored:
+        if m.lower() in community_lower or community_lower in m.lower():
+            return True
+    return False
+
+
+def _legacy_lot_community(lot_id: str, prefixes: Mapping[str, str]) -> str:
+    for prefix, community in prefixes.items():
+        if lot_id.startswith(prefix):
+            return community
+    return UNKNOWN_COMMUNITY
+
+
+def _synthetic_epo_rows(count: int, seed: int = 42) -> List[Tuple[str, str]]:
+    """(community, lot) pairs shaped like a year of SupplyPro EPO rows"""
+    import random
+
+    rng = random.Random(seed)
+    communities = [
+        "Luden Estates Phase 3", "North Haven", "North Haven Phase 4", "NORTH HAVEN - PHASE 4",
+        "Reserve at Battle Creek", "Verona Heights", "Cascadia Ridge", "Kemper Grove",
+        "Reed's Crossing Phase 2A", "Scholls Heights", "Spyglass Hill", "Trailhead Estates",
+    ]
+    prefixes = ["33750", "34040", "35800", "36190", "36199", "37120", "38800"]
+    return [
+        (rng.choice(communities), f"{rng.choice(prefixes)}{rng.randint(1, 250):03d}")
+        for _ in range(count)
+    ]
+
+
+def run_benchmark(count: int = 60_000):
+    import time
+
+    monitored = [
+        "Luden Estates Phase 3", "North Haven", "North Haven Phase 4",
+        "Reserve at Battle Creek", "Verona Heights",
+    ]
+    prefixes = {
+        "33750": "North Haven Phase 4", "34040": "Verona Heights", "35800": "Reserve at Battle Creek",
+        "36190": "Luden Estates Phase 3", "36199": "Luden Estates Phase 3",
+    }
+    rows = _synthetic_epo_rows(count)
+
+    start = time.perf_counter()
+    for community, lot in rows:
+        _legacy_is_monitored(community, monitored)
+        _legacy_lot_community(lot, prefixes)
+    legacy = time.perf_counter() - start
+
+    resolver = CommunityResolver(monitored, prefixes)
+    start = time.perf_counter()
+    for community, lot in rows:
+        resolver.is_monitored(community)
+        resolver.community_for_lot(lot)
+    compiled = time.perf_counter() - start
+
+    print(f"{count:,} EPO rows ({len(set(rows)):,} distinct community/lot pairs)")
+    print(f"  legacy loops:      {legacy * 1000:8.1f} ms")
+    print(f"  compiled, cached:  {compiled * 1000:8.1f} ms")
+    print(f"  cache: {resolver.cache_info()}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Community resolver")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark on N synthetic EPO rows")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark)
@@ -0,0 +1,276 @@
+"""
+Content Dedupe
+Finds files with identical content (SHA-256) so the same plan set is not
+stored twice - at intake and across existing Customer Files.
+
+Hashes are computed streaming in HASH_CHUNK_SIZE chunks and cached in
+SQLite (data/hash_cache.db, STO_HASH_CACHE) by path, size and mtime, so
+a file is only read again after it changes. Only files whose size
+matches another file's are hashed at all.
+
+Intake (agents/plan_intake.py) checks each incoming file against the
+folder it is routed to, listed from the cached services.fs_scanner
+snapshot. STO_INTAKE_DUPLICATES decides what happens to a duplicate:
+    skip - remove it from intake (default)
+    link - hard-link the existing file under the incoming name, then
+           remove it from intake
+    keep - route it anyway (old behavior)
+
+Usage:
+    python -m services.dedupe "C:/.../Customer Files/Holt Homes"            # report
+    python -m services.dedupe "C:/.../Customer Files/Holt Homes" --cleanup  # what would be removed
+    python -m services.dedupe "C:/.../Customer Files/Holt Homes" --cleanup --apply
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from services.fs_scanner import scan_tree, snapshot_for
+
+logger = logging.getLogger('dedupe')
+
+HASH_CACHE_PATH = Path(os.environ.get("STO_HASH_CACHE", "data/hash_cache.db"))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+DUPLICATE_ACTION = os.environ.get("STO_INTAKE_DUPLICATES", "skip").lower()
+
+# Hashing reads whole files; on synced folders that is network-bound
+HASH_WORKERS = int(os.environ.get("STO_HASH_WORKERS", "4"))
+
+# "Plans_20251128_141502.pdf" / "Plans_20251128_141502_2.pdf" - copies made by route_file
+TIMESTAMP_SUFFIX = re.compile(r"_\d{8}_\d{6}(_\d+)?$")
+
+# =============================================================================
+# HASH CACHE
+# =============================================================================
+
+class HashCache:
+    """SHA-256 per (path, size, mtime)"""
+
+    def __init__(self, db_path: Path = HASH_CACHE_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes (path TEXT PRIMARY KEY, size INTEGER, mtime REAL, sha256 TEXT)"
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, size: int, mtime: float) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime, sha256 FROM hashes WHERE path = ?", (str(path),)
+            ).fetchone()
+        if row and row[0] == size and row[1] == mtime:
+            self.hits += 1
+            return row[2]
+        self.misses += 1
+        return None
+
+    def put(self, path, size: int, mtime: float, digest: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime, sha256) VALUES (?, ?, ?, ?)",
+                (str(path), size, mtime, digest),
+            )
+
+    def close(self):
+        self._conn.close()
+
+_cache = None
+
+def get_cache() -> HashCache:
+    """The process-wide cache at HASH_CACHE_PATH"""
+    global _cache
+    if _cache is None:
+        _cache = HashCache()
+    return _cache
+
+def hash_file(path: Path, cache: HashCache = None, size: int = None, mtime: float = None) -> str:
+    """SHA-256 of a file, read in chunks; served from the cache while size and mtime match"""
+    cache = cache or get_cache()
+    if size is None or mtime is None:
+        info = os.stat(path)
+        size, mtime = info.st_size, info.st_mtime
+
+    digest = cache.get(path, size, mtime)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        cache.put(path, size, mtime, digest)
+    return digest
+
+# =============================================================================
+# INTAKE
+# =============================================================================
+
+def find_copy(path: Path, folder: Path, others: list = (), cache: HashCache = None) -> Optional[Path]:
+    """
+    A file with the same content as path, either already in folder (the
+    destination folder, from the cached snapshot) or among `others` (files
+    planned for that folder earlier in the same run). None if there is none.
+    """
+    size = os.stat(path).st_size
+    candidates = [f.path for f in snapshot_for(folder).files(folder) if f.size == size and f.path != path]
+    candidates += [p for p in others if p != path and os.stat(p).st_size == size]
+    if not candidates:
+        return None
+
+    digest = hash_file(path, cache)
+    for candidate in candidates:
+        try:
+            if hash_file(candidate, cache) == digest:
+                return candidate
+        except OSError:
+            continue
+    return None
+
+def settle_duplicate(source: Path, existing: Path, destination: Path, action: str = DUPLICATE_ACTION) -> str:
+    """
+    Resolve an intake file whose content is already at `existing`.
+    Returns "linked" or "skipped" (source removed either way).
+    """
+    if action == "link" and destination and existing.exists() and destination.name != existing.name:
+        try:
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.link(existing, destination)
+            source.unlink()
+            logger.info(f"Duplicate linked: {destination} -> {existing}")
+            return "linked"
+        except OSError as e:
+            # Cross-volume or no hard links (e.g. some synced folders) - skip instead
+            logger.warning(f"Could not link {destination}: {e}")
+
+    source.unlink()
+    logger.info(f"Duplicate skipped: {source.name} (same content as {existing})")
+    return "skipped"
+
+# =============================================================================
+# REPORT / CLEANUP
+# =============================================================================
+
+def find_duplicates(root: Path, workers: int = HASH_WORKERS, cache: HashCache = None) -> list:
+    """
+    Groups of files under root with identical content.
+
+    Returns list of {"sha256", "size", "files"} sorted by wasted bytes;
+    hard links of one file count once.
+    """
+    started = time.perf_counter()
+    cache = cache or get_cache()
+    hits = cache.hits
+    by_size = {}
+    for entry in scan_tree(root).files_under(root):
+        if entry.size > 0:
+            by_size.setdefault(entry.size, []).append(entry)
+    candidates = [entry for entries in by_size.values() if len(entries) > 1 for entry in entries]
+
+    def digest(entry):
+        try:
+            return entry, hash_file(entry.path, cache, entry.size, entry.mtime)
+        except OSError as e:
+            logger.warning(f"Cannot hash {entry.path}: {e}")
+            return entry, None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        hashed = list(pool.map(digest, candidates))
+
+    by_hash = {}
+    for entry, sha in hashed:
+        if sha:
+            by_hash.setdefault(sha, []).append(entry)
+
+    groups = []
+    for sha, entries in by_hash.items():
+        inodes, files = set(), []
+        for entry in sorted(entries, key=lambda e: str(e.path)):
+            try:
+                info = os.stat(entry.path)
+            except OSError:
+                continue
+            if (info.st_dev, info.st_ino) not in inodes:
+                inodes.add((info.st_dev, info.st_ino))
+                files.append(entry.path)
+        if len(files) > 1:
+            groups.append({"sha256": sha, "size": entries[0].size, "files": files})
+
+    groups.sort(key=lambda g: g["size"] * (len(g["files"]) - 1), reverse=True)
+    logger.info(f"Dedupe scan of {root}: {len(candidates)} files hashed or cached "
+                f"({cache.hits - hits} cache hits), {len(groups)} duplicate groups, "
+                f"{time.perf_counter() - started:.1f}s")
+    return groups
+
+def _base_name(path: Path) -> str:
+    """"Plans_20251128_141502_2.pdf" -> "Plans.pdf" (other names unchanged)"""
+    return TIMESTAMP_SUFFIX.sub("", path.stem) + path.suffix
+
+def _keep_order(path: Path) -> tuple:
+    """Prefer the original name over route_file's timestamped copies, then the oldest copy"""
+    return (bool(TIMESTAMP_SUFFIX.search(path.stem)), len(path.name), path.name)
+
+def cleanup_duplicates(groups: list, apply: bool = False) -> dict:
+    """
+    Remove route_file's timestamped copies ("name_YYYYMMDD_HHMMSS.pdf")
+    that sit in the same folder as an identical file of the same base
+    name. Identical files under different names, and copies in different
+    lot folders, are only reported - each lot keeps its own documents.
+    """
+    removed, freed = [], 0
+    for group in groups:
+        by_name = {}
+        for path in group["files"]:
+            by_name.setdefault((path.parent, _base_name(path)), []).append(path)
+        for paths in by_name.values():
+            for path in sorted(paths, key=_keep_order)[1:]:
+                removed.append(path)
+                freed += group["size"]
+                if apply:
+                    path.unlink()
+                    logger.info(f"Removed duplicate: {path}")
+    return {"removed": removed, "bytes": freed, "applied": apply}
+
+def format_duplicate_report(groups: list, root: Path, limit: int = 20) -> str:
+    wasted = sum(g["size"] * (len(g["files"]) - 1) for g in groups)
+    lines = [f"Duplicate content under {root}: {len(groups)} groups, {wasted / 1024 / 1024:.1f} MB redundant"]
+    for group in groups[:limit]:
+        lines.append(f"  {group['size'] / 1024 / 1024:.1f} MB x {len(group['files'])}  ({group['sha256'][:12]})")
+        for path in group["files"]:
+            lines.append(f"      {path}")
+    if len(groups) > limit:
+        lines.append(f"  ... and {len(groups) - limit} more groups")
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(levelname)s | %(message)s')
+
+    parser = argparse.ArgumentParser(description="Find and clean up duplicate files by content")
+    parser.add_argument("root", type=Path, help="Folder to scan (e.g. a builder's Customer Files)")
+    parser.add_argument("--cleanup", action="store_true", help="Remove same-folder duplicates (dry run unless --apply)")
+    parser.add_argument("--apply", action="store_true", help="Actually delete with --cleanup")
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS, help="Parallel hashing threads")
+    args = parser.parse_args()
+
+    groups = find_duplicates(args.root, args.workers)
+    print(format_duplicate_report(groups, args.root))
+    if args.cleanup:
+        outcome = cleanup_duplicates(groups, apply=args.apply)
+        verb = "Removed" if args.apply else "Would remove"
+        print(f"\n{verb} {len(outcome['removed'])} file(s), {outcome['bytes'] / 1024 / 1024:.1f} MB")
+        for path in outcome["removed"]:
+            print(f"  {path}")
@@ -0,0 +1,219 @@
+"""
+File Transfer
+Moves routed intake files into Customer Files in parallel, safely across
+crashes.
+
+- Same-volume moves are one atomic rename; nothing is copied.
+- Cross-volume moves copy to "<destination>.part", rename that into
+  place, then delete the source, so a destination is never half-written.
+- Every move is journaled (data/intake_journal.jsonl, STO_INTAKE_JOURNAL)
+  when it starts and when it ends. recover() settles moves an interrupted
+  run left behind, so the next run neither loses nor duplicates files.
+
+Usage:
+    from services.file_transfer import TransferTask, TransferJournal, transfer_files
+    journal = TransferJournal()
+    journal.recover()
+    results = transfer_files([TransferTask(src, dest)], journal=journal)
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+logger = logging.getLogger('file_transfer')
+
+JOURNAL_PATH = Path(os.environ.get("STO_INTAKE_JOURNAL", "data/intake_journal.jsonl"))
+
+# Concurrent transfers; copies to synced/network folders are latency-bound
+TRANSFER_WORKERS = int(os.environ.get("STO_TRANSFER_WORKERS", "4"))
+
+PART_SUFFIX = ".part"
+
+# copy2 keeps mtime, but some filesystems store it at 2 s resolution
+MTIME_TOLERANCE = 2.0
+
+@dataclass
+class TransferTask:
+    """One planned move"""
+    source: Path
+    destination: Path
+    size: int = 0
+    mtime: float = 0.0
+
+    @classmethod
+    def for_file(cls, source: Path, destination: Path) -> "TransferTask":
+        info = source.stat()
+        return cls(source, destination, info.st_size, info.st_mtime)
+
+    def to_dict(self) -> dict:
+        return {
+            "source": str(self.source),
+            "destination": str(self.destination),
+            "size": self.size,
+            "mtime": self.mtime,
+        }
+
+# =============================================================================
+# JOURNAL
+# =============================================================================
+
+class TransferJournal:
+    """Append-only JSON-lines log of transfer states (started/done/failed/recovered)"""
+
+    def __init__(self, path: Path = JOURNAL_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, task: TransferTask, state: str, error: str = None):
+        entry = dict(task.to_dict(), state=state, time=time.time())
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _entries(self) -> list:
+        if not self.path.exists():
+            return []
+        entries = []
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-write
+                    continue
+        return entries
+
+    def pending(self) -> list:
+        """Transfers that were started but never finished"""
+        last = {}
+        for entry in self._entries():
+            last[entry["source"]] = entry
+        return [
+            TransferTask(Path(e["source"]), Path(e["destination"]), e.get("size", 0), e.get("mtime", 0.0))
+            for e in last.values() if e["state"] == "started"
+        ]
+
+    def recover(self) -> dict:
+        """
+        Settle transfers an interrupted run left unfinished:
+        - destination in place, source gone: the move completed
+        - destination in place and identical to source: delete the source
+        - no destination: remove any partial copy; the source is routed again
+        """
+        summary = {"completed": 0, "sources_removed": 0, "partials_removed": 0, "conflicts": 0}
+
+        for task in self.pending():
+            part = task.destination.with_name(task.destination.name + PART_SUFFIX)
+            if task.destination.exists():
+                if not task.source.exists():
+                    summary["completed"] += 1
+                elif _same_file(task.destination, task.size, task.mtime):
+                    task.source.unlink()
+                    summary["sources_removed"] += 1
+                    logger.info(f"Recovered: removed already-copied source {task.source}")
+                else:
+                    summary["conflicts"] += 1
+                    logger.warning(f"Leaving {task.source}: {task.destination} differs")
+            elif part.exists():
+                part.unlink()
+                summary["partials_removed"] += 1
+                logger.info(f"Recovered: removed partial copy {part}")
+            self.record(task, "recovered")
+
+        self.compact()
+        if any(summary.values()):
+            logger.info(f"Journal recovery: {summary}")
+        return summary
+
+    def compact(self):
+        """Drop finished entries; removes the journal when nothing is pending"""
+        with self._lock:
+            pending = [t.to_dict() for t in self.pending()]
+            if not pending:
+                if self.path.exists():
+                    self.path.unlink()
+                return
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                for entry in pending:
+                    f.write(json.dumps(dict(entry, state="started")) + "\n")
+            os.replace(tmp_path, self.path)
+
+def _same_file(path: Path, size: int, mtime: float) -> bool:
+    info = path.stat()
+    return info.st_size == size and abs(info.st_mtime - mtime) <= MTIME_TOLERANCE
+
+# =============================================================================
+# TRANSFER
+# =============================================================================
+
+def same_volume(source: Path, folder: Path) -> bool:
+    """True if a rename from source into folder stays on one device"""
+    try:
+        return os.stat(source).st_dev == os.stat(folder).st_dev
+    except OSError:
+        return False
+
+def move_file(task: TransferTask) -> str:
+    """
+    Move one file to its planned destination (which must not exist).
+    Returns "rename" or "copy".
+    """
+    task.destination.parent.mkdir(parents=True, exist_ok=True)
+    if task.destination.exists():
+        raise FileExistsError(f"Destination exists: {task.destination}")
+
+    if same_volume(task.source, task.destination.parent):
+        os.rename(task.source, task.destination)
+        return "rename"
+
+    part = task.destination.with_name(task.destination.name + PART_SUFFIX)
+    shutil.copy2(task.source, part)
+    os.replace(part, task.destination)
+    task.source.unlink()
+    return "copy"
+
+def transfer_files(tasks: list, workers: int = TRANSFER_WORKERS, journal: TransferJournal = None) -> list:
+    """
+    Run planned moves on a bounded thread pool.
+
+    Destinations must be unique across tasks (the planner reserves them).
+    Returns one result dict per task, in task order.
+    """
+    journal = journal or TransferJournal()
+
+    def run(task: TransferTask) -> dict:
+        result = {"source": str(task.source), "destination": str(task.destination),
+                  "success": False, "method": None, "error": None}
+        journal.record(task, "started")
+        try:
+            result["method"] = move_file(task)
+            result["success"] = True
+            journal.record(task, "done")
+            logger.info(f"Routed ({result['method']}): {task.source.name} -> {task.destination}")
+        except Exception as e:
+            result["error"] = str(e)
+            journal.record(task, "failed", str(e))
+            logger.error(f"Failed to route {task.source.name}: {e}")
+        return result
+
+    if workers > 1 and len(tasks) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, tasks))
+    else:
+        results = [run(task) for task in tasks]
+
+    journal.compact()
+    return results
@@ -0,0 +1,314 @@
+"""
+Folder Index
+Persistent SQLite index of the Customer Files and 00_Intake trees, so the
+daily checks do not re-list tens of thousands of lot folders that have not
+changed.
+
+The index stores every directory's mtime and every file's size, mtime,
+category and classified document types. A refresh stats each known
+directory and only lists (scandir) the ones whose mtime changed - a
+directory's mtime changes when entries are added, removed or renamed in
+it. Unchanged directories keep their stored listing. A file edited in
+place does not touch its directory's mtime; use a full rescan
+(--full-rescan) to pick up those size/mtime changes.
+
+Document types are classified once per new or changed file with the
+classifier passed to refresh(); when the classifier's signature changes
+(e.g. REQUIRED_DOCUMENTS was edited) stored files are re-classified
+without re-listing.
+
+Usage:
+    from services.folder_index import indexed_snapshot
+    snapshot = indexed_snapshot(CUSTOMER_FILES / "Richmond American")
+    snapshot.subdirs(...)   # same FolderSnapshot API as services.fs_scanner
+
+    python -m services.folder_index "C:/.../Customer Files/Holt Homes" [--full-rescan]
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from services.fs_scanner import FileEntry, FolderSnapshot, ScanStats, file_category, use_snapshot
+
+logger = logging.getLogger('folder_index')
+
+INDEX_PATH = Path(os.environ.get("STO_FOLDER_INDEX", "data/folder_index.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    signature TEXT,
+    refreshed REAL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    parent TEXT,
+    mtime REAL,
+    PRIMARY KEY (root, path)
+);
+CREATE TABLE IF NOT EXISTS files (
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    category TEXT,
+    doc_types TEXT,
+    PRIMARY KEY (root, path)
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(root, dir);
+"""
+
+# Separator for the doc_types column (NULL = not classified yet)
+DOC_TYPE_SEP = "|"
+
+def _join_types(types) -> str:
+    return DOC_TYPE_SEP.join(types)
+
+def _split_types(value: Optional[str]) -> tuple:
+    return tuple(value.split(DOC_TYPE_SEP)) if value else ()
+
+# =============================================================================
+# INDEX
+# =============================================================================
+
+class FolderIndex:
+    """SQLite-backed directory/file index, refreshed incrementally by mtime"""
+
+    def __init__(self, db_path: Path = INDEX_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._conn.close()
+
+    def refresh(self, root, classify: Callable = None, signature: str = "", full: bool = False,
+                workers: int = 1) -> ScanStats:
+        """
+        Bring the index for root up to date.
+
+        Args:
+            root: Tree to index (e.g. one builder's Customer Files folder)
+            classify: Optional fn(file name) -> list of document types
+            signature: Identifies the classifier's configuration; stored
+                       classifications are redone when it changes
+            full: List every directory, ignoring stored mtimes
+            workers: Threads for the filesystem pass, one top-level folder
+                     (subdivision) per work unit; stat/scandir latency on
+                     synced network folders dominates, not CPU
+
+        Returns:
+            ScanStats for this refresh
+        """
+        root = os.path.normpath(str(root))
+        stats = ScanStats()
+        started = time.perf_counter()
+
+        with self._lock:
+            known, children = {}, {}
+            for path, parent, mtime in self._conn.execute("SELECT path, parent, mtime FROM dirs WHERE root = ?", (root,)):
+                known[path] = mtime
+                children.setdefault(parent, []).append(path)
+
+        # Filesystem pass (no DB access): the root, then its subtrees
+        seen, listings = set(), []
+        subtrees = self._visit(root, root, known, children, full, stats, seen, listings)
+        if workers > 1 and len(subtrees) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(lambda d: self._walk(root, d, known, children, full), subtrees))
+        else:
+            parts = [self._walk(root, d, known, children, full) for d in subtrees]
+        for part_seen, part_listings, part_stats in parts:
+            seen |= part_seen
+            listings.extend(part_listings)
+            stats.merge(part_stats)
+
+        # Database pass
+        with self._lock, self._conn:
+            db = self._conn
+            row = db.execute("SELECT signature FROM roots WHERE root = ?", (root,)).fetchone()
+            if classify and row and row[0] != signature:
+                # Classifier changed: drop stored classifications, they are redone below
+                db.execute("UPDATE files SET doc_types = NULL WHERE root = ?", (root,))
+
+            for directory, mtime, files in listings:
+                self._store_directory(db, root, directory, mtime, files, classify)
+
+            # Directories that disappeared (their parent was re-listed without them)
+            gone = [path for path in known if path not in seen]
+            db.executemany("DELETE FROM dirs WHERE root = ? AND path = ?", [(root, p) for p in gone])
+            db.executemany("DELETE FROM files WHERE root = ? AND dir = ?", [(root, p) for p in gone])
+
+            if classify:
+                pending = db.execute(
+                    "SELECT path, name FROM files WHERE root = ? AND doc_types IS NULL", (root,)
+                ).fetchall()
+                db.executemany(
+                    "UPDATE files SET doc_types = ? WHERE root = ? AND path = ?",
+                    [(_join_types(classify(name)), root, path) for path, name in pending],
+                )
+
+            db.execute(
+                "INSERT OR REPLACE INTO roots (root, signature, refreshed) VALUES (?, ?, ?)",
+                (root, signature if classify else (row[0] if row else ""), time.time()),
+            )
+
+        stats.seconds = time.perf_counter() - started
+        logger.info(f"Indexed {root}: {stats.to_dict()}")
+        return stats
+
+    def _walk(self, root: str, start: str, known: dict, children: dict, full: bool) -> tuple:
+        """Visit start and everything below it; returns (seen, listings, stats)"""
+        stats = ScanStats()
+        seen, listings = set(), []
+        stack = [start]
+        while stack:
+            stack.extend(self._visit(root, stack.pop(), known, children, full, stats, seen, listings))
+        return seen, listings, stats
+
+    def _visit(self, root: str, directory: str, known: dict, children: dict, full: bool,
+               stats: ScanStats, seen: set, listings: list) -> list:
+        """Stat one directory and list it if its mtime changed; returns the directories to descend into"""
+        try:
+            mtime = os.stat(directory).st_mtime
+            stats.stat_calls += 1
+        except OSError:
+            if directory != root:
+                logger.warning(f"Directory gone or unreadable: {directory}")
+            stats.errors += 1
+            return []
+        seen.add(directory)
+
+        if not full and known.get(directory) == mtime:
+            stats.unchanged += 1
+            return children.get(directory, [])
+
+        try:
+            iterator = os.scandir(directory)
+        except OSError as e:
+            # Keep what we had and retry next refresh
+            logger.warning(f"Cannot list {directory}: {e}")
+            stats.errors += 1
+            return children.get(directory, [])
+        stats.scandir_calls += 1
+        stats.directories += 1
+
+        subdirs, files = [], []
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        info = entry.stat()
+                        stats.stat_calls += 1
+                        stats.files += 1
+                        files.append((entry.path, entry.name, info.st_size, info.st_mtime))
+                except OSError as e:
+                    logger.warning(f"Cannot stat {entry.path}: {e}")
+                    stats.errors += 1
+
+        listings.append((directory, mtime, files))
+        return subdirs
+
+    def _store_directory(self, db, root: str, directory: str, mtime: float, files: list, classify: Optional[Callable]):
+        """Replace one re-listed directory's rows, keeping classifications of unchanged files"""
+        previous = {
+            path: (size, file_mtime, doc_types)
+            for path, size, file_mtime, doc_types in db.execute(
+                "SELECT path, size, mtime, doc_types FROM files WHERE root = ? AND dir = ?", (root, directory)
+            )
+        }
+
+        rows = []
+        for path, name, size, file_mtime in files:
+            old = previous.get(path)
+            if old and old[0] == size and old[1] == file_mtime:
+                doc_types = old[2]
+            else:
+                doc_types = _join_types(classify(name)) if classify else None
+            rows.append((root, path, directory, name, size, file_mtime, file_category(name), doc_types))
+
+        db.execute("DELETE FROM files WHERE root = ? AND dir = ?", (root, directory))
+        db.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        parent = None if directory == root else os.path.dirname(directory)
+        db.execute(
+            "INSERT OR REPLACE INTO dirs (root, path, parent, mtime) VALUES (?, ?, ?, ?)",
+            (root, directory, parent, mtime),
+        )
+
+    def snapshot(self, root, classified: bool = False) -> FolderSnapshot:
+        """Build a FolderSnapshot of root from the index (no filesystem access)"""
+        root = os.path.normpath(str(root))
+        snapshot = FolderSnapshot(Path(root))
+
+        with self._lock:
+            subdirs = {}
+            dirs = []
+            for path, parent in self._conn.execute("SELECT path, parent FROM dirs WHERE root = ?", (root,)):
+                dirs.append(path)
+                if parent is not None:
+                    subdirs.setdefault(parent, []).append(os.path.basename(path))
+
+            files = {}
+            for path, directory, size, mtime, category, doc_types in self._conn.execute(
+                "SELECT path, dir, size, mtime, category, doc_types FROM files WHERE root = ? ORDER BY path", (root,)
+            ):
+                files.setdefault(directory, []).append(
+                    FileEntry(Path(path), size, mtime, category, _split_types(doc_types))
+                )
+
+        for path in dirs:
+            snapshot.add_directory(path, subdirs.get(path, []), files.get(path, []))
+        snapshot.classified = classified
+        return snapshot
+
+# =============================================================================
+# SHARED INDEX
+# =============================================================================
+
+_index = None
+
+def get_index() -> FolderIndex:
+    """The process-wide index at INDEX_PATH (STO_FOLDER_INDEX)"""
+    global _index
+    if _index is None:
+        _index = FolderIndex()
+    return _index
+
+def indexed_snapshot(root, classify: Callable = None, signature: str = "", full_rescan: bool = False,
+                     workers: int = 1, index: FolderIndex = None) -> FolderSnapshot:
+    """
+    Refresh the index for root and return its snapshot.
+
+    The snapshot is also cached in services.fs_scanner, so snapshot_for()
+    calls under root (get_active_jobs, check_subdivision, ...) use it
+    instead of walking the tree. Pass index to use a different database
+    than INDEX_PATH (e.g. benchmarks).
+    """
+    index = index or get_index()
+    stats = index.refresh(root, classify, signature, full=full_rescan, workers=workers)
+    snapshot = index.snapshot(root, classified=classify is not None)
+    snapshot.stats = stats
+    use_snapshot(snapshot)
+    return snapshot
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(levelname)s | %(message)s')
+    full = "--full-rescan" in sys.argv
+    for root in [a for a in sys.argv[1:] if not a.startswith("--")] or ["."]:
+        snapshot = indexed_snapshot(root, full_rescan=full)
+        print(f"{root}: {snapshot.stats.to_dict()} ({snapshot.file_count(root)} files indexed)")
@@ -0,0 +1,248 @@
+"""
+Filesystem Scanner
+Walks a folder tree once with os.scandir and keeps an in-memory snapshot
+that every agent queries instead of re-walking with rglob/iterdir.
+
+A snapshot maps each directory to its subdirectories and files (path,
+size, mtime, category). Snapshots are cached per root for
+STO_SCAN_MAX_AGE seconds, so the morning routine walks Customer Files
+once; call invalidate() after moving files into a scanned tree.
+
+Each scan records its timing and how many scandir/stat calls it made.
+On Windows, DirEntry.stat() is served from the directory listing, so
+the stat count is an upper bound on real syscalls there.
+
+Usage:
+    from services.fs_scanner import snapshot_for
+    snapshot = snapshot_for(CUSTOMER_FILES)
+    snapshot.subdirs(CUSTOMER_FILES / "Richmond American")
+    snapshot.files_under(lot_path)
+
+    python -m services.fs_scanner "C:/.../Customer Files"
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger('fs_scanner')
+
+# Reuse a snapshot for this long (seconds)
+SNAPSHOT_MAX_AGE = float(os.environ.get("STO_SCAN_MAX_AGE", "300"))
+
+FILE_CATEGORIES = {
+    ".pdf": "pdf",
+    ".dwg": "drawing", ".dxf": "drawing", ".layout": "drawing",
+    ".xlsx": "spreadsheet", ".xlsm": "spreadsheet", ".xls": "spreadsheet", ".csv": "spreadsheet",
+    ".doc": "document", ".docx": "document", ".txt": "document", ".msg": "document", ".eml": "document",
+    ".jpg": "image", ".jpeg": "image", ".png": "image", ".tif": "image", ".tiff": "image", ".heic": "image",
+    ".zip": "archive", ".7z": "archive",
+}
+
+def file_category(name: str) -> str:
+    """'Lot 12 ARCH.PDF' -> 'pdf'"""
+    return FILE_CATEGORIES.get(os.path.splitext(name)[1].lower(), "other")
+
+def _key(path) -> str:
+    return os.path.normcase(os.path.normpath(str(path)))
+
+# =============================================================================
+# DATA CLASSES
+# =============================================================================
+
+@dataclass
+class FileEntry:
+    """One file in a snapshot"""
+    path: Path
+    size: int
+    mtime: float
+    category: str
+    doc_types: tuple = ()   # configured document types this file satisfies (indexed snapshots)
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+@dataclass
+class ScanStats:
+    """Cost of building a snapshot"""
+    directories: int = 0
+    unchanged: int = 0      # directories reused from a persistent index without listing
+    files: int = 0
+    scandir_calls: int = 0
+    stat_calls: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: "ScanStats"):
+        """Add another (partial) scan's counts; seconds is left to the caller"""
+        self.directories += other.directories
+        self.unchanged += other.unchanged
+        self.files += other.files
+        self.scandir_calls += other.scandir_calls
+        self.stat_calls += other.stat_calls
+        self.errors += other.errors
+
+    def to_dict(self) -> dict:
+        return {
+            "directories": self.directories,
+            "unchanged": self.unchanged,
+            "files": self.files,
+            "scandir_calls": self.scandir_calls,
+            "stat_calls": self.stat_calls,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+        }
+
+# =============================================================================
+# SNAPSHOT
+# =============================================================================
+
+class FolderSnapshot:
+    """Directory tree under one root, answered from memory"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.created = time.time()
+        self.stats = ScanStats()
+        self.classified = False     # True when FileEntry.doc_types are filled in
+        self._dirs = {}     # dir key -> sorted subdirectory names
+        self._files = {}    # dir key -> [FileEntry]
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.created
+
+    def contains(self, path) -> bool:
+        """True if path is the root or inside it"""
+        key, root = _key(path), _key(self.root)
+        return key == root or key.startswith(root.rstrip(os.sep) + os.sep)
+
+    def exists(self, path) -> bool:
+        """True if path is a directory present in the snapshot"""
+        return _key(path) in self._dirs
+
+    def subdirs(self, path, include_hidden: bool = False) -> list:
+        """Subdirectories of path (Paths, sorted by name)"""
+        path = Path(path)
+        return [
+            path / name for name in self._dirs.get(_key(path), [])
+            if include_hidden or not name.startswith('.')
+        ]
+
+    def files(self, path) -> list:
+        """Files directly in path"""
+        return list(self._files.get(_key(path), []))
+
+    def files_under(self, path) -> list:
+        """Files in path and all its subdirectories (like rglob('*') files)"""
+        result = []
+        stack = [_key(path)]
+        while stack:
+            key = stack.pop()
+            result.extend(self._files.get(key, ()))
+            stack.extend(os.path.join(key, os.path.normcase(name)) for name in self._dirs.get(key, ()))
+        return result
+
+    def file_count(self, path) -> int:
+        return len(self.files_under(path))
+
+    def add_directory(self, path, subdirs: list, files: list):
+        """Record one directory listing (used by scan_tree and persistent indexes)"""
+        self._dirs[_key(path)] = sorted(subdirs)
+        self._files[_key(path)] = files
+        self.stats.directories += 1
+        self.stats.files += len(files)
+
+def scan_tree(root) -> FolderSnapshot:
+    """Walk root once with os.scandir and return its snapshot"""
+    snapshot = FolderSnapshot(root)
+    stats = snapshot.stats
+    started = time.perf_counter()
+
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            iterator = os.scandir(directory)
+        except OSError as e:
+            if directory != str(root):
+                logger.warning(f"Cannot list {directory}: {e}")
+            stats.errors += 1
+            continue
+        stats.scandir_calls += 1
+
+        subdirs, files = [], []
+        with iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        info = entry.stat()
+                        stats.stat_calls += 1
+                        files.append(FileEntry(Path(entry.path), info.st_size, info.st_mtime, file_category(entry.name)))
+                except OSError as e:
+                    logger.warning(f"Cannot stat {entry.path}: {e}")
+                    stats.errors += 1
+        snapshot.add_directory(directory, subdirs, files)
+
+    stats.seconds = time.perf_counter() - started
+    logger.info(f"Scanned {root}: {stats.to_dict()}")
+    return snapshot
+
+# =============================================================================
+# SHARED CACHE
+# =============================================================================
+
+_snapshots = {}
+
+def get_snapshot(root, refresh: bool = False, max_age: float = None) -> FolderSnapshot:
+    """Snapshot of root, reused while younger than max_age (SNAPSHOT_MAX_AGE)"""
+    max_age = SNAPSHOT_MAX_AGE if max_age is None else max_age
+    key = _key(root)
+    snapshot = _snapshots.get(key)
+    if refresh or snapshot is None or snapshot.age > max_age:
+        snapshot = _snapshots[key] = scan_tree(root)
+    return snapshot
+
+def snapshot_for(path, refresh: bool = False) -> FolderSnapshot:
+    """A fresh cached snapshot that contains path, or a new snapshot of path"""
+    if not refresh:
+        for snapshot in list(_snapshots.values()):
+            if snapshot.age <= SNAPSHOT_MAX_AGE and snapshot.contains(path):
+                return snapshot
+    return get_snapshot(path, refresh=refresh)
+
+def use_snapshot(snapshot: FolderSnapshot):
+    """Cache a snapshot built elsewhere (e.g. loaded from services.folder_index)"""
+    _snapshots[_key(snapshot.root)] = snapshot
+
+def invalidate(path=None):
+    """Drop cached snapshots that contain path (all snapshots if None)"""
+    for key, snapshot in list(_snapshots.items()):
+        if path is None or snapshot.contains(path) or _key(snapshot.root).startswith(_key(path)):
+            del _snapshots[key]
+
+def scan_stats() -> dict:
+    """Stats of the cached snapshots, by root"""
+    return {str(s.root): s.stats.to_dict() for s in _snapshots.values()}
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(levelname)s | %(message)s')
+    for root in sys.argv[1:] or ["."]:
+        snapshot = scan_tree(root)
+        categories = {}
+        for entry in snapshot.files_under(root):
+            categories[entry.category] = categories.get(entry.category, 0) + 1
+        print(f"{root}: {snapshot.stats.to_dict()}")
+        print(f"  by category: {dict(sorted(categories.items()))}")
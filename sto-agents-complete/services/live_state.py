@@ -0,0 +1,119 @@
+"""
+Live State
+Per-lot completeness and document counts kept current by the folder
+watcher (agents/folder_watcher.py), so reports can read them instantly
+instead of re-checking every job folder.
+
+Stored as JSON at data/live_state.json (STO_LIVE_STATE), rewritten
+atomically after each batch of updates.
+
+Usage:
+    from services.live_state import LiveState
+    results = LiveState().completeness_results(BUILDERS)   # same shape as check_all_active()
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger('live_state')
+
+LIVE_STATE_PATH = Path(os.environ.get("STO_LIVE_STATE", "data/live_state.json"))
+
+class LiveState:
+    """Thread-safe store of the latest per-lot results"""
+
+    def __init__(self, path: Path = LIVE_STATE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                data.setdefault("lots", {})
+                data.setdefault("intake", {})
+                return data
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error(f"Could not read live state {self.path}: {e}")
+        return {"lots": {}, "intake": {}, "updated": None}
+
+    def save(self):
+        """Write the state (temp file + replace, so readers never see a partial file)"""
+        with self._lock:
+            self._data["updated"] = datetime.now().isoformat()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump(self._data, f, indent=2, default=str)
+            os.replace(tmp_path, self.path)
+
+    def update_lot(self, job_id: str, record: dict):
+        with self._lock:
+            self._data["lots"][job_id] = dict(record, checked=datetime.now().isoformat())
+
+    def remove_lot(self, job_id: str):
+        with self._lock:
+            self._data["lots"].pop(job_id, None)
+
+    def set_intake(self, builder_key: str, file_count: int):
+        with self._lock:
+            self._data["intake"][builder_key] = file_count
+
+    def lots(self) -> dict:
+        with self._lock:
+            return dict(self._data["lots"])
+
+    def intake(self) -> dict:
+        with self._lock:
+            return dict(self._data["intake"])
+
+    def completeness_results(self, builders: dict = None) -> dict:
+        """Build check_all_active()-style results from the stored lots"""
+        builders = builders or {}
+        with self._lock:
+            lots = list(self._data["lots"].values())
+            timestamp = self._data.get("updated") or datetime.now().isoformat()
+
+        results = {
+            "timestamp": timestamp,
+            "builders": {},
+            "summary": {"total_jobs": 0, "complete": 0, "incomplete": 0},
+        }
+
+        for lot in sorted(lots, key=lambda r: (r["builder"], r["subdivision"], r["lot"])):
+            bkey = lot["builder"]
+            builder_results = results["builders"].setdefault(bkey, {
+                "name": builders.get(bkey, {}).get("name", bkey),
+                "subdivisions": {},
+                "total_jobs": 0,
+                "complete": 0,
+                "incomplete": 0,
+            })
+            sub = builder_results["subdivisions"].setdefault(lot["subdivision"], {
+                "total": 0,
+                "complete": 0,
+                "incomplete": 0,
+                "incomplete_jobs": [],
+            })
+
+            status = "complete" if lot["is_complete"] else "incomplete"
+            sub["total"] += 1
+            sub[status] += 1
+            for counts in (builder_results, results["summary"]):
+                counts["total_jobs"] += 1
+                counts[status] += 1
+            if not lot["is_complete"]:
+                sub["incomplete_jobs"].append({
+                    "lot": lot["lot"],
+                    "missing_required": lot["missing_required"],
+                    "missing_optional": lot["missing_optional"],
+                    "found": lot["found"],
+                })
+
+        return results
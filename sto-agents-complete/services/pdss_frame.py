@@ -0,0 +1,195 @@
+"""
+PDSS Frame
+PDSS jobs as a columnar pandas table, so summaries, group-bys, due-date
+windows and exports are vectorized instead of looping over job dicts.
+
+pandas is optional (pip install pandas; pyarrow for Parquet). Without
+it, HAVE_PANDAS is False and pdss_sync uses its plain-Python reports.
+
+Usage:
+    from services.pdss_frame import load_jobs_frame, summarize_jobs, due_window
+    frame = load_jobs_frame(store, REPORT_COLUMNS)
+    summary = summarize_jobs(frame)
+    python -m services.pdss_frame --benchmark 100000
+"""
+
+import time
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+try:
+    import pandas as pd
+    HAVE_PANDAS = True
+except ImportError:
+    pd = None
+    HAVE_PANDAS = False
+
+logger = logging.getLogger('pdss_frame')
+
+STATUSES = ["New", "In Progress", "Complete", "Archived"]
+PRIORITIES = ["High", "Medium", "Low"]
+
+# Jobs no longer worked, left out of due-date windows
+CLOSED_STATUSES = ["Complete", "Archived"]
+
+# Fields the summary, group-bys and due windows use
+REPORT_COLUMNS = ["job_id", "builder", "subdivision", "lot", "plan_status", "priority", "due_date"]
+
+def load_jobs_frame(store, columns: list = REPORT_COLUMNS):
+    """
+    All PDSS jobs as a DataFrame with the given columns (plus job_id);
+    object columns with None for missing values, ordered by job_id
+    """
+    return store.jobs_frame(columns)
+
+def summarize_jobs(frame) -> dict:
+    """get_pdss_summary()'s result, computed column-wise"""
+    status = frame["plan_status"].fillna("New")
+    builder = frame["builder"].fillna("Unknown")
+    priority = frame["priority"].fillna("Medium")
+
+    status_counts = status.value_counts()
+    priority_counts = priority.value_counts()
+
+    attention = frame[(frame["priority"] == "High") & (frame["plan_status"] != "Complete")]
+    attention = attention[["job_id", "subdivision", "lot", "plan_status"]].rename(columns={"plan_status": "status"})
+
+    return {
+        "total_jobs": len(frame),
+        "by_status": {s: int(status_counts.get(s, 0)) for s in STATUSES},
+        # First-seen order, like the dict walk
+        "by_builder": {b: int(n) for b, n in builder.value_counts(sort=False).items()},
+        "by_priority": {p: int(priority_counts.get(p, 0)) for p in PRIORITIES},
+        "needs_attention": _records(attention),
+    }
+
+def status_by_group(frame, by: list = ("builder", "subdivision"), column: str = "plan_status"):
+    """Job counts per group and status (one column per status, plus Total)"""
+    table = pd.crosstab([frame[c].fillna("") for c in by], frame[column].fillna("New"))
+    table["Total"] = table.sum(axis=1)
+    return table
+
+def due_window(frame, days: int = 7, today: datetime = None):
+    """Open jobs due within `days` (overdue included), soonest first"""
+    today = pd.Timestamp((today or datetime.now()).date())
+    due = _parse_dates(frame["due_date"])
+    mask = due.notna() & (due <= today + timedelta(days=days)) & ~frame["plan_status"].isin(CLOSED_STATUSES)
+    window = frame[mask].assign(due=due[mask], overdue=due[mask] < today)
+    return window.sort_values(["due", "job_id"])
+
+def _parse_dates(values):
+    """
+    Column of dates as Timestamps (NaT where unparseable); each distinct
+    string is parsed once, so mixed formats work on any pandas version
+    """
+    parsed = {value: pd.to_datetime(value, errors="coerce") for value in values.dropna().unique()}
+    return pd.to_datetime(values.map(parsed))
+
+def export_frame(frame, output_path: Path, columns: list = None) -> str:
+    """Write jobs as CSV or Parquet (by suffix); Parquet needs pyarrow"""
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if columns:
+        frame = frame[columns]
+    if output_path.suffix.lower() == ".parquet":
+        frame.to_parquet(output_path, index=False)
+    else:
+        frame.to_csv(output_path, index=False)
+    logger.info(f"PDSS exported to {output_path}")
+    return str(output_path)
+
+def _records(frame) -> list:
+    """Rows as dicts (several times faster than to_dict("records") on object columns)"""
+    columns = list(frame.columns)
+    return [dict(zip(columns, row)) for row in zip(*(frame[c].tolist() for c in columns))]
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def run_benchmark(jobs: int = 100_000) -> dict:
+    """
+    Time the frame reports against the dict walk on a synthetic tracker
+    of `jobs` jobs (in a temporary store).
+    """
+    from services.pdss_store import JOB_COLUMNS, PDSSStore
+
+    builders = ["holt", "richmond_american", "manor_hsr", "sekisui_house"]
+    today = datetime.now()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PDSSStore(Path(tmp) / "pdss.db")
+        store.upsert_jobs([
+            {
+                "job_id": f"JOB-{i:06d}",
+                "builder": builders[i % len(builders)],
+                "subdivision": f"Subdivision {i % 250}",
+                "lot": f"Lot {i}",
+                "plan_status": STATUSES[i % 7 % 4],
+                "priority": PRIORITIES[i % 5 % 3],
+                "due_date": (today + timedelta(days=i % 90 - 30)).strftime("%Y-%m-%d") if i % 3 else "",
+                "documents_complete": bool(i % 2),
+                "notes": "",
+            }
+            for i in range(jobs)
+        ])
+
+        timings = {}
+        started = time.perf_counter()
+        frame = load_jobs_frame(store)
+        timings["load_frame"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        summary = summarize_jobs(frame)
+        timings["summary"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        groups = status_by_group(frame)
+        timings["group_by_subdivision"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        due = due_window(frame, 7)
+        timings["due_window"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        export_frame(load_jobs_frame(store, JOB_COLUMNS), Path(tmp) / "pdss.csv")
+        timings["export_csv"] = time.perf_counter() - started
+
+        # Dict walk for comparison (load + count statuses only)
+        started = time.perf_counter()
+        by_status = {}
+        for job in store.jobs().values():
+            status = job.get("plan_status", "New")
+            by_status[status] = by_status.get(status, 0) + 1
+        timings["dict_walk_status_only"] = time.perf_counter() - started
+        store.close()
+
+    return {
+        "jobs": jobs,
+        "subdivision_groups": len(groups),
+        "due_within_7_days": len(due),
+        "needs_attention": len(summary["needs_attention"]),
+        "seconds": {name: round(value, 3) for name, value in timings.items()},
+        # Load + summary + group-by + due window
+        "report_seconds": round(sum(v for k, v in timings.items() if k not in ("dict_walk_status_only", "export_csv")), 3),
+    }
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(name)s | %(levelname)s | %(message)s')
+
+    parser = argparse.ArgumentParser(description="PDSS columnar reports")
+    parser.add_argument("--benchmark", type=int, nargs="?", const=100_000, metavar="JOBS",
+                        help="Time reports on a synthetic tracker (default 100000 jobs)")
+    args = parser.parse_args()
+
+    if not HAVE_PANDAS:
+        print("pandas not installed: pip install pandas")
+    elif args.benchmark:
+        print(json.dumps(run_benchmark(args.benchmark), indent=2))
+    else:
+        parser.print_help()
@@ -0,0 +1,439 @@
+"""
+PDSS Store
+Transactional store for PDSS jobs and subdivisions (SQLite, WAL mode),
+shared by pdss_sync, the folder watcher and intake_processor.
+
+Each change writes only the rows it touches, and read-modify-write
+updates run in one IMMEDIATE transaction, so two agents running at once
+no longer overwrite each other's pdss_tracker.json rewrites.
+
+Stored at data/pdss.db (STO_PDSS_DB). On first use an existing
+pdss_tracker.json is imported; to_dict()/export_json() produce the same
+JSON shape for anything that still reads the file.
+
+The tracker JSON sits in the shared OneDrive folder, while each
+machine has its own database. The store records the file's mtime, size
+and SHA-256 whenever it imports or exports it. When get_pdss_store() is
+given the file, and before an export overwrites it, changes made there
+since then (by another machine) are merged in: jobs missing locally are
+added, and a job whose updated_date is newer in the file replaces the
+local one. Callers that change jobs or subdivisions export afterwards.
+
+Usage:
+    from services.pdss_store import get_pdss_store
+    store = get_pdss_store(legacy_json=OPERATIONS / "PDSS" / "pdss_tracker.json")
+    with store.transaction():
+        job = store.get_job(job_id)
+        ...
+        store.upsert_jobs([job])
+    store.jobs(builder="holt", status="New")
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger('pdss_store')
+
+PDSS_DB_PATH = Path(os.environ.get("STO_PDSS_DB", "data/pdss.db"))
+
+# Seconds to wait for another process's write transaction
+BUSY_TIMEOUT = 30
+
+# PDSS job fields; besides the JSON record, each has its own jobs column
+# (added by _ensure_job_columns) for indexed queries and columnar reports
+JOB_COLUMNS = [
+    "job_id",
+    "builder",
+    "subdivision",
+    "lot",
+    "address",
+    "plan_code",
+    "plan_status",      # New, In Progress, Complete
+    "takeoff_status",   # Not Started, In Progress, Complete
+    "quote_status",     # Not Started, Sent, Approved
+    "documents_complete",
+    "assigned_to",
+    "priority",         # High, Medium, Low
+    "due_date",
+    "notes",
+    "created_date",
+    "updated_date",
+]
+
+FIELD_COLUMNS = JOB_COLUMNS[1:]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    builder TEXT,
+    subdivision TEXT,
+    plan_status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_builder ON jobs (builder, subdivision);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (plan_status);
+CREATE TABLE IF NOT EXISTS subdivisions (
+    sub_key TEXT PRIMARY KEY,
+    builder TEXT,
+    subdivision TEXT,
+    status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subdivisions_builder ON subdivisions (builder);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+class PDSSStore:
+    """PDSS jobs/subdivisions as rows; the full record is kept as JSON in `data`"""
+
+    def __init__(self, db_path: Path = PDSS_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; multi-statement changes go through transaction()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._ensure_job_columns()
+
+    def _ensure_job_columns(self):
+        """Add missing field columns to jobs and fill them from the JSON records"""
+        if not self._missing_job_columns():
+            return
+        try:
+            with self.transaction():
+                # Re-check under the write lock: another process may have added them
+                missing = self._missing_job_columns()
+                if not missing:
+                    return
+                for column in missing:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+                rows = [
+                    [_column_value(job.get(column)) for column in missing] + [job_id]
+                    for job_id, job in ((job_id, json.loads(data)) for job_id, data in
+                                        self._conn.execute("SELECT job_id, data FROM jobs").fetchall())
+                ]
+                assignments = ", ".join(f"{column} = ?" for column in missing)
+                self._conn.executemany(f"UPDATE jobs SET {assignments} WHERE job_id = ?", rows)
+        except sqlite3.OperationalError as e:
+            if "duplicate column" not in str(e):
+                raise
+            logger.info("PDSS job columns were added by another process")
+
+    def _missing_job_columns(self) -> list:
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        return [column for column in FIELD_COLUMNS if column not in existing]
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run reads and writes atomically. Takes the database write lock up
+        front (BEGIN IMMEDIATE), so a concurrent writer waits instead of
+        working from stale rows. Nested calls join the outer transaction.
+        """
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield self
+                finally:
+                    self._depth -= 1
+                return
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield self
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            else:
+                self._conn.execute("COMMIT")
+            finally:
+                self._depth = 0
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # -------------------------------------------------------------------------
+    # Jobs
+    # -------------------------------------------------------------------------
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        rows = self._query("SELECT data FROM jobs WHERE job_id = ?", (job_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_jobs(self, job_ids) -> dict:
+        """{job_id: job} for the given ids that exist"""
+        jobs = {}
+        job_ids = list(job_ids)
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(job_ids), 500):
+            chunk = job_ids[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            for job_id, data in self._query(f"SELECT job_id, data FROM jobs WHERE job_id IN ({marks})", tuple(chunk)):
+                jobs[job_id] = json.loads(data)
+        return jobs
+
+    def jobs(self, builder: str = None, subdivision: str = None, status: str = None) -> dict:
+        """{job_id: job}, optionally filtered (indexed) by builder, subdivision and plan status"""
+        clauses, params = [], []
+        for column, value in (("builder", builder), ("subdivision", subdivision), ("plan_status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._query(f"SELECT job_id, data FROM jobs{where} ORDER BY job_id", tuple(params))
+        return {job_id: json.loads(data) for job_id, data in rows}
+
+    def job_ids(self) -> set:
+        return {row[0] for row in self._query("SELECT job_id FROM jobs")}
+
+    def jobs_frame(self, columns: list = JOB_COLUMNS):
+        """
+        Jobs as a pandas DataFrame (object columns, None for missing),
+        ordered by job_id - read straight from the field columns, no JSON
+        parsing. Requires pandas.
+        """
+        import pandas as pd
+
+        columns = ["job_id"] + [column for column in columns if column in FIELD_COLUMNS]
+        rows = self._query(f"SELECT {', '.join(columns)} FROM jobs ORDER BY job_id")
+        # object dtype: string dtype inference costs more than the query
+        return pd.DataFrame(rows, columns=columns, dtype=object)
+
+    def upsert_jobs(self, jobs: list):
+        """Insert or replace whole job records (each needs "job_id")"""
+        rows = [
+            [job["job_id"]] + [_column_value(job.get(column)) for column in FIELD_COLUMNS]
+            + [json.dumps(job, default=str)]
+            for job in jobs
+        ]
+        if rows:
+            with self.transaction():
+                self._conn.executemany(
+                    f"INSERT OR REPLACE INTO jobs ({', '.join(JOB_COLUMNS)}, data) "
+                    f"VALUES ({', '.join('?' * (len(JOB_COLUMNS) + 1))})", rows
+                )
+
+    def update_job(self, job_id: str, fields: dict) -> bool:
+        """Merge fields into one job; False if it doesn't exist"""
+        with self.transaction():
+            job = self.get_job(job_id)
+            if job is None:
+                return False
+            job.update(fields)
+            self.upsert_jobs([job])
+        return True
+
+    # -------------------------------------------------------------------------
+    # Subdivisions (added by intake_processor)
+    # -------------------------------------------------------------------------
+
+    def get_subdivision(self, sub_key: str) -> Optional[dict]:
+        rows = self._query("SELECT data FROM subdivisions WHERE sub_key = ?", (sub_key,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def subdivisions(self, builder: str = None) -> dict:
+        if builder is None:
+            rows = self._query("SELECT sub_key, data FROM subdivisions ORDER BY sub_key")
+        else:
+            rows = self._query("SELECT sub_key, data FROM subdivisions WHERE builder = ? ORDER BY sub_key", (builder,))
+        return {sub_key: json.loads(data) for sub_key, data in rows}
+
+    def upsert_subdivision(self, sub_key: str, entry: dict):
+        with self.transaction():
+            self._conn.execute(
+                "INSERT OR REPLACE INTO subdivisions (sub_key, builder, subdivision, status, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (sub_key, entry.get("builder"), entry.get("subdivision"), entry.get("status"),
+                 json.dumps(entry, default=str)),
+            )
+
+    def add_subdivision(self, sub_key: str, entry: dict) -> bool:
+        """Add a subdivision unless it already exists (checked in the same transaction)"""
+        with self.transaction():
+            if self.get_subdivision(sub_key) is not None:
+                return False
+            self.upsert_subdivision(sub_key, entry)
+        return True
+
+    # -------------------------------------------------------------------------
+    # Metadata (last_sync, last_updated)
+    # -------------------------------------------------------------------------
+
+    def get_meta(self, key: str, default=None):
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else default
+
+    def set_meta(self, key: str, value):
+        with self.transaction():
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # -------------------------------------------------------------------------
+    # JSON compatibility
+    # -------------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        """The store in pdss_tracker.json's shape"""
+        data = {"jobs": self.jobs(), "last_sync": self.get_meta("last_sync")}
+        subdivisions = self.subdivisions()
+        if subdivisions:
+            data["subdivisions"] = subdivisions
+            data["last_updated"] = self.get_meta("last_updated")
+        return data
+
+    def export_json(self, path: Path) -> str:
+        """
+        Write the pdss_tracker.json view (temp file + replace), after
+        merging in changes made to the file since this store last read or
+        wrote it
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with self.transaction():
+            if self.json_changed(path):
+                self.merge_json(path)
+            content = json.dumps(self.to_dict(), indent=2, default=str).encode('utf-8')
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self._record_json(path, content)
+        logger.info(f"PDSS exported to {path}")
+        return str(path)
+
+    def import_json(self, path: Path) -> int:
+        """Load jobs/subdivisions from a pdss_tracker.json; returns rows imported"""
+        content, data = _read_json(path)
+
+        jobs = [dict(job, job_id=job_id) for job_id, job in data.get("jobs", {}).items()]
+        subdivisions = data.get("subdivisions", {})
+        with self.transaction():
+            self.upsert_jobs(jobs)
+            for sub_key, entry in subdivisions.items():
+                self.upsert_subdivision(sub_key, entry)
+            for key in ("last_sync", "last_updated"):
+                if data.get(key):
+                    self.set_meta(key, data[key])
+            self.set_meta("imported_from", str(path))
+            self._record_json(path, content)
+        logger.info(f"Imported {len(jobs)} jobs and {len(subdivisions)} subdivisions from {path}")
+        return len(jobs) + len(subdivisions)
+
+    def merge_json(self, path: Path) -> int:
+        """
+        Merge a pdss_tracker.json changed elsewhere: add jobs and
+        subdivisions missing here, and take jobs whose updated_date is
+        newer in the file. Returns rows taken from the file.
+        """
+        content, data = _read_json(path)
+
+        with self.transaction():
+            theirs = data.get("jobs", {})
+            ours = self.get_jobs(theirs)
+            jobs = [
+                dict(job, job_id=job_id) for job_id, job in theirs.items()
+                if job_id not in ours or str(job.get("updated_date") or "") > str(ours[job_id].get("updated_date") or "")
+            ]
+            self.upsert_jobs(jobs)
+            subdivisions = [sub_key for sub_key, entry in data.get("subdivisions", {}).items()
+                            if self.add_subdivision(sub_key, entry)]
+            for key in ("last_sync", "last_updated"):
+                if str(data.get(key) or "") > str(self.get_meta(key) or ""):
+                    self.set_meta(key, data[key])
+            self._record_json(path, content)
+        logger.info(f"Merged {len(jobs)} jobs and {len(subdivisions)} subdivisions changed in {path}")
+        return len(jobs) + len(subdivisions)
+
+    def json_changed(self, path: Path) -> bool:
+        """True if the file differs from the version last imported or exported here"""
+        path = Path(path)
+        try:
+            info = path.stat()
+        except FileNotFoundError:
+            return False
+        state = self.get_meta(f"json_state:{path}")
+        if state is None:
+            return True
+        state = json.loads(state)
+        if state["mtime"] == info.st_mtime and state["size"] == info.st_size:
+            return False
+        # Sync clients touch mtimes; only a content change counts
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest() != state["sha256"]
+
+    def _record_json(self, path: Path, content: bytes):
+        """Remember the file's mtime, size and hash as just read or written"""
+        info = Path(path).stat()
+        self.set_meta(f"json_state:{path}", json.dumps({
+            "mtime": info.st_mtime,
+            "size": info.st_size,
+            "sha256": hashlib.sha256(content).hexdigest(),
+        }))
+
+    def is_empty(self) -> bool:
+        return not self._query("SELECT 1 FROM jobs LIMIT 1") and not self._query("SELECT 1 FROM subdivisions LIMIT 1")
+
+    def close(self):
+        self._conn.close()
+
+def _read_json(path: Path) -> tuple:
+    """(raw bytes, parsed data) of a pdss_tracker.json"""
+    with open(path, 'rb') as f:
+        content = f.read()
+    return content, json.loads(content.decode('utf-8'))
+
+def _column_value(value):
+    """A field as stored in its column: scalars as-is, booleans as True/False text (as CSV shows them)"""
+    if isinstance(value, bool):
+        return str(value)
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return json.dumps(value, default=str)
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_pdss_store(legacy_json: Path = None) -> PDSSStore:
+    """
+    The process-wide store at PDSS_DB_PATH. If it is new and legacy_json
+    (the old pdss_tracker.json) exists, that file is imported first;
+    after that, changes made to the file elsewhere are merged in before
+    the store is returned (a stat when it hasn't changed).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PDSSStore()
+        if legacy_json and Path(legacy_json).exists() and _store.get_meta("imported_from") is None:
+            try:
+                with _store.transaction():
+                    if _store.is_empty():
+                        _store.import_json(legacy_json)
+                    else:
+                        _store.set_meta("imported_from", "")
+            except (json.JSONDecodeError, OSError) as e:
+                logger.error(f"Could not import PDSS file {legacy_json}: {e}")
+        elif legacy_json:
+            try:
+                if _store.json_changed(legacy_json):
+                    _store.merge_json(legacy_json)
+            except (json.JSONDecodeError, OSError) as e:
+                # Possibly mid-sync; merged on a later read or export
+                logger.warning(f"Could not merge PDSS file {legacy_json}: {e}")
+    return _store
@@ -0,0 +1,394 @@
+"""
+SupplyPro Scraper - Headless Playwright scraping of the SupplyPro portal
+
+One scrape logs in at most once and fetches the dashboard, the EPO
+report and the new-documents list concurrently:
+
+1. The authenticated browser storage state (cookies, local storage) is
+   saved to SUPPLYPRO_STATE_PATH after a login and reused by the next
+   run, so a scheduled sync only logs in when the portal session expired.
+2. Each page is loaded in its own browser context created from that
+   state, and the three pages are fetched with asyncio.gather.
+3. Lists are read from the portal's Excel export when the page offers
+   one (one download instead of paging through the grid); the DOM table
+   is only scraped, page by page, when there is no export.
+
+Rows come back as dicts keyed by field name (see EPO_COLUMNS and
+DOCUMENT_COLUMNS), independent of the portal's column order. Playwright
+is optional: `pip install playwright && playwright install chromium`.
+
+Usage:
+    scraper = SupplyProScraper(base_url, username, password)
+    result = await scraper.scrape(epo_days_back=30, documents_days_back=7)
+    result.dashboard["new_orders"], result.epos[0]["supplier_order"]
+
+`python -m services.supplypro_fixture` (sto-agents-service) runs the
+scraper against a local HTML stand-in for the portal.
+
+sto-agents-service/services/supplypro_scraper.py is the implementation;
+sto-agents-complete/services/supplypro_scraper.py is an identical copy
+(tests/test_supplypro_scraper.py checks that they match).
+"""
+
+import io
+import os
+import re
+import csv
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+
+logger = logging.getLogger("sto.supplypro_scraper")
+
+SUPPLYPRO_STATE_PATH = os.getenv("SUPPLYPRO_STATE_PATH", "data/supplypro_state.json")
+SUPPLYPRO_HEADLESS = os.getenv("SUPPLYPRO_HEADLESS", "true").lower() != "false"
+SUPPLYPRO_TIMEOUT_SECONDS = float(os.getenv("SUPPLYPRO_TIMEOUT_SECONDS", "60"))
+
+# Portal pages, relative to the base URL
+PORTAL_PAGES = {
+    "dashboard": "Dashboard.aspx",
+    "epo_report": "Reports/EPOReport.aspx",
+    "new_documents": "Documents/NewDocuments.aspx",
+}
+
+# CSS selectors; several alternatives separated by commas
+SELECTORS = {
+    "username": "input[name*='user' i], input[type='email']",
+    "password": "input[type='password']",
+    "login": "button[type='submit'], input[type='submit']",
+    "account": "select[name*='account' i]",
+    "date_from": "input[name*='from' i]",
+    "date_to": "input[name*='dateto' i], input[name*='date_to' i], input[name$='to' i]",
+    "run_report": "button:has-text('Run'), input[value='Run' i]",
+    "export": "a:has-text('Excel'), button:has-text('Excel'), a:has-text('Export'), button:has-text('Export')",
+    "next_page": "a:has-text('Next'):not([disabled]):not(.disabled)",
+}
+
+# Dashboard field -> label shown next to the count
+DASHBOARD_LABELS = {
+    "new_orders": "New Orders",
+    "to_do_orders": "To Do",
+    "change_orders": "Change Orders",
+    "cancellations": "Cancellations",
+    "pending_back_charges": "Pending Back Charges",
+    "completed_back_charges": "Completed Back Charges",
+    "future_orders_10_days": "Next 10 Days",
+    "future_orders_30_days": "Next 30 Days",
+}
+
+# Row field -> accepted column headers (normalized, first match wins)
+EPO_COLUMNS = {
+    "account": ("account", "builder"),
+    "community": ("community", "subdivision"),
+    "job_name": ("job", "job name"),
+    "task": ("task", "description"),
+    "supplier_order": ("supplier order", "supplier order number", "order", "order number", "epo"),
+    "submitted_date": ("submitted", "submitted date", "date submitted"),
+    "task_status": ("task status",),
+    "epo_status": ("epo status", "status"),
+    "amount": ("amount", "total", "epo amount"),
+}
+
+DOCUMENT_COLUMNS = {
+    "builder": ("builder", "account"),
+    "folder": ("folder",),
+    "community": ("community", "subdivision"),
+    "job_name": ("job", "job name"),
+    "doc_name": ("document", "document name", "name", "file name"),
+    "doc_type": ("type", "document type"),
+    "size": ("size",),
+    "revision": ("revision", "rev"),
+    "date_added": ("date added", "added"),
+    "uploaded_by": ("uploaded by", "added by"),
+    "viewed": ("viewed",),
+}
+
+MAX_TABLE_PAGES = 50
+
+_TABLES_JS = """tables => tables.map(t => Array.from(t.rows).map(
+    r => Array.from(r.cells).map(c => c.innerText.trim())))"""
+
+
+class ScraperError(Exception):
+    """The portal could not be scraped"""
+
+
+class ScraperUnavailable(ScraperError):
+    """Playwright is not installed"""
+
+
+@dataclass
+class ScrapeResult:
+    dashboard: Dict[str, int] = field(default_factory=dict)
+    epos: List[Dict[str, str]] = field(default_factory=list)
+    documents: List[Dict[str, str]] = field(default_factory=list)
+    sources: Dict[str, str] = field(default_factory=dict)      # page -> "export" | "table" | "page"
+    timings: Dict[str, float] = field(default_factory=dict)
+    logged_in: bool = False                                    # False when the saved session was reused
+    errors: List[str] = field(default_factory=list)
+
+
+# ============================================
+# PARSING
+# ============================================
+
+
+def _header_key(header: Any) -> str:
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", str(header or "").lower()).split())
+
+
+def map_rows(table: Sequence[Sequence[Any]], columns: Dict[str, Tuple[str, ...]]) -> List[Dict[str, str]]:
+    """[header row, *rows] -> [{field: value}] using the first matching header per field"""
+    if not table:
+        return []
+    headers = [_header_key(h) for h in table[0]]
+    positions = {}
+    for name, accepted in columns.items():
+        for header in accepted:
+            if header in headers:
+                positions[name] = headers.index(header)
+                break
+
+    rows = []
+    for raw in table[1:]:
+        cells = ["" if v is None else str(v).strip() for v in raw]
+        if not any(cells):
+            continue
+        rows.append({name: cells[i] if i < len(cells) else "" for name, i in positions.items()})
+    return rows
+
+
+def parse_export(filename: str, content: bytes) -> List[List[Any]]:
+    """Rows of a downloaded CSV or Excel export, header first"""
+    if filename.lower().endswith(".csv"):
+        return list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+    try:
+        import openpyxl
+    except ImportError:
+        raise ScraperError("openpyxl is not installed, cannot read Excel export")
+
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        rows = [list(row) for row in workbook.active.iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+    # Reports often start with a title block; the header is the first full row
+    width = max((sum(v is not None for v in row) for row in rows), default=0)
+    start = next((i for i, row in enumerate(rows) if sum(v is not None for v in row) == width), 0)
+    return rows[start:]
+
+
+def parse_dashboard(text: str) -> Dict[str, int]:
+    """Counts next to the DASHBOARD_LABELS in the dashboard's text"""
+    counts = {}
+    for name, label in DASHBOARD_LABELS.items():
+        match = re.search(re.escape(label) + r"\D{0,40}?([\d,]+)", text, re.IGNORECASE)
+        if match:
+            counts[name] = int(match.group(1).replace(",", ""))
+    return counts
+
+
+# ============================================
+# SCRAPER
+# ============================================
+
+
+class SupplyProScraper:
+    """Playwright scraper with persisted session and concurrent page fetches"""
+
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        account: Optional[str] = None,
+        state_path: str = SUPPLYPRO_STATE_PATH,
+        headless: bool = SUPPLYPRO_HEADLESS,
+        timeout: float = SUPPLYPRO_TIMEOUT_SECONDS,
+        pages: Optional[Dict[str, str]] = None,
+    ):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.username = username
+        self.password = password
+        self.account = account
+        self.state_path = Path(state_path)
+        self.headless = headless
+        self.timeout_ms = timeout * 1000
+        self.pages = {**PORTAL_PAGES, **(pages or {})}
+        self._login_lock = asyncio.Lock()
+
+    def url(self, page: str) -> str:
+        return urljoin(self.base_url, self.pages[page])
+
+    async def scrape(self, epo_days_back: int = 30, documents_days_back: int = 7) -> ScrapeResult:
+        """Dashboard counts, EPO rows and new-document rows"""
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError:
+            raise ScraperUnavailable("playwright is not installed")
+
+        result = ScrapeResult()
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=self.headless)
+            try:
+                started = time.perf_counter()
+                result.logged_in = await self._ensure_session(browser)
+                result.timings["session"] = time.perf_counter() - started
+
+                fetched = await asyncio.gather(
+                    self._timed("dashboard", self._fetch_dashboard(browser), result),
+                    self._timed("epo_report", self._fetch_list(browser, "epo_report", EPO_COLUMNS, epo_days_back), result),
+                    self._timed("new_documents", self._fetch_list(browser, "new_documents", DOCUMENT_COLUMNS, documents_days_back), result),
+                    return_exceptions=True,
+                )
+            finally:
+                await browser.close()
+
+        for page, value in zip(("dashboard", "epo_report", "new_documents"), fetched):
+            if isinstance(value, Exception):
+                logger.error(f"SupplyPro {page} failed: {value}")
+                result.errors.append(f"{page}: {value}")
+                continue
+            data, source = value
+            result.sources[page] = source
+            if page == "dashboard":
+                result.dashboard = data
+            elif page == "epo_report":
+                result.epos = data
+            else:
+                result.documents = data
+
+        if len(result.errors) == len(fetched):
+            raise ScraperError("; ".join(result.errors))
+        return result
+
+    async def login(self) -> bool:
+        """Validate the saved session, logging in if needed (raises ScraperError on failure)"""
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError:
+            raise ScraperUnavailable("playwright is not installed")
+
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=self.headless)
+            try:
+                await self._ensure_session(browser)
+            finally:
+                await browser.close()
+        return True
+
+    async def _timed(self, page: str, fetch, result: ScrapeResult):
+        started = time.perf_counter()
+        try:
+            return await fetch
+        finally:
+            result.timings[page] = time.perf_counter() - started
+
+    # ----- session -----
+
+    async def _new_context(self, browser):
+        state = str(self.state_path) if self.state_path.exists() else None
+        context = await browser.new_context(storage_state=state, accept_downloads=True)
+        context.set_default_timeout(self.timeout_ms)
+        return context
+
+    async def _on_login_page(self, page) -> bool:
+        return await page.query_selector(SELECTORS["password"]) is not None
+
+    async def _ensure_session(self, browser) -> bool:
+        """Reuse the saved session, or log in and save it. True if a login happened."""
+        async with self._login_lock:
+            context = await self._new_context(browser)
+            try:
+                page = await context.new_page()
+                await page.goto(self.url("dashboard"), wait_until="domcontentloaded")
+                if not await self._on_login_page(page):
+                    return False
+
+                logger.info("SupplyPro session expired or missing, logging in")
+                await page.fill(SELECTORS["username"], self.username)
+                await page.fill(SELECTORS["password"], self.password)
+                await page.click(SELECTORS["login"])
+                await page.wait_for_load_state("domcontentloaded")
+                if await self._on_login_page(page):
+                    raise ScraperError("SupplyPro login failed (check the SupplyPro username and password)")
+
+                if self.account and await page.query_selector(SELECTORS["account"]):
+                    await page.select_option(SELECTORS["account"], label=self.account)
+                    await page.wait_for_load_state("domcontentloaded")
+
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                await context.storage_state(path=str(self.state_path))
+                return True
+            finally:
+                await context.close()
+
+    async def _open(self, browser, name: str):
+        context = await self._new_context(browser)
+        page = await context.new_page()
+        await page.goto(self.url(name), wait_until="domcontentloaded")
+        if await self._on_login_page(page):
+            await context.close()
+            raise ScraperError(f"{name}: session was rejected by the portal")
+        return context, page
+
+    # ----- pages -----
+
+    async def _fetch_dashboard(self, browser) -> Tuple[Dict[str, int], str]:
+        context, page = await self._open(browser, "dashboard")
+        try:
+            return parse_dashboard(await page.inner_text("body")), "page"
+        finally:
+            await context.close()
+
+    async def _fetch_list(self, browser, name: str, columns, days_back: int) -> Tuple[List[Dict[str, str]], str]:
+        context, page = await self._open(browser, name)
+        try:
+            await self._apply_date_range(page, days_back)
+            if await page.query_selector(SELECTORS["export"]):
+                try:
+                    return map_rows(await self._download_export(page), columns), "export"
+                except Exception as e:
+                    logger.warning(f"SupplyPro {name} export failed, reading the table instead: {e}")
+            return map_rows(await self._read_table(page), columns), "table"
+        finally:
+            await context.close()
+
+    async def _apply_date_range(self, page, days_back: int):
+        if not await page.query_selector(SELECTORS["date_from"]):
+            return
+        today = datetime.now()
+        await page.fill(SELECTORS["date_from"], (today - timedelta(days=days_back)).strftime("%m/%d/%Y"))
+        if await page.query_selector(SELECTORS["date_to"]):
+            await page.fill(SELECTORS["date_to"], today.strftime("%m/%d/%Y"))
+        if await page.query_selector(SELECTORS["run_report"]):
+            await page.click(SELECTORS["run_report"])
+            await page.wait_for_load_state("domcontentloaded")
+
+    async def _download_export(self, page) -> List[List[Any]]:
+        async with page.expect_download() as download_info:
+            await page.click(SELECTORS["export"])
+        download = await download_info.value
+        path = await download.path()
+        return parse_export(download.suggested_filename, Path(path).read_bytes())
+
+    async def _read_table(self, page) -> List[List[str]]:
+        """Largest table on the page, following the pager up to MAX_TABLE_PAGES"""
+        table: List[List[str]] = []
+        for _ in range(MAX_TABLE_PAGES):
+            tables = await page.eval_on_selector_all("table", _TABLES_JS)
+            current = max(tables, key=len, default=[])
+            table.extend(current if not table else current[1:])
+
+            next_link = await page.query_selector(SELECTORS["next_page"])
+            if next_link is None:
+                break
+            await next_link.click()
+            await page.wait_for_load_state("domcontentloaded")
+        return table
@@ -0,0 +1,22 @@
+"""Intake filename parsing (agents.plan_intake) against the real names in PARSE_EXAMPLES"""
+
+import pytest
+
+from agents.plan_intake import PARSE_EXAMPLES, parse_filename, parse_many
+
+
+@pytest.mark.parametrize("filename, expected", PARSE_EXAMPLES, ids=[name for name, _ in PARSE_EXAMPLES])
+def test_parse_filename_matches_examples(filename, expected):
+    parsed = parse_filename(filename)
+    assert {key: parsed[key] for key in expected} == expected
+
+
+def test_parse_many_matches_parse_filename():
+    filenames = [name for name, _ in PARSE_EXAMPLES] * 2
+    assert parse_many(filenames) == [parse_filename(name) for name in filenames]
+
+
+def test_parsed_results_are_copies():
+    filename = PARSE_EXAMPLES[0][0]
+    parse_filename(filename)["lot_number"] = "changed"
+    assert parse_filename(filename)["lot_number"] == PARSE_EXAMPLES[0][1]["lot_number"]
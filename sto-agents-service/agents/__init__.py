@@ -9,22 +9,71 @@ This module contains the agent implementations:
 - DocumentTracker: Monitors document status and completeness
 - JobTracker: Tracks job lifecycle, start dates, and progress
 - ExcelImporter: Imports data from Excel files (Pride Board, PDSS, EPO, etc.)
+
+Agent modules are imported on first use (ExcelImporter pulls in pandas),
+so importing this package is cheap. get_agent() returns one shared
+instance per agent instead of constructing a new one per request.
 """
 
-from .supplypro_reporter import SupplyProReporter
-from .plan_intake import PlanIntakeMonitor
-from .completeness_checker import CompletenessChecker
-from .plan_manager import PlanManager
-from .document_tracker import DocumentTracker
-from .job_tracker import JobTracker
-from .excel_importer import ExcelImporter
-
-__all__ = [
-    "SupplyProReporter",
-    "PlanIntakeMonitor",
-    "CompletenessChecker",
-    "PlanManager",
-    "DocumentTracker",
-    "JobTracker",
-    "ExcelImporter",
-]
+import importlib
+import threading
+from typing import TYPE_CHECKING, Any, Dict
+
+# Agent class -> module that defines it
+AGENT_MODULES = {
+    "SupplyProReporter": "supplypro_reporter",
+    "PlanIntakeMonitor": "plan_intake",
+    "CompletenessChecker": "completeness_checker",
+    "PlanManager": "plan_manager",
+    "DocumentTracker": "document_tracker",
+    "JobTracker": "job_tracker",
+    "ExcelImporter": "excel_importer",
+}
+
+__all__ = list(AGENT_MODULES) + ["get_agent", "get_agent_class"]
+
+_instances: Dict[str, Any] = {}
+_instances_lock = threading.Lock()
+
+
+def get_agent_class(name: str) -> type:
+    """Import an agent's module on first use and return the class"""
+    module_name = AGENT_MODULES.get(name)
+    if module_name is None:
+        raise KeyError(f"Unknown agent '{name}'")
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, name)
+
+
+def get_agent(name: str) -> Any:
+    """Shared agent instance, constructed once per process"""
+    agent = _instances.get(name)
+    if agent is None:
+        with _instances_lock:
+            agent = _instances.get(name)
+            if agent is None:
+                agent = _instances[name] = get_agent_class(name)()
+    return agent
+
+
+def __getattr__(name: str):
+    # `from agents import JobTracker` keeps working, imported lazily
+    if name in AGENT_MODULES:
+        cls = get_agent_class(name)
+        globals()[name] = cls
+        return cls
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(AGENT_MODULES))
+
+
+if TYPE_CHECKING:
+    from .supplypro_reporter import SupplyProReporter
+    from .plan_intake import PlanIntakeMonitor
+    from .completeness_checker import CompletenessChecker
+    from .plan_manager import PlanManager
+    from .document_tracker import DocumentTracker
+    from .job_tracker import JobTracker
+    from .excel_importer import ExcelImporter
@@ -5,16 +5,34 @@ All agents should inherit from this class and implement the required methods.
 """
 
 import os
+import time
+import logging
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
+
+from services.alert_store import get_alert_store
+from services.logging_config import get_agent_logger, log_fields
+from services.metrics import AGENT_ERRORS, AGENT_STAGE_SECONDS, RECORDS_PROCESSED, instrumented_client
+
+LOG_LEVELS = {
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "debug": logging.DEBUG,
+}
 
 
 class BaseAgent(ABC):
     """Abstract base class for STO agents"""
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, key: str):
         self.name = name
+        # Queue/schedule key ("supplypro"); metrics are labelled with it so
+        # agent stages and queue jobs share one label value
+        self.key = key
+        self.logger = get_agent_logger(name)
         self.last_run: datetime | None = None
         self.run_count = 0
 
@@ -23,16 +41,51 @@ class BaseAgent(ABC):
         """Run the agent and return results"""
         pass
 
-    def log(self, message: str, level: str = "info"):
-        """Log a message with timestamp"""
-        timestamp = datetime.now().isoformat()
-        prefix = {
-            "info": "INFO",
-            "warning": "WARN",
-            "error": "ERROR",
-            "debug": "DEBUG",
-        }.get(level, "INFO")
-        print(f"[{timestamp}] [{prefix}] [{self.name}] {message}")
+    def log(self, message: str, level: str = "info", **fields):
+        """
+        Log a structured message (extra fields are added to the JSON record;
+        names that clash with LogRecord attributes, e.g. args, get a field_ prefix)
+        """
+        self.logger.log(LOG_LEVELS.get(level, logging.INFO), message, extra=log_fields(fields) or None)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time a stage of the agent (sto_agent_stage_duration_seconds)"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            AGENT_ERRORS.inc(agent=self.key, stage=stage)
+            raise
+        finally:
+            AGENT_STAGE_SECONDS.observe(time.perf_counter() - start, agent=self.key, stage=stage)
+
+    def count_records(self, kind: str, count: int = 1):
+        """Count processed records (sto_records_processed_total)"""
+        RECORDS_PROCESSED.inc(count, agent=self.key, kind=kind)
+
+    def http_client(self, **kwargs):
+        """httpx.AsyncClient with request latency metrics"""
+        return instrumented_client(**kwargs)
+
+    async def send_alert_transitions(
+        self, source: str, raised: list[tuple], resolve: bool = True
+    ) -> tuple[int, int]:
+        """
+        Reconcile this run's alerts, given as (alert_key, severity, payload),
+        with the alert store and send only state changes via self.send_alert.
+        Returns (sent, suppressed).
+        """
+        alert_store = get_alert_store()
+        reconciled = alert_store.reconcile(source, raised, resolve=resolve)
+
+        sent = []
+        for transition in reconciled.transitions:
+            if await self.send_alert(transition.payload):
+                sent.append(transition)
+
+        alert_store.commit(reconciled, sent)
+        return len(sent), reconciled.suppressed
 
     def get_env(self, key: str, default: str | None = None) -> str | None:
         """Get environment variable with optional default"""
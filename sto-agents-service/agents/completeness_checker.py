@@ -11,9 +11,11 @@ import os
 import logging
 from datetime import datetime
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any, Set
+from dataclasses import asdict
+from typing import Optional, List, Dict, Any, Set, AsyncIterator
 
-import httpx
+from services.document_index import DocumentIndex, build_document_index
+from services.snapshot_cache import get_snapshot_cache
 
 from .base import BaseAgent
 
@@ -24,6 +26,9 @@ logger = logging.getLogger("completeness_checker")
 # CONFIGURATION
 # =============================================================================
 
+# Jobs whose documents are fetched together when streaming results
+STREAM_BATCH_SIZE = 25
+
 # Required documents by builder
 REQUIRED_DOCUMENTS = {
     "richmond_american": {
@@ -140,7 +145,7 @@ class CompletenessChecker(BaseAgent):
     """Agent for checking document completeness via MindFlow API"""
 
     def __init__(self):
-        super().__init__("CompletenessChecker")
+        super().__init__("CompletenessChecker", "completeness")
 
         # MindFlow API configuration
         self.api_url = self.get_env("MINDFLOW_API_URL", "http://localhost:3000")
@@ -190,10 +195,15 @@ class CompletenessChecker(BaseAgent):
 
         try:
             # Get active jobs from MindFlow API
-            jobs = await self._get_active_jobs()
+            with self.timer("fetch_jobs"):
+                jobs = await self._get_active_jobs()
+
+            with self.timer("fetch_documents"):
+                index = await build_document_index(jobs, self._get_job_documents)
 
-            for job in jobs:
-                job_result = await self._check_job(job)
+            for job_key, job in index.jobs.items():
+                with self.timer("check_job"):
+                    job_result = self._check_job(job, index, job_key)
                 report.jobs.append(job_result)
                 report.total_jobs += 1
 
@@ -209,6 +219,36 @@ class CompletenessChecker(BaseAgent):
         self.log(f"Check complete: {report.complete}/{report.total_jobs} jobs complete")
         return report
 
+    async def iter_job_results(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[JobCompleteness]:
+        """
+        Yield each job's completeness as soon as its batch of documents is
+        fetched. Memory is bounded by the batch size, not the job count.
+        """
+        jobs = await self._get_active_jobs()
+        for start in range(0, len(jobs), batch_size):
+            index = await build_document_index(jobs[start:start + batch_size], self._get_job_documents)
+            for job_key, job in index.jobs.items():
+                yield self._check_job(job, index, job_key)
+
+    async def stream_records(self, include_complete: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Job records (with their alert) followed by a summary, for streaming endpoints"""
+        total = complete = 0
+        async for result in self.iter_job_results():
+            total += 1
+            if result.is_complete:
+                complete += 1
+                if not include_complete:
+                    continue
+            record = asdict(result)
+            if not result.is_complete:
+                record["alert"] = result.to_alert_format()
+            yield {"kind": "job", "data": record}
+
+        yield {
+            "kind": "summary",
+            "data": {"total_jobs": total, "complete": complete, "incomplete": total - complete},
+        }
+
     async def _get_active_jobs(self) -> List[Dict[str, Any]]:
         """Fetch active jobs from MindFlow API"""
         if not self.service_token:
@@ -216,27 +256,28 @@ class CompletenessChecker(BaseAgent):
             return self._get_mock_jobs()
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.api_url}/api/v1/jobs",
-                    headers={
-                        "x-service-token": self.service_token,
-                        "Content-Type": "application/json",
-                    },
-                    params={"status": "active"},
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("jobs", data) if isinstance(data, dict) else data
+            snapshot = await get_snapshot_cache().get(
+                f"{self.api_url}/api/v1/jobs",
+                params={"status": "active"},
+                headers={
+                    "x-service-token": self.service_token,
+                    "Content-Type": "application/json",
+                },
+            )
+            return snapshot.items
 
         except Exception as e:
             self.log(f"Failed to fetch jobs from API: {e}", "warning")
             return self._get_mock_jobs()
 
-    async def _check_job(self, job: Dict[str, Any]) -> JobCompleteness:
-        """Check completeness for a single job"""
+    def _requirements_for(self, job: Dict[str, Any]) -> Dict[str, List[str]]:
         builder = job.get("builder", "default")
         builder_key = builder.lower().replace(" ", "_") if builder else "default"
+        return self.requirements.get(builder_key, self.requirements["default"])
+
+    def _check_job(self, job: Dict[str, Any], index: DocumentIndex, job_key: str) -> JobCompleteness:
+        """Check completeness for a single job against the run's document index"""
+        builder = job.get("builder", "default")
 
         result = JobCompleteness(
             builder=builder,
@@ -249,16 +290,13 @@ class CompletenessChecker(BaseAgent):
         )
 
         # Get requirements for this builder
-        reqs = self.requirements.get(builder_key, self.requirements["default"])
+        reqs = self._requirements_for(job)
         required_docs = reqs.get("required", [])
         optional_docs = reqs.get("optional", [])
 
-        # Get existing documents for this job
-        existing_docs = await self._get_job_documents(job.get("id"))
-
         # Check required documents
         for doc_type in required_docs:
-            found = self._has_document(existing_docs, doc_type)
+            found = index.has(job_key, doc_type)
             result.documents.append(DocumentCheck(
                 doc_type=doc_type,
                 required=True,
@@ -272,7 +310,7 @@ class CompletenessChecker(BaseAgent):
         # Check optional documents
         for doc_type in optional_docs:
             if self._should_have_doc(job, doc_type):
-                found = self._has_document(existing_docs, doc_type)
+                found = index.has(job_key, doc_type)
                 result.documents.append(DocumentCheck(
                     doc_type=doc_type,
                     required=False,
@@ -294,7 +332,7 @@ class CompletenessChecker(BaseAgent):
             return []
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.get(
                     f"{self.api_url}/api/v1/jobs/{job_id}/documents",
                     headers={
@@ -310,22 +348,6 @@ class CompletenessChecker(BaseAgent):
 
         return []
 
-    def _has_document(self, documents: List[Dict[str, Any]], doc_type: str) -> bool:
-        """Check if document type exists in document list"""
-        doc_type_lower = doc_type.lower().replace("_", " ")
-
-        for doc in documents:
-            doc_name = (doc.get("doc_type") or doc.get("filename") or "").lower()
-            if doc_type_lower in doc_name or doc_name in doc_type_lower:
-                return True
-
-            # Check filename patterns
-            filename = (doc.get("filename") or "").lower()
-            if doc_type_lower.replace(" ", "") in filename.replace(" ", ""):
-                return True
-
-        return False
-
     def _should_have_doc(self, job: Dict[str, Any], doc_type: str) -> bool:
         """Determine if a job should have a specific optional document"""
         plan_type = job.get("plan_type", job.get("type", "")).upper()
@@ -14,7 +14,9 @@ from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from typing import Any
 
-import httpx
+from services.doc_classifier import DOC_CLASSIFIER
+from services.document_index import DocumentIndex, build_document_index
+from services.snapshot_cache import get_snapshot_cache
 
 from .base import BaseAgent
 
@@ -156,39 +158,24 @@ DOCUMENT_REQUIREMENTS = {
     },
 }
 
-# Document type aliases (normalize different naming conventions)
-DOC_TYPE_ALIASES = {
-    "arch": "ARCH_DRAWINGS",
-    "architectural": "ARCH_DRAWINGS",
-    "arch drawings": "ARCH_DRAWINGS",
-    "architectural drawings": "ARCH_DRAWINGS",
-    "calc": "CALC_PKG",
-    "calcs": "CALC_PKG",
-    "calculations": "CALC_PKG",
-    "calc pkg": "CALC_PKG",
-    "structural calcs": "CALC_PKG",
-    "floor truss": "FLOOR_TRUSS_CALCS",
-    "floor truss calcs": "FLOOR_TRUSS_CALCS",
-    "roof truss": "ROOF_TRUSS_CALCS",
-    "roof truss calcs": "ROOF_TRUSS_CALCS",
-    "plot": "PLOT_PLAN",
-    "plot plan": "PLOT_PLAN",
-    "site plan": "PLOT_PLAN",
-    "plans": "PLANS",
-    "structural": "STRUCTURAL",
-}
+
+# Job statuses that need document tracking
+TRACKED_STATUSES = ("IN_PROGRESS", "APPROVED", "ESTIMATED")
 
 
 class DocumentTracker(BaseAgent):
     """Agent for tracking document status and completeness"""
 
     def __init__(self):
-        super().__init__("DocumentTracker")
+        super().__init__("DocumentTracker", "document_tracker")
 
         # MindFlow API configuration
         self.api_base_url = self.get_env("MINDFLOW_API_URL", "http://localhost:3001/api/v1")
         self.api_token = self.get_env("PORTAL_SYNC_SECRET", "")
 
+        # Index of the last run, reused by get_completeness_summary()
+        self.document_index: DocumentIndex | None = None
+
     async def run(self) -> dict[str, Any]:
         """Run document tracking check"""
         self.log("Starting document tracking check")
@@ -198,6 +185,7 @@ class DocumentTracker(BaseAgent):
             "complete_jobs": 0,
             "incomplete_jobs": 0,
             "alerts_generated": 0,
+            "alerts_suppressed": 0,
             "documents_tracked": 0,
             "errors": [],
             "timestamp": datetime.now().isoformat(),
@@ -205,31 +193,56 @@ class DocumentTracker(BaseAgent):
 
         try:
             # Get active jobs that need document tracking
-            jobs = await self.get_active_jobs()
+            with self.timer("fetch_jobs"):
+                jobs, live = await self.fetch_active_jobs()
             results["jobs_checked"] = len(jobs)
+            if not live:
+                results["errors"].append("MindFlow jobs unavailable; used mock jobs, alerts not reconciled")
             self.log(f"Checking documents for {len(jobs)} active jobs")
 
+            # Fetch and classify every job's documents once
+            with self.timer("fetch_documents"):
+                index = await self.build_document_index(jobs)
+            self.document_index = index
+            for job_key, error in index.errors.items():
+                results["errors"].append(f"Documents unavailable for job {job_key}: {error}")
+
             # Check document completeness for each job
-            for job in jobs:
+            raised = []
+            for job_key, job in index.jobs.items():
                 try:
-                    status = await self.check_job_documents(job)
+                    with self.timer("check_job"):
+                        status = self.job_status(job, index, job_key)
 
                     if status.is_complete:
                         results["complete_jobs"] += 1
                     else:
                         results["incomplete_jobs"] += 1
 
-                        # Generate alerts for incomplete jobs
-                        alerts = self.generate_document_alerts(status, job)
-                        for alert in alerts:
-                            await self.send_alert(alert)
-                            results["alerts_generated"] += 1
+                    # Generate alerts for incomplete jobs (sent below if state changed),
+                    # except for mock jobs or documents
+                    if not status.is_complete and live and job_key not in index.errors:
+                        for alert in self.generate_document_alerts(status, job):
+                            raised.append((
+                                f"document_tracker:{alert.alert_type}:{alert.job_id}:{alert.document_type}",
+                                alert.severity,
+                                alert.to_api_format(),
+                            ))
 
                     results["documents_tracked"] += len(status.received_documents)
 
                 except Exception as e:
                     results["errors"].append(f"Error checking job {job.get('jobNumber', 'unknown')}: {str(e)}")
 
+            # Don't auto-resolve alerts of jobs that could not be checked,
+            # and don't reconcile at all against mock jobs
+            if live:
+                sent, suppressed = await self.send_alert_transitions(
+                    "document_tracker", raised, resolve=not results["errors"]
+                )
+                results["alerts_generated"] = sent
+                results["alerts_suppressed"] = suppressed
+
         except Exception as e:
             self.log(f"Error during document tracking: {e}", "error")
             results["errors"].append(str(e))
@@ -239,22 +252,29 @@ class DocumentTracker(BaseAgent):
 
         return results
 
-    async def get_active_jobs(self) -> list[dict]:
-        """Fetch active jobs from MindFlow that need document tracking"""
+    async def fetch_active_jobs(self) -> tuple[list[dict], bool]:
+        """
+        Fetch active jobs from MindFlow that need document tracking, as
+        (jobs, live); live is False when mock jobs were returned
+        """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/jobs",
-                    params={"status": "IN_PROGRESS,APPROVED,ESTIMATED"},
-                    headers={"x-service-token": self.api_token}
-                )
-                if response.status_code == 200:
-                    return response.json()
+            # Same snapshot as JobTracker's job list, filtered by a status index
+            snapshot = await get_snapshot_cache().get(
+                f"{self.api_base_url}/jobs",
+                headers={"x-service-token": self.api_token},
+            )
+            by_status = snapshot.index("status", lambda job: job.get("status"))
+            return [job for status in TRACKED_STATUSES for job in by_status.get(status, [])], True
         except Exception as e:
             self.log(f"Error fetching active jobs: {e}", "warning")
 
         # Return mock data for testing
-        return self._get_mock_jobs()
+        return self._get_mock_jobs(), False
+
+    async def get_active_jobs(self) -> list[dict]:
+        """Active jobs that need document tracking (mock jobs if MindFlow is unreachable)"""
+        jobs, _ = await self.fetch_active_jobs()
+        return jobs
 
     def _get_mock_jobs(self) -> list[dict]:
         """Mock jobs for testing"""
@@ -295,25 +315,45 @@ class DocumentTracker(BaseAgent):
         ]
 
     async def get_job_documents(self, job_id: str) -> list[dict]:
-        """Fetch documents associated with a job"""
+        """Fetch documents associated with a job (raises if they can't be fetched)"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.get(
                     f"{self.api_base_url}/portal-sync/documents",
                     params={"jobId": job_id},
                     headers={"x-service-token": self.api_token}
                 )
-                if response.status_code == 200:
-                    return response.json()
+                response.raise_for_status()
+                return response.json()
         except Exception as e:
             self.log(f"Error fetching job documents: {e}", "warning")
+            raise
+
+    async def build_document_index(self, jobs: list[dict]) -> DocumentIndex:
+        """Fetch and classify the documents of all jobs once"""
+        index = await build_document_index(jobs, self.get_job_documents)
 
-        return []
+        # Mock documents for testing if the API could not be reached
+        # (index.errors; run() sends no alerts for these jobs)
+        for job_key, job in index.jobs.items():
+            if job_key in index.errors:
+                index.set_types(job_key, self._get_mock_documents(job))
+
+        return index
+
+    def required_documents(self, job: dict) -> list[str]:
+        builder = job.get("builder", "richmond_american")
+        return DOCUMENT_REQUIREMENTS.get(builder, DOCUMENT_REQUIREMENTS["richmond_american"])["required"]
 
     async def check_job_documents(self, job: dict) -> JobDocumentStatus:
-        """Check document completeness for a job"""
+        """Check document completeness for a single job"""
+        index = await self.build_document_index([job])
+        job_key = next(iter(index.jobs))
+        return self.job_status(job, index, job_key)
+
+    def job_status(self, job: dict, index: DocumentIndex, job_key: str) -> JobDocumentStatus:
+        """Document completeness of a job from the run's document index"""
         builder = job.get("builder", "richmond_american")
-        requirements = DOCUMENT_REQUIREMENTS.get(builder, DOCUMENT_REQUIREMENTS["richmond_american"])
 
         status = JobDocumentStatus(
             job_id=job.get("id", ""),
@@ -323,34 +363,15 @@ class DocumentTracker(BaseAgent):
             community=job.get("community", ""),
             lot_number=job.get("lotNumber", 0),
             builder=builder,
-            required_documents=requirements["required"].copy(),
+            required_documents=self.required_documents(job).copy(),
         )
 
-        # Get documents for this job
-        documents = await self.get_job_documents(job.get("id", ""))
-
-        # Normalize and check received documents
-        for doc in documents:
-            doc_type = self.normalize_document_type(doc.get("docType", ""))
-            if doc_type:
-                status.received_documents.append(doc_type)
-
-        # Mock documents for testing if API returned nothing
-        if not status.received_documents:
-            status.received_documents = self._get_mock_documents(job)
-
-        # Calculate missing documents
-        status.missing_documents = [
-            doc for doc in status.required_documents
-            if doc not in status.received_documents
-        ]
+        status.received_documents = index.types(job_key)
+        status.missing_documents = index.missing(job_key, status.required_documents)
 
         # Calculate completeness
         if status.required_documents:
-            received_required = len([
-                d for d in status.received_documents
-                if d in status.required_documents
-            ])
+            received_required = len(status.required_documents) - len(status.missing_documents)
             status.completeness_percentage = (received_required / len(status.required_documents)) * 100
             status.is_complete = len(status.missing_documents) == 0
         else:
@@ -375,25 +396,7 @@ class DocumentTracker(BaseAgent):
 
     def normalize_document_type(self, doc_type: str) -> str | None:
         """Normalize document type to standard format"""
-        if not doc_type:
-            return None
-
-        doc_type_lower = doc_type.lower().strip()
-
-        # Check aliases
-        if doc_type_lower in DOC_TYPE_ALIASES:
-            return DOC_TYPE_ALIASES[doc_type_lower]
-
-        # Check if it's already a standard type
-        standard_types = [
-            "ARCH_DRAWINGS", "CALC_PKG", "FLOOR_TRUSS_CALCS", "FLOOR_TRUSS_LAYOUT",
-            "ROOF_TRUSS_CALCS", "ROOF_TRUSS_LAYOUT", "PLOT_PLAN", "JIO", "HCO",
-            "PLANS", "STRUCTURAL"
-        ]
-        if doc_type.upper() in standard_types:
-            return doc_type.upper()
-
-        return None
+        return DOC_CLASSIFIER.normalize(doc_type)
 
     def generate_document_alerts(self, status: JobDocumentStatus, job: dict) -> list[DocumentAlert]:
         """Generate alerts for document issues"""
@@ -436,17 +439,18 @@ class DocumentTracker(BaseAgent):
 
         return alerts
 
-    async def send_alert(self, alert: DocumentAlert) -> bool:
-        """Send alert to MindFlow"""
+    async def send_alert(self, alert: DocumentAlert | dict) -> bool:
+        """Send alert (or an already formatted alert payload) to MindFlow"""
+        payload = alert.to_api_format() if isinstance(alert, DocumentAlert) else alert
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/alerts",
                     headers={"x-service-token": self.api_token},
-                    json=alert.to_api_format()
+                    json=payload
                 )
                 if response.status_code in (200, 201):
-                    self.log(f"Alert sent: {alert.title}")
+                    self.log(f"Alert sent: {payload['title']}")
                     return True
                 else:
                     self.log(f"Failed to send alert: {response.status_code}", "warning")
@@ -458,7 +462,7 @@ class DocumentTracker(BaseAgent):
     async def update_document_status(self, document_id: str, status: str) -> bool:
         """Update document status in MindFlow"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.patch(
                     f"{self.api_base_url}/portal-sync/documents/{document_id}",
                     headers={"x-service-token": self.api_token},
@@ -472,7 +476,7 @@ class DocumentTracker(BaseAgent):
     async def archive_document(self, document_id: str, notes: str = None) -> bool:
         """Archive a document (mark as outdated but keep for history)"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.patch(
                     f"{self.api_base_url}/portal-sync/documents/{document_id}/archive",
                     headers={"x-service-token": self.api_token},
@@ -487,50 +491,34 @@ class DocumentTracker(BaseAgent):
             self.log(f"Error archiving document: {e}", "error")
             return False
 
-    async def get_completeness_summary(self) -> dict[str, Any]:
-        """Get overall document completeness summary"""
-        jobs = await self.get_active_jobs()
+    async def get_completeness_summary(self, refresh: bool = False) -> dict[str, Any]:
+        """
+        Get overall document completeness summary.
+
+        Uses the last run's document index; pass refresh=True (or call
+        before any run) to fetch jobs and documents again.
+        """
+        index = self.document_index
+        if refresh or index is None:
+            index = self.document_index = await self.build_document_index(await self.get_active_jobs())
 
         summary = {
-            "total_jobs": len(jobs),
+            "total_jobs": len(index.jobs),
             "complete_jobs": 0,
             "incomplete_jobs": 0,
             "critical_jobs": 0,  # Jobs starting soon with missing docs
-            "by_builder": {},
-            "by_community": {},
-            "missing_documents": {},
+            "by_builder": index.rollup(lambda job: job.get("builder", "unknown"), self.required_documents),
+            "by_community": index.rollup(lambda job: job.get("community", "unknown"), self.required_documents),
+            "missing_documents": index.missing_counts(self.required_documents),
+            "index_built_at": index.built_at.isoformat(),
             "timestamp": datetime.now().isoformat(),
         }
 
-        for job in jobs:
-            status = await self.check_job_documents(job)
-            builder = job.get("builder", "unknown")
-            community = job.get("community", "unknown")
-
-            # Count by builder
-            if builder not in summary["by_builder"]:
-                summary["by_builder"][builder] = {"total": 0, "complete": 0, "incomplete": 0}
-            summary["by_builder"][builder]["total"] += 1
-
-            # Count by community
-            if community not in summary["by_community"]:
-                summary["by_community"][community] = {"total": 0, "complete": 0, "incomplete": 0}
-            summary["by_community"][community]["total"] += 1
-
-            if status.is_complete:
+        for job_key, job in index.jobs.items():
+            if index.is_complete(job_key, self.required_documents(job)):
                 summary["complete_jobs"] += 1
-                summary["by_builder"][builder]["complete"] += 1
-                summary["by_community"][community]["complete"] += 1
             else:
                 summary["incomplete_jobs"] += 1
-                summary["by_builder"][builder]["incomplete"] += 1
-                summary["by_community"][community]["incomplete"] += 1
-
-                # Track missing document types
-                for missing in status.missing_documents:
-                    if missing not in summary["missing_documents"]:
-                        summary["missing_documents"][missing] = 0
-                    summary["missing_documents"][missing] += 1
 
                 # Check if critical (starting soon)
                 start_date_str = job.get("startDate")
@@ -21,8 +21,6 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
-import httpx
-
 from .base import BaseAgent
 
 # Optional pandas import - gracefully handle if not installed
@@ -190,7 +188,7 @@ class ExcelImporter(BaseAgent):
     """Agent for importing data from Excel workbooks"""
 
     def __init__(self):
-        super().__init__("ExcelImporter")
+        super().__init__("ExcelImporter", "excel_importer")
 
         # MindFlow API configuration
         self.api_base_url = self.get_env("MINDFLOW_API_URL", "http://localhost:3001/api/v1")
@@ -386,7 +384,7 @@ class ExcelImporter(BaseAgent):
     async def _sync_job(self, job: JobRecord) -> bool:
         """Sync a job record to MindFlow"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/jobs",
                     headers={"x-service-token": self.api_token},
@@ -536,7 +534,7 @@ class ExcelImporter(BaseAgent):
     async def _sync_orders(self, orders: list[EPORecord]) -> bool:
         """Sync orders to MindFlow"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/orders",
                     headers={"x-service-token": self.api_token},
@@ -618,7 +616,7 @@ class ExcelImporter(BaseAgent):
     async def _sync_community(self, community: CommunityRecord) -> bool:
         """Sync a community record to MindFlow"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/communities",
                     headers={"x-service-token": self.api_token},
@@ -15,7 +15,7 @@ from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any
 
-import httpx
+from services.snapshot_cache import Snapshot, get_snapshot_cache
 
 from .base import BaseAgent
 
@@ -47,6 +47,10 @@ START_DATE_THRESHOLDS = {
 }
 
 
+# Snapshot cache key for parsed JobInfo objects
+JOB_INFO = "job_info"
+
+
 # =============================================================================
 # DATA CLASSES
 # =============================================================================
@@ -179,6 +183,11 @@ class ActivityEntry:
         }
 
 
+def _naive_start(job: JobInfo) -> datetime | None:
+    """Start date as naive local time, comparable with datetime.now() (API dates are UTC-aware)"""
+    return job.start_date.astimezone().replace(tzinfo=None) if job.start_date else None
+
+
 # =============================================================================
 # JOB TRACKER AGENT
 # =============================================================================
@@ -187,7 +196,7 @@ class JobTracker(BaseAgent):
     """Agent for tracking job lifecycle and generating alerts"""
 
     def __init__(self):
-        super().__init__("JobTracker")
+        super().__init__("JobTracker", "job_tracker")
 
         # MindFlow API configuration
         self.api_base_url = self.get_env("MINDFLOW_API_URL", "http://localhost:3001/api/v1")
@@ -200,6 +209,7 @@ class JobTracker(BaseAgent):
         results = {
             "jobs_checked": 0,
             "alerts_generated": 0,
+            "alerts_suppressed": 0,
             "activities_logged": 0,
             "summary": {},
             "errors": [],
@@ -208,7 +218,8 @@ class JobTracker(BaseAgent):
 
         try:
             # Get all active jobs
-            jobs = await self.get_jobs()
+            with self.timer("fetch_jobs"):
+                jobs, live = await self.fetch_jobs()
             results["jobs_checked"] = len(jobs)
             self.log(f"Tracking {len(jobs)} jobs")
 
@@ -229,16 +240,23 @@ class JobTracker(BaseAgent):
                 "overdue": summary.overdue,
             }
 
-            # Check for jobs needing alerts
-            for job in jobs:
-                alerts = self.generate_job_alerts(job)
-                for alert in alerts:
-                    success = await self.send_alert(alert)
-                    if success:
-                        results["alerts_generated"] += 1
-
-            # Sync summary to dashboard
-            await self.sync_dashboard_stats(summary)
+            # Check for jobs needing alerts; only state changes are sent.
+            # Mock jobs (MindFlow unreachable) must not raise or resolve real alerts.
+            if live:
+                raised = [
+                    (f"job_tracker:{alert.job_id}:{alert.alert_type}", alert.severity, alert.to_api_format())
+                    for job in jobs
+                    for alert in self.generate_job_alerts(job)
+                ]
+                sent, suppressed = await self.send_alert_transitions("job_tracker", raised)
+                results["alerts_generated"] = sent
+                results["alerts_suppressed"] = suppressed
+            else:
+                results["errors"].append("MindFlow jobs unavailable; used mock jobs, alerts not reconciled")
+
+            # Sync summary to dashboard (not a summary of mock jobs)
+            if live:
+                await self.sync_dashboard_stats(summary)
 
         except Exception as e:
             self.log(f"Error during job tracking: {e}", "error")
@@ -249,27 +267,36 @@ class JobTracker(BaseAgent):
 
         return results
 
-    async def get_jobs(self, status: str | None = None) -> list[JobInfo]:
-        """Fetch jobs from MindFlow API"""
+    async def _jobs_snapshot(self, status: str | None = None) -> Snapshot | None:
+        """Job list from the shared snapshot cache, parsed once per snapshot"""
         try:
-            params = {}
-            if status:
-                params["status"] = status
-
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/jobs",
-                    params=params,
-                    headers={"x-service-token": self.api_token}
-                )
-                if response.status_code == 200:
-                    jobs_data = response.json()
-                    return [self._parse_job(j) for j in jobs_data]
+            snapshot = await get_snapshot_cache().get(
+                f"{self.api_base_url}/jobs",
+                params={"status": status} if status else None,
+                headers={"x-service-token": self.api_token},
+            )
+            self._job_infos(snapshot)
+            return snapshot
         except Exception as e:
             self.log(f"Error fetching jobs: {e}", "warning")
+            return None
+
+    async def fetch_jobs(self, status: str | None = None) -> tuple[list[JobInfo], bool]:
+        """Fetch jobs from MindFlow API as (jobs, live); live is False for mock jobs"""
+        snapshot = await self._jobs_snapshot(status)
+        if snapshot:
+            return self._job_infos(snapshot), True
 
         # Return mock data for testing
-        return self._get_mock_jobs()
+        return self._get_mock_jobs(), False
+
+    async def get_jobs(self, status: str | None = None) -> list[JobInfo]:
+        """Fetch jobs from MindFlow API (mock jobs if it is unreachable)"""
+        jobs, _ = await self.fetch_jobs(status)
+        return jobs
+
+    def _job_infos(self, snapshot: Snapshot) -> list[JobInfo]:
+        return snapshot.derive(JOB_INFO, lambda items: [self._parse_job(j) for j in items])
 
     def _parse_job(self, data: dict) -> JobInfo:
         """Parse job data from API response"""
@@ -494,17 +521,18 @@ class JobTracker(BaseAgent):
 
         return alerts
 
-    async def send_alert(self, alert: JobAlert) -> bool:
-        """Send alert to MindFlow"""
+    async def send_alert(self, alert: JobAlert | dict) -> bool:
+        """Send alert (or an already formatted alert payload) to MindFlow"""
+        payload = alert.to_api_format() if isinstance(alert, JobAlert) else alert
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/alerts",
                     headers={"x-service-token": self.api_token},
-                    json=alert.to_api_format()
+                    json=payload
                 )
                 if response.status_code in (200, 201):
-                    self.log(f"Alert sent: {alert.title}")
+                    self.log(f"Alert sent: {payload['title']}")
                     return True
                 else:
                     self.log(f"Failed to send alert: {response.status_code}", "warning")
@@ -516,7 +544,7 @@ class JobTracker(BaseAgent):
     async def log_activity(self, activity: ActivityEntry) -> bool:
         """Log activity to MindFlow"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/activity",
                     headers={"x-service-token": self.api_token},
@@ -539,7 +567,7 @@ class JobTracker(BaseAgent):
                 "overdueJobs": summary.overdue,
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/stats",
                     headers={"x-service-token": self.api_token},
@@ -559,35 +587,46 @@ class JobTracker(BaseAgent):
             if status == JobStatus.COMPLETED:
                 data["completionDate"] = datetime.now().isoformat()
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.patch(
                     f"{self.api_base_url}/jobs/{job_id}",
                     headers={"x-service-token": self.api_token},
                     json=data
                 )
-                return response.status_code in (200, 204)
+                if response.status_code in (200, 204):
+                    get_snapshot_cache().invalidate(f"{self.api_base_url}/jobs")
+                    return True
+                return False
         except Exception as e:
             self.log(f"Error updating job status: {e}", "error")
             return False
 
     async def get_upcoming_starts(self, days: int = 7) -> list[JobInfo]:
         """Get jobs starting within specified days"""
-        all_jobs = await self.get_jobs()
         now = datetime.now()
         cutoff = now + timedelta(days=days)
 
+        snapshot = await self._jobs_snapshot()
+        if snapshot:
+            candidates = snapshot.range("start_date", _naive_start, now, cutoff, source=JOB_INFO)
+        else:
+            candidates = [job for job in self._get_mock_jobs() if job.start_date and now <= job.start_date <= cutoff]
+
         return [
-            job for job in all_jobs
-            if job.start_date and now <= job.start_date <= cutoff
-            and job.status not in [JobStatus.COMPLETED, JobStatus.CANCELLED, JobStatus.IN_PROGRESS]
+            job for job in candidates
+            if job.status not in [JobStatus.COMPLETED, JobStatus.CANCELLED, JobStatus.IN_PROGRESS]
         ]
 
     async def get_jobs_by_community(self, community_id: str) -> list[JobInfo]:
         """Get all jobs for a specific community"""
-        all_jobs = await self.get_jobs()
-        return [job for job in all_jobs if job.community_id == community_id]
+        snapshot = await self._jobs_snapshot()
+        if snapshot:
+            return snapshot.index("community_id", lambda job: job.community_id, source=JOB_INFO).get(community_id, [])
+        return [job for job in self._get_mock_jobs() if job.community_id == community_id]
 
     async def get_jobs_by_customer(self, customer_id: str) -> list[JobInfo]:
         """Get all jobs for a specific customer"""
-        all_jobs = await self.get_jobs()
-        return [job for job in all_jobs if job.customer_id == customer_id]
+        snapshot = await self._jobs_snapshot()
+        if snapshot:
+            return snapshot.index("customer_id", lambda job: job.customer_id, source=JOB_INFO).get(customer_id, [])
+        return [job for job in self._get_mock_jobs() if job.customer_id == customer_id]
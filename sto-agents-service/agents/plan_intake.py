@@ -13,14 +13,30 @@ import os
 from datetime import datetime
 from typing import Any
 
+from services.doc_classifier import DocumentClassifier
+
 from .base import BaseAgent
 
+# Document type labels for routing, in priority order (MindFlow stores
+# these labels, so they differ from the shared taxonomy on purpose)
+INTAKE_DOC_TYPES = [
+    ("ARCH_DRAWINGS", ["arch", "architectural", "floor plan", "elevation"]),
+    ("CALC_PKG", ["calc", "calculation", "engineering"]),
+    ("TRUSS_CALCS", ["truss", "roof truss"]),
+    ("FLOOR_TRUSS", ["floor truss", "floor system"]),
+    ("IJOIST", ["i-joist", "ijoist", "floor joist"]),
+    ("STRUCTURAL", ["structural", "framing"]),
+    ("SPEC_SHEET", ["spec", "specification"]),
+]
+
+INTAKE_CLASSIFIER = DocumentClassifier(INTAKE_DOC_TYPES)
+
 
 class PlanIntakeMonitor(BaseAgent):
     """Agent for monitoring and routing new documents"""
 
     def __init__(self):
-        super().__init__("PlanIntakeMonitor")
+        super().__init__("PlanIntakeMonitor", "plan_intake")
 
         # OneDrive/SharePoint configuration
         self.onedrive_client_id = self.get_env("ONEDRIVE_CLIENT_ID")
@@ -31,17 +47,6 @@ class PlanIntakeMonitor(BaseAgent):
         # Local file system configuration (optional)
         self.local_watch_path = self.get_env("LOCAL_WATCH_PATH")
 
-        # Document type patterns for routing
-        self.doc_patterns = {
-            "ARCH_DRAWINGS": ["arch", "architectural", "floor plan", "elevation"],
-            "CALC_PKG": ["calc", "calculation", "engineering"],
-            "TRUSS_CALCS": ["truss", "roof truss"],
-            "FLOOR_TRUSS": ["floor truss", "floor system"],
-            "IJOIST": ["i-joist", "ijoist", "floor joist"],
-            "STRUCTURAL": ["structural", "framing"],
-            "SPEC_SHEET": ["spec", "specification"],
-        }
-
     async def run(self) -> dict[str, Any]:
         """Run full scan and return results"""
         self.log("Starting plan intake scan")
@@ -133,16 +138,10 @@ class PlanIntakeMonitor(BaseAgent):
         """
         Detect document type from filename.
 
-        Uses pattern matching against configured doc_patterns.
+        Uses the routing labels in INTAKE_DOC_TYPES (first type in table
+        order whose keyword appears in the name).
         """
-        filename_lower = filename.lower()
-
-        for doc_type, patterns in self.doc_patterns.items():
-            for pattern in patterns:
-                if pattern in filename_lower:
-                    return doc_type
-
-        return None
+        return INTAKE_CLASSIFIER.classify(filename)
 
     def parse_filename(self, filename: str) -> dict[str, Any]:
         """
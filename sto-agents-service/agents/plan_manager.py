@@ -14,7 +14,9 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any
 
-import httpx
+from services.doc_classifier import DocumentClassifier
+from services.snapshot_cache import get_snapshot_cache
+from services.watermarks import get_watermark_store
 
 from .base import BaseAgent
 
@@ -155,6 +157,8 @@ DOC_TYPE_PATTERNS = {
     ],
 }
 
+DOC_TYPE_CLASSIFIER = DocumentClassifier(list(DOC_TYPE_PATTERNS.items()), default="OTHER", regex=True)
+
 # Builder configurations for plan parsing
 BUILDER_PLAN_CONFIGS = {
     "richmond_american": {
@@ -182,7 +186,7 @@ class PlanManager(BaseAgent):
     """Agent for managing plans, elevations, and plan documents"""
 
     def __init__(self):
-        super().__init__("PlanManager")
+        super().__init__("PlanManager", "plan_manager")
 
         # MindFlow API configuration
         self.api_base_url = self.get_env("MINDFLOW_API_URL", "http://localhost:3001/api/v1")
@@ -194,6 +198,7 @@ class PlanManager(BaseAgent):
 
         results = {
             "plans_synced": 0,
+            "plans_unchanged": 0,
             "elevations_synced": 0,
             "documents_synced": 0,
             "errors": [],
@@ -201,22 +206,44 @@ class PlanManager(BaseAgent):
         }
 
         try:
-            # Get existing plans from MindFlow
-            existing_plans = await self.get_existing_plans()
-            self.log(f"Found {len(existing_plans)} existing plans in MindFlow")
-
             # Get plans from portal data (mock for now)
-            portal_plans = await self.get_portal_plans()
+            with self.timer("fetch_portal_plans"):
+                portal_plans = await self.get_portal_plans()
             self.log(f"Found {len(portal_plans)} plans from portal")
 
-            # Sync new/updated plans
-            for plan_info in portal_plans:
-                try:
-                    synced = await self.sync_plan(plan_info, existing_plans)
-                    if synced:
-                        results["plans_synced"] += 1
-                except Exception as e:
-                    results["errors"].append(f"Error syncing plan {plan_info.code}: {str(e)}")
+            # Only plans that changed since the last successful sync need work
+            watermarks = get_watermark_store()
+            delta = watermarks.filter_changed(
+                "plan_manager.plans", portal_plans, key=lambda p: p.code
+            )
+            results["plans_unchanged"] = delta.skipped
+
+            if delta.records:
+                # Get existing plans from MindFlow
+                with self.timer("fetch_existing_plans"):
+                    existing_plans = await self.get_existing_plans()
+                self.log(f"Found {len(existing_plans)} existing plans in MindFlow")
+
+                # Sync new/updated plans
+                failed = set()
+                for plan_info in delta.records:
+                    try:
+                        synced = await self.sync_plan(plan_info, existing_plans)
+                        if synced:
+                            results["plans_synced"] += 1
+                        elif plan_info.code not in existing_plans:
+                            failed.add(plan_info.code)
+                    except Exception as e:
+                        failed.add(plan_info.code)
+                        results["errors"].append(f"Error syncing plan {plan_info.code}: {str(e)}")
+
+                # Failed plans are retried next run
+                delta.seen = [(key, fp) for key, fp in delta.seen if key not in failed]
+
+                if results["plans_synced"]:
+                    get_snapshot_cache().invalidate(f"{self.api_base_url}/plans")
+
+            watermarks.commit(delta)
 
         except Exception as e:
             self.log(f"Error during plan sync: {e}", "error")
@@ -230,14 +257,11 @@ class PlanManager(BaseAgent):
     async def get_existing_plans(self) -> dict[str, dict]:
         """Fetch existing plans from MindFlow API"""
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.api_base_url}/plans",
-                    headers={"x-service-token": self.api_token}
-                )
-                if response.status_code == 200:
-                    plans = response.json()
-                    return {p["code"]: p for p in plans}
+            snapshot = await get_snapshot_cache().get(
+                f"{self.api_base_url}/plans",
+                headers={"x-service-token": self.api_token},
+            )
+            return snapshot.derive("by_code", lambda plans: {p["code"]: p for p in plans})
         except Exception as e:
             self.log(f"Error fetching existing plans: {e}", "warning")
 
@@ -309,7 +333,7 @@ class PlanManager(BaseAgent):
             return False
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/plans",
                     headers={"x-service-token": self.api_token},
@@ -334,7 +358,7 @@ class PlanManager(BaseAgent):
         Returns the created plan data or None on error.
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/plans",
                     headers={"x-service-token": self.api_token},
@@ -342,6 +366,7 @@ class PlanManager(BaseAgent):
                 )
 
                 if response.status_code in (200, 201):
+                    get_snapshot_cache().invalidate(f"{self.api_base_url}/plans")
                     return response.json()
                 else:
                     self.log(f"Failed to create plan: {response.status_code}", "error")
@@ -361,7 +386,7 @@ class PlanManager(BaseAgent):
             data = elevation.to_api_format()
             data["planId"] = plan_id
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/elevations",
                     headers={"x-service-token": self.api_token},
@@ -385,7 +410,7 @@ class PlanManager(BaseAgent):
         Returns the created document record or None on error.
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self.http_client(timeout=30.0) as client:
                 response = await client.post(
                     f"{self.api_base_url}/portal-sync/plan-documents",
                     headers={"x-service-token": self.api_token},
@@ -427,14 +452,7 @@ class PlanManager(BaseAgent):
 
         Returns DocumentType enum value.
         """
-        filename_lower = filename.lower()
-
-        for doc_type, patterns in DOC_TYPE_PATTERNS.items():
-            for pattern in patterns:
-                if re.search(pattern, filename_lower):
-                    return doc_type
-
-        return "OTHER"
+        return DOC_TYPE_CLASSIFIER.classify(filename)
 
     def parse_filename(self, filename: str, builder: str = "richmond_american") -> dict[str, Any]:
         """
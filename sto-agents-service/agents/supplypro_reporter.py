@@ -11,8 +11,13 @@ import os
 import logging
 import re
 from datetime import datetime
+from functools import lru_cache
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator
+
+from services.community_resolver import CommunityResolver
+from services.doc_classifier import DocumentClassifier
+from services.supplypro_scraper import ScrapeResult, ScraperUnavailable, SupplyProScraper
 
 from .base import BaseAgent
 
@@ -62,6 +67,23 @@ LOT_PREFIX_TO_COMMUNITY = {
     "36199": "Luden Estates Phase 3",
 }
 
+COMMUNITY_RESOLVER = CommunityResolver(SUPPLYPRO_CONFIG["monitored_communities"], LOT_PREFIX_TO_COMMUNITY)
+
+# Portal document name -> doc_type label sent to MindFlow, in priority order
+DOCUMENT_TYPE_MAPPING = [
+    ("ARCH_DRAWINGS", ["arch", "architectural", "floor plan"]),
+    ("CALC_PKG", ["calc pkg", "calculation"]),
+    ("TRUSS_CALCS", ["truss calc"]),
+    ("FLOOR_TRUSS", ["floor truss"]),
+    ("ROOF_TRUSS", ["roof truss"]),
+    ("TRUSS_LAYOUT", ["truss layout"]),
+    ("JIO", ["jio"]),
+    ("HCO", ["hco"]),
+    ("PLOT_PLAN", ["plot plan", "site plan"]),
+]
+
+DOCUMENT_TYPE_CLASSIFIER = DocumentClassifier(DOCUMENT_TYPE_MAPPING)
+
 
 # =============================================================================
 # DATA CLASSES
@@ -147,22 +169,7 @@ class DocumentRecord:
 
     def detect_doc_type(self) -> Optional[str]:
         """Detect document type from name"""
-        name_lower = self.doc_name.lower()
-        type_mapping = {
-            "ARCH_DRAWINGS": ["arch", "architectural", "floor plan"],
-            "CALC_PKG": ["calc pkg", "calculation"],
-            "TRUSS_CALCS": ["truss calc"],
-            "FLOOR_TRUSS": ["floor truss"],
-            "ROOF_TRUSS": ["roof truss"],
-            "TRUSS_LAYOUT": ["truss layout"],
-            "JIO": ["jio"],
-            "HCO": ["hco"],
-            "PLOT_PLAN": ["plot plan", "site plan"],
-        }
-        for doc_type, patterns in type_mapping.items():
-            if any(p in name_lower for p in patterns):
-                return doc_type
-        return None
+        return DOCUMENT_TYPE_CLASSIFIER.classify(self.doc_name)
 
     def parse_size(self) -> Optional[int]:
         """Parse size string to bytes"""
@@ -193,27 +200,94 @@ class SupplyProReport:
 # HELPER FUNCTIONS
 # =============================================================================
 
+@lru_cache(maxsize=16)
+def _resolver_for(communities: tuple) -> CommunityResolver:
+    return CommunityResolver(communities, LOT_PREFIX_TO_COMMUNITY)
+
+
 def is_monitored_community(community: str, config: dict = None) -> bool:
     """Check if community is in the monitored list"""
     if not community:
         return False
-
-    config = config or SUPPLYPRO_CONFIG
-    monitored = config.get("monitored_communities", [])
-    community_lower = community.lower()
-
-    for m in monitored:
-        if m.lower() in community_lower or community_lower in m.lower():
-            return True
-    return False
+    if config is None or config is SUPPLYPRO_CONFIG:
+        return COMMUNITY_RESOLVER.is_monitored(community)
+    return _resolver_for(tuple(config.get("monitored_communities", []))).is_monitored(community)
 
 
 def get_community_from_lot_prefix(lot_id: str) -> str:
     """Map lot prefix to community based on known patterns"""
-    for prefix, community in LOT_PREFIX_TO_COMMUNITY.items():
-        if lot_id.startswith(prefix):
-            return community
-    return "Unknown"
+    return COMMUNITY_RESOLVER.community_for_lot(lot_id)
+
+
+def parse_job_name(job_name: str) -> tuple:
+    """
+    Parse job name into (job id, lot number, address).
+    Format: '33750115 - 928 NW 178TH WAY - 115/'
+    """
+    parts = [p.strip() for p in (job_name or "").split(" - ")]
+    if len(parts) >= 3:
+        return (parts[0], parts[2].rstrip("/"), parts[1])
+    if len(parts) == 2:
+        return (parts[0], parts[0], parts[1])
+    return (parts[0], parts[0], "")
+
+
+def parse_amount(amount_str: str) -> float:
+    """Parse amount string like '$1,234.56' to float"""
+    cleaned = (amount_str or "").replace("$", "").replace(",", "").strip()
+    try:
+        return float(cleaned) if cleaned else 0.0
+    except ValueError:
+        return 0.0
+
+
+def report_from_scrape(result: ScrapeResult) -> SupplyProReport:
+    """Build a SupplyProReport from scraped portal rows"""
+    dashboard = DashboardData(**result.dashboard)
+
+    epos = []
+    for row in result.epos:
+        job_id, lot_number, address = parse_job_name(row.get("job_name", ""))
+        epos.append(EPORecord(
+            account=row.get("account", ""),
+            community=row.get("community") or get_community_from_lot_prefix(job_id),
+            job_name=row.get("job_name", ""),
+            lot_number=lot_number,
+            address=address,
+            task=row.get("task", ""),
+            supplier_order=row.get("supplier_order", ""),
+            submitted_date=row.get("submitted_date", ""),
+            task_status=row.get("task_status", ""),
+            epo_status=row.get("epo_status", ""),
+            amount=parse_amount(row.get("amount", "")),
+        ))
+
+    documents = []
+    for row in result.documents:
+        job_id, lot_number, address = parse_job_name(row.get("job_name") or row.get("folder", ""))
+        revision = row.get("revision", "")
+        documents.append(DocumentRecord(
+            builder=row.get("builder", ""),
+            folder=row.get("folder", ""),
+            community=row.get("community") or get_community_from_lot_prefix(job_id),
+            lot_number=lot_number,
+            address=address,
+            doc_name=row.get("doc_name", ""),
+            doc_type=row.get("doc_type", ""),
+            size=row.get("size", ""),
+            revision=int(revision) if revision.isdigit() else 0,
+            date_added=row.get("date_added", ""),
+            uploaded_by=row.get("uploaded_by", ""),
+            viewed=row.get("viewed", "").lower() in ("yes", "true", "y", "1"),
+        ))
+
+    return SupplyProReport(
+        report_date=datetime.now().strftime("%B %d, %Y"),
+        dashboard=dashboard,
+        epos=epos,
+        documents=documents,
+        errors=list(result.errors),
+    )
 
 
 def generate_alerts_from_report(report: SupplyProReport) -> List[Dict[str, Any]]:
@@ -269,7 +343,7 @@ def generate_alerts_from_report(report: SupplyProReport) -> List[Dict[str, Any]]
 
 
 # =============================================================================
-# MOCK DATA (Until Playwright scraping is implemented)
+# MOCK DATA (No credentials or Playwright not installed)
 # =============================================================================
 
 def get_mock_report() -> SupplyProReport:
@@ -380,12 +454,15 @@ class SupplyProReporter(BaseAgent):
     """SupplyPro Reporter Agent for MindFlow integration"""
 
     def __init__(self):
-        super().__init__("SupplyProReporter")
+        super().__init__("SupplyProReporter", "supplypro")
         self.config = SUPPLYPRO_CONFIG
         self.username = self.get_env("SUPPLYPRO_USERNAME")
         self.password = self.get_env("SUPPLYPRO_PASSWORD")
         self.base_url = self.get_env("SUPPLYPRO_URL", "https://www.hyphensolutions.com/MH2Supply/")
         self.last_report: Optional[SupplyProReport] = None
+        self.scraper = SupplyProScraper(
+            self.base_url, self.username or "", self.password or "", account=self.config["account"]
+        )
 
     async def run(self) -> Dict[str, Any]:
         """Run full sync and return all data"""
@@ -421,14 +498,62 @@ class SupplyProReporter(BaseAgent):
         }
 
     async def _fetch_report(self) -> SupplyProReport:
-        """Fetch report from SupplyPro (mock until Playwright implemented)"""
+        """Scrape the portal (mock data without credentials or Playwright)"""
         if not self.username or not self.password:
             self.log("SupplyPro credentials not configured, using mock data", "warning")
             return get_mock_report()
 
-        # TODO: Implement Playwright scraping
-        self.log("Playwright scraping not yet implemented, using mock data")
-        return get_mock_report()
+        try:
+            with self.timer("scrape"):
+                result = await self.scraper.scrape(
+                    epo_days_back=self.config["epo_days_back"],
+                    documents_days_back=self.config["documents_days_back"],
+                )
+        except ScraperUnavailable as e:
+            self.log(f"{e}, using mock data", "warning")
+            return get_mock_report()
+
+        self.log(
+            f"Scraped SupplyPro: {len(result.epos)} EPOs, {len(result.documents)} documents",
+            logged_in=result.logged_in,
+            sources=result.sources,
+            timings={page: round(seconds, 3) for page, seconds in result.timings.items()},
+        )
+        self.count_records("epo", len(result.epos))
+        self.count_records("document", len(result.documents))
+        return report_from_scrape(result)
+
+    async def stream_records(self, report: SupplyProReport) -> AsyncIterator[Dict[str, Any]]:
+        """
+        A report's orders, documents and alerts one record at a time, then
+        a summary (for streaming endpoints; no per-kind lists are built).
+        Streams don't scrape: they are given the last queued sync's report,
+        which a later sync replaces rather than changes.
+        """
+        for epo in report.epos:
+            if is_monitored_community(epo.community):
+                yield {"kind": "order", "data": epo.to_api_format()}
+
+        for doc in report.documents:
+            if is_monitored_community(doc.community) and not doc.viewed:
+                yield {"kind": "document", "data": doc.to_api_format()}
+
+        for alert in generate_alerts_from_report(report):
+            yield {"kind": "alert", "data": alert}
+
+        yield {
+            "kind": "summary",
+            "data": {
+                "dashboard": {
+                    "new_orders": report.dashboard.new_orders,
+                    "to_do": report.dashboard.to_do_orders,
+                    "change_orders": report.dashboard.change_orders,
+                    "pending_back_charges": report.dashboard.pending_back_charges,
+                },
+                "epos_total": len(report.epos),
+                "documents_total": len(report.documents),
+            },
+        }
 
     def _get_orders_for_api(self, report: SupplyProReport) -> List[Dict[str, Any]]:
         """Convert EPOs to API format"""
@@ -446,6 +571,11 @@ class SupplyProReporter(BaseAgent):
                 documents.append(doc.to_api_format())
         return documents
 
+    async def refresh_report(self) -> SupplyProReport:
+        """Fetch a new report (the agent instance is reused across syncs)"""
+        self.last_report = await self._fetch_report()
+        return self.last_report
+
     async def get_orders(self) -> List[Dict[str, Any]]:
         """Get orders in API format"""
         if not self.last_report:
@@ -464,6 +594,12 @@ class SupplyProReporter(BaseAgent):
         return generate_alerts_from_report(self.last_report)
 
     async def login(self) -> bool:
-        """Login to SupplyPro portal (Playwright implementation needed)"""
-        self.log("Login not implemented - needs Playwright", "warning")
-        return False
+        """Login to SupplyPro portal (reuses the saved browser session when still valid)"""
+        if not self.username or not self.password:
+            self.log("SupplyPro credentials not configured", "warning")
+            return False
+        try:
+            return await self.scraper.login()
+        except Exception as e:
+            self.log(f"SupplyPro login failed: {e}", "error")
+            return False
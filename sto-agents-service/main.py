@@ -3,7 +3,8 @@ STO Agents Service - FastAPI wrapper for Python agents
 
 This service wraps existing STO Python agents and provides:
 - HTTP endpoints to trigger syncs
-- Background task execution
+- Durable background job queue with a worker pool
+- Built-in cron/interval scheduler for every agent
 - Health checks and status monitoring
 - Integration with MindFlow Express API via REST
 
@@ -11,35 +12,71 @@ Agents:
 - SupplyPro Reporter: Syncs orders and deliveries from SupplyPro portal
 - Plan Intake Monitor: Watches for new documents from OneDrive/SharePoint
 - Completeness Checker: Scans for missing documents and generates alerts
+- Job Tracker, Document Tracker, Plan Manager: Scheduled MindFlow maintenance
 """
 
+import time
+
+# Measured from the first import, reported once the app has started
+STARTUP_STARTED = time.perf_counter()
+
 import os
+import re
 import asyncio
+import logging
 from datetime import datetime
 from typing import Optional
 from contextlib import asynccontextmanager
 
-import httpx
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Import agents (these would be your existing Python scripts)
-from agents.supplypro_reporter import SupplyProReporter
-from agents.plan_intake import PlanIntakeMonitor
-from agents.completeness_checker import CompletenessChecker
+from agents import get_agent
+from services.job_queue import JobQueue, JobContext, WorkerPool, PRIORITY_HIGH
+from services.scheduler import Scheduler
+from services.watermarks import get_watermark_store
+from services.alert_store import get_alert_store
+from services.snapshot_cache import get_snapshot_cache
+from services.streaming import STREAM_FORMATS, encode_stream
+from services.pipeline import Pipeline, Stage
+from services.logging_config import setup_logging, shutdown_logging
+from services.metrics import REGISTRY, CONTENT_TYPE, QUEUE_JOBS, STARTUP_SECONDS, instrumented_client
 
 
 # Configuration
 MINDFLOW_API_URL = os.getenv("MINDFLOW_API_URL", "http://localhost:3000")
 SERVICE_TOKEN = os.getenv("PORTAL_SYNC_SECRET", "")
 
-# Track sync status
-sync_status = {
-    "supplypro": {"last_sync": None, "status": "idle", "error": None},
-    "plan_intake": {"last_sync": None, "status": "idle", "error": None},
-    "completeness": {"last_sync": None, "status": "idle", "error": None},
+setup_logging()
+logger = logging.getLogger("sto.service")
+
+# Job queue (shared by every replica that points at the same database)
+# Set QUEUE_WORKERS=0 on web-only replicas that should enqueue but not run jobs
+QUEUE_WORKERS = int(os.getenv("QUEUE_WORKERS", "2"))
+QUEUE_POLL_SECONDS = float(os.getenv("QUEUE_POLL_SECONDS", "1.0"))
+
+# Run the scheduler on exactly one replica (set SCHEDULER_ENABLED=false elsewhere)
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+
+SYNC_AGENTS = ["supplypro", "plan_intake", "completeness"]
+
+# Max concurrent jobs per agent across all workers
+AGENT_LIMITS = {
+    "supplypro": 1,
+    "plan_intake": 1,
+    "completeness": 1,
+    "job_tracker": 1,
+    "document_tracker": 1,
+    "plan_manager": 1,
 }
 
+job_queue = JobQueue(agent_limits=AGENT_LIMITS)
+QUEUE_JOBS.set_collector(job_queue.depth)
+scheduler = Scheduler(job_queue)
+worker_pool: Optional[WorkerPool] = None
+
 
 def get_headers() -> dict:
     """Get headers for API calls to MindFlow backend"""
@@ -53,12 +90,38 @@ def get_headers() -> dict:
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup/shutdown"""
     # Startup
-    print(f"STO Agents Service starting...")
-    print(f"MindFlow API URL: {MINDFLOW_API_URL}")
-    print(f"Service token configured: {'Yes' if SERVICE_TOKEN else 'No'}")
+    logger.info("STO Agents Service starting...")
+    logger.info(f"MindFlow API URL: {MINDFLOW_API_URL}")
+    logger.info(f"Service token configured: {'Yes' if SERVICE_TOKEN else 'No'}")
+    logger.info(f"Job queue: {job_queue.db_path} ({QUEUE_WORKERS} workers)")
+
+    global worker_pool
+    if QUEUE_WORKERS > 0:
+        worker_pool = WorkerPool(
+            job_queue,
+            JOB_HANDLERS,
+            workers=QUEUE_WORKERS,
+            poll_interval=QUEUE_POLL_SECONDS,
+        )
+        await worker_pool.start()
+
+    if SCHEDULER_ENABLED:
+        await scheduler.start()
+        logger.info(f"Scheduler started ({len(scheduler.schedules)} schedules)")
+
+    # Agents are imported on first use, so this excludes agent (and pandas) imports
+    startup_seconds = time.perf_counter() - STARTUP_STARTED
+    STARTUP_SECONDS.set(startup_seconds)
+    logger.info(f"Startup complete in {startup_seconds * 1000:.0f} ms")
+
     yield
+
     # Shutdown
-    print("STO Agents Service shutting down...")
+    logger.info("STO Agents Service shutting down...")
+    await scheduler.stop()
+    if worker_pool:
+        await worker_pool.stop()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -78,6 +141,8 @@ class SyncResponse(BaseModel):
     status: str
     timestamp: str
     message: Optional[str] = None
+    job_id: Optional[str] = None
+    job_ids: Optional[dict] = None
 
 
 class SyncStatusResponse(BaseModel):
@@ -86,6 +151,16 @@ class SyncStatusResponse(BaseModel):
     completeness: dict
 
 
+class ScheduleUpdate(BaseModel):
+    cron: Optional[str] = None
+    interval_seconds: Optional[int] = None
+    jitter_seconds: Optional[int] = None
+    misfire_grace_seconds: Optional[int] = None
+    overlap: Optional[str] = None
+    enabled: Optional[bool] = None
+    priority: Optional[int] = None
+
+
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
@@ -94,51 +169,94 @@ class SyncStatusResponse(BaseModel):
 async def post_to_mindflow(endpoint: str, data: dict) -> dict:
     """Post data to MindFlow Express API"""
     url = f"{MINDFLOW_API_URL}/api/v1/portal-sync/{endpoint}"
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    async with instrumented_client(timeout=30.0) as client:
         response = await client.post(url, json=data, headers=get_headers())
         response.raise_for_status()
         return response.json()
 
 
+def alert_key(alert: dict) -> str:
+    """Stable identity for an alert (counts and amounts stripped from the title)"""
+    title = re.sub(r"[\d$][\d,.$]*", "#", alert.get("title", ""))
+    return f"{alert.get('source', '')}:{title}"
+
+
+async def push_alert_transitions(source: str, raised: list, resolve: bool = True) -> dict:
+    """Send only new, escalated, reminder and resolved alerts for a source"""
+    alert_store = get_alert_store()
+    reconciled = alert_store.reconcile(source, raised, resolve=resolve)
+    if reconciled.transitions:
+        await post_to_mindflow("alerts", {"alerts": reconciled.payloads})
+    alert_store.commit(reconciled)
+    return reconciled.summary()
+
+
+async def enqueue_sync(agent: str, label: str, priority: int = PRIORITY_HIGH) -> SyncResponse:
+    """Queue a sync job, reusing an identical job that is still waiting"""
+    job_id, created = await asyncio.to_thread(job_queue.enqueue, agent, priority=priority)
+    return SyncResponse(
+        status="queued" if created else "already_queued",
+        timestamp=datetime.now().isoformat(),
+        message=f"{label} queued" if created else f"{label} already waiting in queue",
+        job_id=job_id,
+    )
+
+
 # ============================================
 # SUPPLYPRO SYNC
 # ============================================
 
 
-async def run_supplypro_sync():
+async def run_supplypro_sync(ctx: JobContext) -> dict:
     """Run the SupplyPro sync and push to MindFlow API"""
-    sync_status["supplypro"]["status"] = "running"
-    sync_status["supplypro"]["error"] = None
-
-    try:
-        reporter = SupplyProReporter()
+    reporter = get_agent("SupplyProReporter")
+    watermarks = get_watermark_store()
 
-        # Sync orders
+    async def fetch(_):
+        await reporter.refresh_report()
         orders = await reporter.get_orders()
-        if orders:
+        ctx.count_records("orders", len(orders))
+        return {
+            "orders": orders,
+            "deliveries": await reporter.get_todays_deliveries(),
+            "alerts": await reporter.check_for_alerts(),
+        }
+
+    # Orders, deliveries and alerts are independent once the report is fetched
+    async def push_orders(inputs):
+        # Only new or changed since the last successful push
+        order_delta = watermarks.filter_changed(
+            "supplypro.orders", inputs["fetch"]["orders"], key=lambda o: o["external_id"]
+        )
+        if order_delta.records:
             await post_to_mindflow(
                 "orders",
                 {
-                    "orders": orders,
+                    "orders": order_delta.records,
                     "portal": "supplypro",
                     "syncId": f"sp-{datetime.now().strftime('%Y%m%d%H%M%S')}",
                 },
             )
+        watermarks.commit(order_delta)
+        return order_delta
 
-        # Sync deliveries
-        deliveries = await reporter.get_todays_deliveries()
+    async def push_deliveries(inputs):
+        deliveries = inputs["fetch"]["deliveries"]
         if deliveries:
             await post_to_mindflow(
                 "deliveries",
                 {"deliveries": deliveries, "portal": "supplypro"},
             )
+        return len(deliveries)
 
-        # Generate alerts for any issues
-        alerts = await reporter.check_for_alerts()
-        if alerts:
-            await post_to_mindflow("alerts", {"alerts": alerts})
+    async def push_alerts(inputs):
+        alerts = inputs["fetch"]["alerts"]
+        return await push_alert_transitions(
+            "supplypro", [(alert_key(a), a.get("type", "info"), a) for a in alerts]
+        )
 
-        # Log activity
+    async def log_activity(inputs):
+        order_delta = inputs["push_orders"]
         await post_to_mindflow(
             "activity",
             {
@@ -146,34 +264,37 @@ async def run_supplypro_sync():
                     {
                         "type": "portal_sync",
                         "title": "SupplyPro sync completed",
-                        "detail": f"Synced {len(orders)} orders, {len(deliveries)} deliveries",
+                        "detail": (
+                            f"Synced {len(order_delta.records)} changed orders "
+                            f"({order_delta.skipped} unchanged), {inputs['push_deliveries']} deliveries"
+                        ),
                         "icon": "🔄",
                     }
                 ]
             },
         )
 
-        sync_status["supplypro"]["last_sync"] = datetime.now().isoformat()
-        sync_status["supplypro"]["status"] = "completed"
+    pipeline = Pipeline("supplypro", [
+        Stage("fetch", fetch, timeout=300),
+        Stage("push_orders", push_orders, depends_on=("fetch",), retries=2),
+        Stage("push_deliveries", push_deliveries, depends_on=("fetch",), retries=2),
+        Stage("push_alerts", push_alerts, depends_on=("fetch",), retries=2),
+        Stage("activity", log_activity, depends_on=("push_orders", "push_deliveries"), required=False),
+    ])
+    result = await pipeline.run(ctx)
 
-    except Exception as e:
-        sync_status["supplypro"]["status"] = "failed"
-        sync_status["supplypro"]["error"] = str(e)
-        print(f"SupplyPro sync error: {e}")
+    return {
+        "orders": result.value("push_orders").summary(),
+        "deliveries": result.value("push_deliveries"),
+        "alerts": result.value("push_alerts"),
+        "stages": result.timings(),
+    }
 
 
 @app.post("/sync/supplypro", response_model=SyncResponse)
-async def sync_supplypro(background_tasks: BackgroundTasks):
+async def sync_supplypro():
     """Trigger SupplyPro sync"""
-    if sync_status["supplypro"]["status"] == "running":
-        raise HTTPException(status_code=409, detail="Sync already in progress")
-
-    background_tasks.add_task(run_supplypro_sync)
-    return SyncResponse(
-        status="started",
-        timestamp=datetime.now().isoformat(),
-        message="SupplyPro sync started in background",
-    )
+    return await enqueue_sync("supplypro", "SupplyPro sync")
 
 
 # ============================================
@@ -181,23 +302,32 @@ async def sync_supplypro(background_tasks: BackgroundTasks):
 # ============================================
 
 
-async def run_plan_intake_sync():
+async def run_plan_intake_sync(ctx: JobContext) -> dict:
     """Run the plan intake monitor and push new documents to MindFlow"""
-    sync_status["plan_intake"]["status"] = "running"
-    sync_status["plan_intake"]["error"] = None
-
-    try:
-        monitor = PlanIntakeMonitor()
+    monitor = get_agent("PlanIntakeMonitor")
+    watermarks = get_watermark_store()
+
+    # Check for new documents
+    async def scan(_):
+        scanned = await monitor.scan_for_new_documents()
+        ctx.count_records("documents", len(scanned))
+        return watermarks.filter_changed(
+            "plan_intake.documents", scanned, key=lambda d: d.get("external_id") or d.get("filename")
+        )
 
-        # Check for new documents
-        documents = await monitor.scan_for_new_documents()
-        if documents:
+    async def upload(inputs):
+        delta = inputs["scan"]
+        if delta.records:
             await post_to_mindflow(
                 "documents",
-                {"documents": documents, "portal": "onedrive"},
+                {"documents": delta.records, "portal": "onedrive"},
             )
+        watermarks.commit(delta)
+        return delta
 
-            # Log activity
+    async def log_activity(inputs):
+        documents = inputs["upload"].records
+        if documents:
             await post_to_mindflow(
                 "activity",
                 {
@@ -212,27 +342,19 @@ async def run_plan_intake_sync():
                 },
             )
 
-        sync_status["plan_intake"]["last_sync"] = datetime.now().isoformat()
-        sync_status["plan_intake"]["status"] = "completed"
-
-    except Exception as e:
-        sync_status["plan_intake"]["status"] = "failed"
-        sync_status["plan_intake"]["error"] = str(e)
-        print(f"Plan intake sync error: {e}")
+    pipeline = Pipeline("plan_intake", [
+        Stage("scan", scan, timeout=300),
+        Stage("upload", upload, depends_on=("scan",), retries=2),
+        Stage("activity", log_activity, depends_on=("upload",), required=False),
+    ])
+    result = await pipeline.run(ctx)
+    return {"documents": result.value("upload").summary(), "stages": result.timings()}
 
 
 @app.post("/sync/plan-intake", response_model=SyncResponse)
-async def sync_plan_intake(background_tasks: BackgroundTasks):
+async def sync_plan_intake():
     """Trigger plan intake sync"""
-    if sync_status["plan_intake"]["status"] == "running":
-        raise HTTPException(status_code=409, detail="Sync already in progress")
-
-    background_tasks.add_task(run_plan_intake_sync)
-    return SyncResponse(
-        status="started",
-        timestamp=datetime.now().isoformat(),
-        message="Plan intake sync started in background",
-    )
+    return await enqueue_sync("plan_intake", "Plan intake sync")
 
 
 # ============================================
@@ -240,32 +362,36 @@ async def sync_plan_intake(background_tasks: BackgroundTasks):
 # ============================================
 
 
-async def run_completeness_check():
+async def run_completeness_check(ctx: JobContext) -> dict:
     """Check for missing documents and create alerts"""
-    sync_status["completeness"]["status"] = "running"
-    sync_status["completeness"]["error"] = None
+    checker = get_agent("CompletenessChecker")
 
-    try:
-        checker = CompletenessChecker()
+    async def scan(_):
         missing = await checker.scan_all_communities()
-
-        alerts = []
-        for item in missing:
-            alerts.append(
-                {
-                    "type": "warning",
-                    "source": "completeness_check",
-                    "title": f"Missing {item['doc_type']}",
-                    "message": f"{item['community']} Lot {item['lot']} - {item['doc_type']} not found",
-                    "community_id": item.get("community_id"),
-                    "details": item,
-                }
+        ctx.count_records("missing_documents", len(missing))
+        return missing
+
+    async def push_alerts(inputs):
+        raised = []
+        for item in inputs["scan"]:
+            raised.append(
+                (
+                    f"completeness:{item['community']}:{item['lot']}:{item['doc_type']}",
+                    "warning",
+                    {
+                        "type": "warning",
+                        "source": "completeness_check",
+                        "title": f"Missing {item['doc_type']}",
+                        "message": f"{item['community']} Lot {item['lot']} - {item['doc_type']} not found",
+                        "community_id": item.get("community_id"),
+                        "details": item,
+                    },
+                )
             )
+        return await push_alert_transitions("completeness", raised)
 
-        if alerts:
-            await post_to_mindflow("alerts", {"alerts": alerts})
-
-        # Log activity
+    # Logged alongside the alert push (it only needs the scan)
+    async def log_activity(inputs):
         await post_to_mindflow(
             "activity",
             {
@@ -273,59 +399,215 @@ async def run_completeness_check():
                     {
                         "type": "completeness_check",
                         "title": "Completeness check completed",
-                        "detail": f"Found {len(missing)} missing documents",
+                        "detail": f"Found {len(inputs['scan'])} missing documents",
                         "icon": "🔍",
                     }
                 ]
             },
         )
 
-        sync_status["completeness"]["last_sync"] = datetime.now().isoformat()
-        sync_status["completeness"]["status"] = "completed"
+    pipeline = Pipeline("completeness", [
+        Stage("scan", scan, timeout=600),
+        Stage("push_alerts", push_alerts, depends_on=("scan",), retries=2),
+        Stage("activity", log_activity, depends_on=("scan",), required=False),
+    ])
+    result = await pipeline.run(ctx)
 
-    except Exception as e:
-        sync_status["completeness"]["status"] = "failed"
-        sync_status["completeness"]["error"] = str(e)
-        print(f"Completeness check error: {e}")
+    return {
+        "missing": len(result.value("scan")),
+        "alerts": result.value("push_alerts"),
+        "stages": result.timings(),
+    }
 
 
 @app.post("/sync/completeness", response_model=SyncResponse)
-async def sync_completeness(background_tasks: BackgroundTasks):
+async def sync_completeness():
     """Run completeness check and generate alerts"""
-    if sync_status["completeness"]["status"] == "running":
-        raise HTTPException(status_code=409, detail="Check already in progress")
+    return await enqueue_sync("completeness", "Completeness check")
+
+
+# ============================================
+# RUN ALL SYNCS
+# ============================================
+
+
+@app.post("/sync/all", response_model=SyncResponse)
+async def sync_all():
+    """Queue all syncs (per-agent limits decide how many run at once)"""
+    job_ids = {}
+    for agent in SYNC_AGENTS:
+        job_id, _ = await asyncio.to_thread(job_queue.enqueue, agent, priority=PRIORITY_HIGH)
+        job_ids[agent] = job_id
 
-    background_tasks.add_task(run_completeness_check)
     return SyncResponse(
-        status="started",
+        status="queued",
         timestamp=datetime.now().isoformat(),
-        message="Completeness check started in background",
+        message="All syncs queued",
+        job_ids=job_ids,
     )
 
 
 # ============================================
-# RUN ALL SYNCS
+# TRACKER AGENTS
 # ============================================
 
 
-@app.post("/sync/all", response_model=SyncResponse)
-async def sync_all(background_tasks: BackgroundTasks):
-    """Trigger all syncs"""
-    background_tasks.add_task(run_supplypro_sync)
-    background_tasks.add_task(run_plan_intake_sync)
-    background_tasks.add_task(run_completeness_check)
+async def run_job_tracker(ctx: JobContext) -> dict:
+    """Check job start dates and sync dashboard stats"""
+    await ctx.progress(stage="run")
+    results = await get_agent("JobTracker").run()
+    ctx.count_records("jobs", results.get("jobs_checked", 0))
+    return results
+
+
+async def run_document_tracker(ctx: JobContext) -> dict:
+    """Check document completeness for active jobs"""
+    await ctx.progress(stage="run")
+    results = await get_agent("DocumentTracker").run()
+    ctx.count_records("jobs", results.get("jobs_checked", 0))
+    return results
+
+
+async def run_plan_manager(ctx: JobContext) -> dict:
+    """Sync plans and elevations from builder portals"""
+    await ctx.progress(stage="run")
+    results = await get_agent("PlanManager").run()
+    ctx.count_records("plans", results.get("plans_synced", 0))
+    return results
+
+
+# ============================================
+# JOBS
+# ============================================
+
+# Queue handlers, keyed by agent name
+JOB_HANDLERS = {
+    "supplypro": run_supplypro_sync,
+    "plan_intake": run_plan_intake_sync,
+    "completeness": run_completeness_check,
+    "job_tracker": run_job_tracker,
+    "document_tracker": run_document_tracker,
+    "plan_manager": run_plan_manager,
+}
+
+
+@app.get("/jobs")
+async def list_jobs(agent: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """List recent jobs, newest first"""
+    jobs = await asyncio.to_thread(job_queue.list_jobs, agent=agent, status=status, limit=min(limit, 500))
+    return {"jobs": [job.to_dict() for job in jobs]}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll a single job's status and progress"""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+# ============================================
+# SCHEDULES
+# ============================================
+
+
+@app.get("/schedules")
+async def list_schedules():
+    """List schedules with their next and last run"""
+    return {"enabled": SCHEDULER_ENABLED, "schedules": scheduler.list()}
+
+
+@app.patch("/schedules/{name}")
+async def update_schedule(name: str, update: ScheduleUpdate):
+    """Change a schedule (persisted across restarts)"""
+    if not scheduler.get(name):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    changes = update.model_dump(exclude_unset=True)
+    try:
+        schedule = scheduler.update(name, changes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return schedule.to_dict()
+
+
+@app.post("/schedules/{name}/run", response_model=SyncResponse)
+async def run_schedule_now(name: str):
+    """Queue a schedule's agent immediately"""
+    schedule = scheduler.get(name)
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    job_id = await scheduler.enqueue(schedule, reason="manual", force=True)
     return SyncResponse(
-        status="started",
+        status="queued",
         timestamp=datetime.now().isoformat(),
-        message="All syncs started in background",
+        message=f"{name}: {schedule.last_outcome}",
+        job_id=job_id,
     )
 
 
+# ============================================
+# ALERTS
+# ============================================
+
+
+@app.get("/alerts/active")
+async def list_active_alerts(source: Optional[str] = None):
+    """Alerts currently active in the local alert store"""
+    return {"alerts": await asyncio.to_thread(get_alert_store().active, source)}
+
+
+@app.get("/snapshots")
+async def list_snapshots():
+    """MindFlow list snapshots shared by the agents"""
+    return {"snapshots": get_snapshot_cache().stats()}
+
+
+# ============================================
+# STREAMING RESULTS
+# ============================================
+
+
+# Streams use the shared agent instances outside the job queue, so they
+# run beside queued syncs; stream_records() keeps its per-call state
+# (document index) local instead of on the agent, and SupplyPro streams
+# the report of the last queued sync.
+def stream_response(records, format: str) -> StreamingResponse:
+    """NDJSON or chunked JSON response fed by an agent's async generator"""
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(STREAM_FORMATS)}")
+    return StreamingResponse(encode_stream(records, format), media_type=STREAM_FORMATS[format])
+
+
+@app.get("/stream/completeness")
+async def stream_completeness(format: str = "ndjson", include_complete: bool = False):
+    """Stream per-job completeness results as they are checked"""
+    return stream_response(get_agent("CompletenessChecker").stream_records(include_complete), format)
+
+
+@app.get("/stream/supplypro")
+async def stream_supplypro(format: str = "ndjson"):
+    """Stream SupplyPro orders, documents and alerts from the last sync"""
+    reporter = get_agent("SupplyProReporter")
+    # Scraping launches a browser, so it only happens in queued syncs
+    if reporter.last_report is None:
+        raise HTTPException(status_code=409, detail="No SupplyPro report yet; run POST /sync/supplypro first")
+    return stream_response(reporter.stream_records(reporter.last_report), format)
+
+
 # ============================================
 # HEALTH & STATUS
 # ============================================
 
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
@@ -339,7 +621,8 @@ def health_check():
 @app.get("/status", response_model=SyncStatusResponse)
 async def get_sync_status():
     """Get last sync times and status for all agents"""
-    return SyncStatusResponse(**sync_status)
+    statuses = await asyncio.to_thread(lambda: {agent: job_queue.agent_status(agent) for agent in SYNC_AGENTS})
+    return SyncStatusResponse(**statuses)
 
 
 @app.get("/")
@@ -351,10 +634,20 @@ def root():
         "endpoints": {
             "health": "/health",
             "status": "/status",
+            "metrics": "/metrics",
+            "active_alerts": "/alerts/active",
+            "snapshots": "/snapshots",
+            "stream_completeness": "/stream/completeness?format=ndjson|json",
+            "stream_supplypro": "/stream/supplypro?format=ndjson|json",
             "sync_supplypro": "POST /sync/supplypro",
             "sync_plan_intake": "POST /sync/plan-intake",
             "sync_completeness": "POST /sync/completeness",
             "sync_all": "POST /sync/all",
+            "jobs": "/jobs",
+            "job": "/jobs/{job_id}",
+            "schedules": "/schedules",
+            "update_schedule": "PATCH /schedules/{name}",
+            "run_schedule": "POST /schedules/{name}/run",
         },
         "docs": "/docs",
     }
@@ -0,0 +1,19 @@
+"""
+STO Agents Service - Shared infrastructure used by main.py and the agents
+
+- job_queue: Durable SQLite-backed job queue and async worker pool
+- scheduler: Cron/interval scheduler that enqueues agent runs
+- watermarks: Record fingerprints for incremental (delta) pushes
+- metrics: Prometheus-style counters, gauges and histograms
+- logging_config: Structured JSON logging through a background queue listener
+- alert_store: Alert deduplication, escalation and auto-resolve across runs
+- doc_classifier: Compiled, cached document-type classifier shared by the agents
+- document_index: Per-run job -> document type index for completeness checks
+- snapshot_cache: Shared TTL/ETag cache of MindFlow job and plan lists
+- streaming: NDJSON / chunked JSON encoding of agent result generators
+- import_profile: Cold import time report (python -m services.import_profile)
+- pipeline: Async stage DAG with per-stage timeouts, retries and timings
+- community_resolver: Lot-prefix trie and cached community name matching
+- supplypro_scraper: Playwright SupplyPro scraper with saved sessions and parallel pages
+- supplypro_fixture: Local HTML stand-in for the SupplyPro portal
+"""
@@ -0,0 +1,272 @@
+"""
+Alert Store - Deduplicate, escalate and auto-resolve agent alerts
+
+Agents regenerate the same alerts on every run ("Missing CALC_PKG for
+Lot 127", "Job Starting in 3 Days"). The alert store keeps the state of
+every active alert under a stable key and turns each run's alerts into
+state transitions; only those are sent to MindFlow:
+
+    new         - key not active before
+    escalated   - severity went up (e.g. warning -> critical)
+    reminder    - still active after ALERT_TTL_HOURS without a notification
+    resolved    - active before, not raised this run (condition cleared)
+
+Everything else (same alert, same or lower severity) is suppressed.
+
+MindFlow has no resolve endpoint, so a resolution is sent as an "info"
+alert with details.resolved = true and the original details.alertKey.
+
+Usage:
+    result = store.reconcile("job_tracker", [(key, severity, payload), ...])
+    for transition in result.transitions:
+        ...send transition.payload...
+    store.commit(result, sent=[...transitions that were delivered...])
+"""
+
+import os
+import copy
+import json
+import time
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DEFAULT_DB_PATH = os.getenv("ALERT_STORE_DB", "data/alerts.db")
+
+# Re-send an unchanged active alert after this long (0 = never)
+ALERT_TTL_HOURS = float(os.getenv("ALERT_TTL_HOURS", "24"))
+
+SEVERITY_RANK = {
+    "info": 0,
+    "warning": 1,
+    "critical": 2,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    source        TEXT NOT NULL,
+    alert_key     TEXT NOT NULL,
+    severity      TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    first_seen    REAL NOT NULL,
+    last_seen     REAL NOT NULL,
+    last_notified REAL,
+    resolved_at   REAL,
+    PRIMARY KEY (source, alert_key)
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_status ON alerts(source, status);
+"""
+
+AlertInput = Tuple[str, str, Dict[str, Any]]
+
+
+# ============================================
+# DATA CLASSES
+# ============================================
+
+
+@dataclass
+class AlertTransition:
+    """A change in alert state that should be sent to MindFlow"""
+
+    kind: str                   # new, escalated, reminder, resolved
+    key: str
+    severity: str
+    payload: Dict[str, Any]
+
+
+@dataclass
+class ReconcileResult:
+    """Outcome of comparing one run's alerts with the stored state"""
+
+    source: str
+    transitions: List[AlertTransition] = field(default_factory=list)
+    # Every alert raised this run: key -> (severity, payload)
+    current: Dict[str, Tuple[str, Dict[str, Any]]] = field(default_factory=dict)
+    suppressed: int = 0
+
+    @property
+    def payloads(self) -> List[Dict[str, Any]]:
+        return [t.payload for t in self.transitions]
+
+    def summary(self) -> Dict[str, int]:
+        counts = {"raised": len(self.current), "suppressed": self.suppressed}
+        for transition in self.transitions:
+            counts[transition.kind] = counts.get(transition.kind, 0) + 1
+        return counts
+
+
+def _with_key(payload: Dict[str, Any], key: str) -> Dict[str, Any]:
+    payload = copy.deepcopy(payload)
+    details = payload.get("details") or {}
+    payload["details"] = {**details, "alertKey": key}
+    return payload
+
+
+def resolution_payload(key: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Info alert announcing that a previously raised alert has cleared"""
+    resolved = _with_key(payload, key)
+    # Agents use either "alertType" (trackers) or "type" (main.py syncs)
+    severity_field = "alertType" if "alertType" in resolved else "type"
+    resolved[severity_field] = "info"
+    resolved["title"] = f"Resolved: {payload.get('title', key)}"
+    resolved["message"] = f"Condition cleared: {payload.get('message', '')}".strip()
+    resolved["details"]["resolved"] = True
+    return resolved
+
+
+# ============================================
+# ALERT STORE
+# ============================================
+
+
+class AlertStore:
+    """SQLite-backed alert state, namespaced by source"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_hours: Optional[float] = None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        hours = ttl_hours if ttl_hours is not None else ALERT_TTL_HOURS
+        self.ttl_seconds = hours * 3600
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def reconcile(self, source: str, alerts: Iterable[AlertInput], resolve: bool = True) -> ReconcileResult:
+        """
+        Compare this run's alerts with the active ones.
+
+        Pass resolve=False when the run was partial (e.g. some jobs failed
+        to load), so missing alerts are not wrongly auto-resolved.
+        """
+        now = time.time()
+        result = ReconcileResult(source=source)
+
+        for key, severity, payload in alerts:
+            existing = result.current.get(key)
+            # Same key twice in one run: keep the most severe
+            if existing and SEVERITY_RANK.get(existing[0], 0) >= SEVERITY_RANK.get(severity, 0):
+                continue
+            result.current[key] = (severity, payload)
+
+        with closing(self._connect()) as conn:
+            active = {
+                row["alert_key"]: row
+                for row in conn.execute(
+                    "SELECT * FROM alerts WHERE source = ? AND status = 'active'", (source,)
+                )
+            }
+
+        for key, (severity, payload) in result.current.items():
+            row = active.get(key)
+            if row is None:
+                kind = "new"
+            elif SEVERITY_RANK.get(severity, 0) > SEVERITY_RANK.get(row["severity"], 0):
+                kind = "escalated"
+            elif self.ttl_seconds and now - (row["last_notified"] or 0) >= self.ttl_seconds:
+                kind = "reminder"
+            else:
+                result.suppressed += 1
+                continue
+            result.transitions.append(AlertTransition(kind, key, severity, _with_key(payload, key)))
+
+        if resolve:
+            for key, row in active.items():
+                if key not in result.current:
+                    payload = json.loads(row["payload"])
+                    result.transitions.append(
+                        AlertTransition("resolved", key, "info", resolution_payload(key, payload))
+                    )
+
+        return result
+
+    def commit(self, result: ReconcileResult, sent: Optional[List[AlertTransition]] = None):
+        """
+        Persist state after sending. Transitions not in `sent` (failed
+        deliveries) are left as they were, so they go out again next run.
+        """
+        now = time.time()
+        delivered = {t.key: t for t in (result.transitions if sent is None else sent)}
+        undelivered = {t.key for t in result.transitions} - set(delivered)
+
+        with closing(self._connect()) as conn, conn:
+            for key, (severity, payload) in result.current.items():
+                if key in undelivered:
+                    continue
+                notified = now if key in delivered else None
+                conn.execute(
+                    """
+                    INSERT INTO alerts (source, alert_key, severity, status, payload,
+                                        first_seen, last_seen, last_notified)
+                    VALUES (?, ?, ?, 'active', ?, ?, ?, ?)
+                    ON CONFLICT(source, alert_key) DO UPDATE SET
+                        severity = excluded.severity,
+                        status = 'active',
+                        payload = excluded.payload,
+                        last_seen = excluded.last_seen,
+                        last_notified = COALESCE(excluded.last_notified, alerts.last_notified),
+                        first_seen = CASE WHEN alerts.status = 'resolved'
+                                          THEN excluded.first_seen ELSE alerts.first_seen END,
+                        resolved_at = NULL
+                    """,
+                    (result.source, key, severity, json.dumps(payload, default=str), now, now, notified),
+                )
+
+            for key, transition in delivered.items():
+                if transition.kind == "resolved":
+                    conn.execute(
+                        """
+                        UPDATE alerts SET status = 'resolved', resolved_at = ?, last_notified = ?
+                        WHERE source = ? AND alert_key = ?
+                        """,
+                        (now, now, result.source, key),
+                    )
+
+    def active(self, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM alerts WHERE status = 'active'"
+        params: List[Any] = []
+        if source:
+            query += " AND source = ?"
+            params.append(source)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query + " ORDER BY last_seen DESC", params).fetchall()
+        return [
+            {
+                "source": row["source"],
+                "alertKey": row["alert_key"],
+                "severity": row["severity"],
+                "title": json.loads(row["payload"]).get("title"),
+                "firstSeen": row["first_seen"],
+                "lastSeen": row["last_seen"],
+                "lastNotified": row["last_notified"],
+            }
+            for row in rows
+        ]
+
+
+_default_store: Optional[AlertStore] = None
+
+
+def get_alert_store() -> AlertStore:
+    """Shared store for the process"""
+    global _default_store
+    if _default_store is None:
+        _default_store = AlertStore()
+    return _default_store
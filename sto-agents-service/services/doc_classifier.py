@@ -0,0 +1,440 @@
+"""
+Document Classifier - One compiled document-type matcher for all agents
+
+Document types used to be detected with separate substring loops in
+PlanIntakeMonitor, DocumentRecord, DocumentTracker, CompletenessChecker
+and PlanManager. This module compiles a keyword table once into a
+single regex, factored by common prefix, and runs it over the
+lowercased name in one findall; the result for each matched keyword is
+precomputed. Results are also cached by filename, since agents see the
+same names every run.
+
+A name reports every type it mentions: "Structural Calcs" is both
+CALC_PKG and STRUCTURAL, and so is "Structural Calc Package", although
+the keywords overlap. classify() returns the highest-priority type
+found, which matches the old "first type in table order" behavior.
+Agents whose labels go to MindFlow keep their own tables (see
+PlanIntakeMonitor and DocumentRecord) so those labels don't change.
+
+A match that starts inside a match of one of the shadowing types is
+part of that phrase rather than a document of its own: "calc" in "floor
+truss calc" is not a CALC_PKG, "roof truss" in "roof truss layout" is
+not ROOF_TRUSS_CALCS.
+
+Usage:
+    from services.doc_classifier import DOC_CLASSIFIER
+    DOC_CLASSIFIER.classify("FLOOR TRUSS CALCS NH 127.pdf")   # "FLOOR_TRUSS_CALCS"
+    DOC_CLASSIFIER.classify_all("FLOOR TRUSS CALCS")          # {"FLOOR_TRUSS_CALCS", "TRUSS_CALCS"}
+    DOC_CLASSIFIER.classify_all("Structural Calcs.pdf")       # {"CALC_PKG", "STRUCTURAL"}
+
+Benchmark:
+    python -m services.doc_classifier --benchmark 100000
+"""
+
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+
+# ============================================
+# TAXONOMY
+# ============================================
+
+# Canonical document types, most specific first. Keywords are matched
+# against lowercased names; a space inside a keyword matches any run of
+# separators or none, so "calc pkg" also matches "CALC_PKG" and "CalcPkg".
+DOCUMENT_TYPES: List[Tuple[str, List[str]]] = [
+    ("FLOOR_TRUSS_LAYOUT", ["floor truss layout"]),
+    ("ROOF_TRUSS_LAYOUT", ["roof truss layout"]),
+    ("FLOOR_TRUSS_CALCS", ["floor truss calc", "floor truss", "floor system"]),
+    ("ROOF_TRUSS_CALCS", ["roof truss calc", "roof truss"]),
+    ("TRUSS_LAYOUT", ["truss layout"]),
+    ("TRUSS_CALCS", ["truss calc", "truss"]),
+    ("IJOIST", ["i joist", "ijoist", "floor joist"]),
+    ("CALC_PKG", ["calc pkg", "calc package", "structural calc", "calculation", "calcs", "calc", "engineering"]),
+    ("PLOT_PLAN", ["plot plan", "site plan", "plot"]),
+    ("ARCH_DRAWINGS", ["arch drawing", "architectural", "arch", "floor plan", "elevation"]),
+    ("JIO", ["jio"]),
+    ("HCO", ["hco"]),
+    ("SPEC_SHEET", ["specification", "spec"]),
+    ("STRUCTURAL", ["structural", "framing"]),
+    ("PLANS", ["plans", "plan set"]),
+]
+
+# A specific type also satisfies its generic parent (e.g. a job that
+# needs TRUSS_CALCS is satisfied by FLOOR_TRUSS_CALCS)
+IMPLIED_TYPES: Dict[str, Tuple[str, ...]] = {
+    "FLOOR_TRUSS_CALCS": ("TRUSS_CALCS",),
+    "ROOF_TRUSS_CALCS": ("TRUSS_CALCS",),
+    "FLOOR_TRUSS_LAYOUT": ("TRUSS_LAYOUT",),
+    "ROOF_TRUSS_LAYOUT": ("TRUSS_LAYOUT",),
+}
+
+# Truss phrases swallow the keywords of other types that start inside
+# them ("truss" in "roof truss layout", "calc" in "floor truss calc")
+SHADOWING_TYPES = frozenset({
+    "FLOOR_TRUSS_LAYOUT", "ROOF_TRUSS_LAYOUT", "FLOOR_TRUSS_CALCS",
+    "ROOF_TRUSS_CALCS", "TRUSS_LAYOUT", "TRUSS_CALCS",
+})
+
+# Keywords this short must be whole words ("hco" but not "hcounty")
+SHORT_KEYWORD_LENGTH = 3
+
+CACHE_SIZE = 65536
+
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+# What a space in a keyword matches in a lowercased name
+_SEPARATOR_RUN = "[^a-z0-9]*"
+
+
+def normalize_name(name: str) -> str:
+    """'2400A_Arch-Drawings.PDF' -> '2400a arch drawings pdf'"""
+    return _SEPARATORS.sub(" ", name.lower()) if name else ""
+
+
+def _keyword_regex(keyword: str) -> str:
+    body = " ?".join(re.escape(w) for w in normalize_name(keyword).split())
+    if len(keyword) <= SHORT_KEYWORD_LENGTH:
+        return r"(?<![a-z])" + body + r"(?![a-z])"
+    return body
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """
+    One regex for many keywords, factored by common prefix
+    ("calc(?:s|ulation|)"), so re follows one branch per position instead
+    of trying every keyword, and every alternative starts with a literal,
+    which keeps re's fast scan for the first character. Longer keywords
+    are tried before their prefixes. Short keywords must be whole words;
+    that is checked after the keyword, for the same reason.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        text = normalize_name(keyword).strip()
+        node = trie
+        for char in text:
+            node = node.setdefault(char, {})
+        node[""] = (
+            rf"(?<![a-z]{re.escape(text)})(?![a-z])"
+            if len(keyword) <= SHORT_KEYWORD_LENGTH and " " not in text else ""
+        )
+
+    def branches(node: Dict[str, dict]) -> List[str]:
+        found = [
+            (_SEPARATOR_RUN if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if "" in node:
+            found.append(node[""])
+        return found
+
+    def emit(node: Dict[str, dict]) -> str:
+        found = branches(node)
+        return found[0] if len(found) == 1 else "(?:" + "|".join(found) + ")"
+
+    return "|".join(branches(trie))
+
+
+# ============================================
+# CLASSIFIER
+# ============================================
+
+
+class DocumentClassifier:
+    """
+    Compiled, cached classifier for a (type, patterns) table.
+
+    Table order is priority order; every type mentioned in a name is
+    found, and classify() picks the highest-priority one. Patterns are
+    keywords by default, compiled into one prefix-trie regex; a findall
+    over the lowercased name returns the longest keyword at each match,
+    and what each keyword counts for is precomputed: its own type and the
+    other types' keywords it begins with ("structural calc" is STRUCTURAL
+    too), less those covered by a longer `shadowing` phrase.
+
+    findall doesn't look inside a match, so where another type's keyword
+    can start inside one, the two are joined into a keyword of their own
+    ("plot plans" is PLOT_PLAN and PLANS). The few overlaps that can't be
+    joined flag the match, and a name containing one is scanned again
+    with a lookahead version of the regex that finds a keyword at every
+    position, skipping past `shadowing` phrases.
+
+    Pass regex=True to use the patterns as raw regular expressions
+    against the lowercased name (PlanManager); each type then gets one
+    re.search, and `shadowing` does not apply.
+    """
+
+    def __init__(
+        self,
+        table: Sequence[Tuple[str, Sequence[str]]],
+        default: Optional[str] = None,
+        implied: Optional[Dict[str, Tuple[str, ...]]] = None,
+        regex: bool = False,
+        shadowing: Iterable[str] = (),
+        cache_size: int = CACHE_SIZE,
+    ):
+        self.default = default
+        self.implied = implied or {}
+        self.regex = regex
+        self.shadowing = frozenset(shadowing)
+        self.types = [doc_type for doc_type, _ in table]
+        self._type_set = frozenset(self.types)
+
+        if regex:
+            self._type_regexes = [
+                (priority, doc_type, re.compile("|".join(f"(?:{pattern})" for pattern in patterns)))
+                for priority, (doc_type, patterns) in enumerate(table)
+            ]
+        else:
+            keywords = [
+                (keyword, priority, doc_type)
+                for priority, (doc_type, patterns) in enumerate(table)
+                for keyword in patterns
+            ]
+            # Longest first so a match spans the most specific keyword
+            keywords.sort(key=lambda entry: len(entry[0]), reverse=True)
+            alternation = _trie_regex(keyword for keyword, _, _ in keywords)
+
+            # Every position: the lookahead captures the keyword, the optional
+            # group skips past a shadowing phrase
+            phrases = [keyword for keyword, _, doc_type in keywords if doc_type in self.shadowing]
+            overlapping = f"(?=({alternation}))"
+            self._shadow_match = None
+            if phrases:
+                shadow = _trie_regex(phrases)
+                overlapping += f"(?:{shadow})?"
+                self._shadow_match = re.compile(shadow, re.ASCII).match
+            self._findall_overlapping = re.compile(overlapping, re.ASCII).findall
+
+            # Matched keyword (separators removed) -> (priority, (best type, all
+            # types), whether the name has to be scanned again)
+            self._at_match: Dict[str, Tuple[int, Tuple[str, FrozenSet[str]], bool]] = {}
+            for keyword, _, _ in keywords:
+                text = normalize_name(keyword).strip().replace(" ", "")
+                self._at_match.setdefault(text, self._keyword_result(keyword, keywords))
+            extended = self._add_overlaps(keywords)
+            self._findall = re.compile(_trie_regex([keyword for keyword, _, _ in keywords] + extended), re.ASCII).findall
+        self._no_match = (default, frozenset())
+        self._match = lru_cache(maxsize=cache_size)(self._match_regexes if regex else self._match_keywords)
+
+    def _keyword_result(self, keyword: str, keywords: List[Tuple[str, int, str]]) -> Tuple[int, Tuple[str, FrozenSet[str]], bool]:
+        """
+        What a match of one keyword counts for: its own type and the other
+        types' keywords it begins with, unless a longer shadowing phrase
+        among them covers those
+        """
+        text = normalize_name(keyword).strip()
+        hits = {}
+        for other, priority, doc_type in keywords:
+            m = re.compile(_keyword_regex(other)).match(text)
+            if m and doc_type not in hits:
+                hits[doc_type] = (priority, m.end())
+        kept = {
+            doc_type: priority for doc_type, (priority, end) in hits.items()
+            if not any(other in self.shadowing and other_end > end for other, (_, other_end) in hits.items())
+        }
+        best = min(kept, key=kept.get)
+        found = set(kept)
+        for doc_type in kept:
+            found.update(self.implied.get(doc_type, ()))
+        return kept[best], (best, frozenset(found)), False
+
+    def _add_overlaps(self, keywords: List[Tuple[str, int, str]]) -> List[str]:
+        """
+        Handle keywords that start inside another one. One that runs past
+        its end ("plans" after "plot plan") is joined to it ("plot plans")
+        and the joined spelling becomes a keyword of its own, counting for
+        whatever the lookahead scan finds in it. One that ends inside it
+        flags it, and so does joining a joined spelling again: names that
+        contain a flagged match are scanned again.
+        """
+        spelled = {normalize_name(keyword).strip(): len(keyword) for keyword, _, _ in keywords}
+        extended = []
+        pending = list(spelled)
+        for text in pending:
+            key = text.replace(" ", "")
+            priority, result, _ = self._at_match[key]
+            found = result[1]
+            shadowed = self._shadow_match(text) if self._shadow_match else None
+            for offset in range(shadowed.end() if shadowed else 1, len(text)):
+                if text[offset] == " ":
+                    continue
+                rest = text[offset:].replace(" ", "")
+                for other, length in spelled.items():
+                    other_key = other.replace(" ", "")
+                    if length <= SHORT_KEYWORD_LENGTH and text[offset - 1] != " ":
+                        continue
+                    other_found = self._at_match[other_key][1][1]
+                    if other_found <= found and not other_found & self.shadowing:
+                        continue
+                    if rest.startswith(other_key):
+                        self._at_match[key] = (priority, result, True)
+                    elif other_key.startswith(rest):
+                        # Keep other's spacing past the shared characters
+                        shared = 0
+                        for split, char in enumerate(other):
+                            shared += char != " "
+                            if shared == len(rest):
+                                break
+                        joined = text + other[split + 1:]
+                        joined_key = joined.replace(" ", "")
+                        if joined_key in self._at_match:
+                            continue
+                        hits = [self._result(matched) for matched in self._findall_overlapping(joined)]
+                        if not hits or length <= SHORT_KEYWORD_LENGTH:
+                            self._at_match[key] = (priority, result, True)
+                            continue
+                        self._at_match[joined_key] = self._fold(hits) + (text not in spelled,)
+                        extended.append(joined)
+                        if text in spelled:
+                            pending.append(joined)
+        return extended
+
+    @staticmethod
+    def _fold(hits: List[Tuple]) -> Tuple[int, Tuple[str, FrozenSet[str]]]:
+        """(priority, (best type, all types)) across several keyword hits"""
+        priority, (best, _) = min(hits, key=itemgetter(0))[:2]
+        return priority, (best, frozenset().union(*(hit[1][1] for hit in hits)))
+
+    def _result(self, matched: str) -> Tuple[int, Tuple[str, FrozenSet[str]], bool]:
+        """Precomputed result for a keyword as spelled in a name ("calc_pkg")"""
+        result = self._at_match.get(matched)
+        if result is None:
+            # Cached under that spelling too; names use only a few
+            result = self._at_match[matched] = self._at_match[_SEPARATORS.sub("", matched)]
+        return result
+
+    def _match_keywords(self, name: str) -> Tuple[Optional[str], FrozenSet[str]]:
+        """(best type, all types) for a raw filename"""
+        matches = self._findall(name.lower())
+        if len(matches) == 1:
+            # Most names: one keyword, result precomputed
+            hit = self._at_match.get(matches[0]) or self._result(matches[0])
+            if not hit[2]:
+                return hit[1]
+        elif not matches:
+            return self._no_match
+        hits = [self._at_match.get(matched) or self._result(matched) for matched in matches]
+        if any(hit[2] for hit in hits):
+            hits = [self._result(matched) for matched in self._findall_overlapping(name.lower())]
+        return self._fold(hits)[1]
+
+    def _match_regexes(self, name: str) -> Tuple[Optional[str], FrozenSet[str]]:
+        """(best type, all types) for a raw filename, regex=True"""
+        text = name.lower()
+        hits = [
+            (priority, (doc_type, frozenset((doc_type, *self.implied.get(doc_type, ())))))
+            for priority, doc_type, type_regex in self._type_regexes
+            if type_regex.search(text)
+        ]
+        return self._fold(hits)[1] if hits else self._no_match
+
+    def classify(self, name: str) -> Optional[str]:
+        """Highest-priority document type in the name (or the default)"""
+        return self._match(name or "")[0]
+
+    def classify_all(self, name: str) -> FrozenSet[str]:
+        """Every type mentioned in the name (less shadowed matches), plus the generic types they imply"""
+        return self._match(name or "")[1]
+
+    def classify_many(self, names: Iterable[str]) -> List[Optional[str]]:
+        """Classify a list of filenames (duplicates are served from the cache)"""
+        classify = self.classify
+        return [classify(name) for name in names]
+
+    def normalize(self, doc_type: str) -> Optional[str]:
+        """Map a document type label or alias ('calc pkg', 'Arch') to a canonical type"""
+        if not doc_type:
+            return None
+        upper = doc_type.strip().upper()
+        if upper in self._type_set:
+            return upper
+        return self.classify(doc_type)
+
+    def cache_info(self):
+        return self._match.cache_info()
+
+
+# Shared classifier for builder document types
+DOC_CLASSIFIER = DocumentClassifier(DOCUMENT_TYPES, implied=IMPLIED_TYPES, shadowing=SHADOWING_TYPES)
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+
+def _legacy_classify(name: str) -> Optional[str]:
+    """The previous approach: substring loops over a pattern dict"""
+    name_lower = name.lower()
+    for doc_type, patterns in DOCUMENT_TYPES:
+        for pattern in patterns:
+            if pattern in name_lower:
+                return doc_type
+    return None
+
+
+def _synthetic_filenames(count: int, unique_ratio: float, seed: int = 42) -> List[str]:
+    import random
+
+    rng = random.Random(seed)
+    stems = [
+        "ARCH DRAWINGS", "CALC PKG NH {a} {b}", "FLOOR TRUSS CALCS", "ROOF_TRUSS_LAYOUT",
+        "{a}A_ArchDrawings", "Plot Plan Lot {a}", "JIO {a}", "HCO-{a}", "I-Joist Layout",
+        "Spec Sheet {a}", "Structural Framing", "Elevation C", "Invoice {a}", "Photo_{a}",
+        "25-308-HOLT-REG_{a}-{b}_2CAR-ELEV_C-BASE_PLAN_S-SHEETS-_ST",
+    ]
+    pool_size = max(1, int(count * unique_ratio))
+    pool = [
+        rng.choice(stems).format(a=rng.randint(1, 999), b=rng.randint(1000, 9999)) + f" {i}" + rng.choice([".pdf", ".PDF", ".dwg"])
+        for i in range(pool_size)
+    ]
+    if pool_size == count:
+        # Every name distinct: nothing is served from the cache
+        return pool
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def run_benchmark(count: int = 100_000):
+    import time
+
+    for unique_ratio in (1.0, 0.1):
+        names = _synthetic_filenames(count, unique_ratio)
+
+        start = time.perf_counter()
+        for name in names:
+            _legacy_classify(name)
+        legacy = time.perf_counter() - start
+
+        classifier = DocumentClassifier(DOCUMENT_TYPES, implied=IMPLIED_TYPES, shadowing=SHADOWING_TYPES)
+        start = time.perf_counter()
+        for name in names:
+            classifier.classify(name)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for name in names:
+            classifier.classify(name)
+        warm = time.perf_counter() - start
+
+        print(f"{count:,} filenames ({len(set(names)):,} distinct)")
+        print(f"  legacy substring loops: {legacy * 1000:8.1f} ms")
+        print(f"  compiled (cold cache):  {cold * 1000:8.1f} ms")
+        print(f"  compiled (warm cache):  {warm * 1000:8.1f} ms")
+        print(f"  cache: {classifier.cache_info()}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Document type classifier")
+    parser.add_argument("names", nargs="*", help="Filenames to classify")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Benchmark on N synthetic filenames")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark)
+    for name in args.names:
+        print(f"{name}: {DOC_CLASSIFIER.classify(name)} {sorted(DOC_CLASSIFIER.classify_all(name))}")
@@ -0,0 +1,157 @@
+"""
+Document Index - Per-run job -> document type index
+
+Completeness checks used to fetch a job's documents and rescan the whole
+list for every required and optional type, and summaries re-ran the
+checks (and the fetches) from scratch. The index fetches every job's
+documents once, classifies each document once, and stores the types a
+job has as a bitmask. Completeness, missing documents and the by-builder
+/ by-community rollups are then bit operations over the index.
+
+Usage:
+    index = await build_document_index(jobs, fetch_documents)
+    index.missing(job_id, ["ARCH_DRAWINGS", "CALC_PKG"])
+    index.rollup(lambda job: job.get("builder"), required_for)
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from services.doc_classifier import DOC_CLASSIFIER, DocumentClassifier
+
+
+# Document fields used by the MindFlow endpoints (labels vs. filenames)
+LABEL_FIELDS = ("doc_type", "docType", "document_type")
+NAME_FIELDS = ("filename", "fileName", "name")
+
+DEFAULT_CONCURRENCY = 8
+
+
+def classify_document(doc: Dict[str, Any], classifier: DocumentClassifier = DOC_CLASSIFIER) -> Set[str]:
+    """Every document type a document counts as (label and filename)"""
+    types: Set[str] = set()
+    for key in LABEL_FIELDS:
+        label = classifier.normalize(doc.get(key) or "")
+        if label:
+            types.add(label)
+            types.update(classifier.implied.get(label, ()))
+    for key in NAME_FIELDS:
+        if doc.get(key):
+            types.update(classifier.classify_all(doc[key]))
+    return types
+
+
+class DocumentIndex:
+    """job_id -> bitmask of document types present, built once per run"""
+
+    def __init__(self, classifier: DocumentClassifier = DOC_CLASSIFIER):
+        self.classifier = classifier
+        self._bits: Dict[str, int] = {doc_type: 1 << i for i, doc_type in enumerate(classifier.types)}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.masks: Dict[str, int] = {}
+        self.document_counts: Dict[str, int] = {}
+        self.errors: Dict[str, str] = {}
+        self.built_at = datetime.now()
+
+    # ---------- Bitmasks ----------
+
+    def bit(self, doc_type: str) -> int:
+        bit = self._bits.get(doc_type)
+        if bit is None:
+            # Types outside the classifier table (e.g. agent-specific labels)
+            bit = self._bits[doc_type] = 1 << len(self._bits)
+        return bit
+
+    def mask(self, doc_types: Iterable[str]) -> int:
+        mask = 0
+        for doc_type in doc_types:
+            mask |= self.bit(doc_type)
+        return mask
+
+    # ---------- Building ----------
+
+    def add_job(self, job_id: str, job: Dict[str, Any], documents: List[Dict[str, Any]]):
+        """Classify a job's documents (once) and store their types"""
+        mask = 0
+        for doc in documents:
+            mask |= self.mask(classify_document(doc, self.classifier))
+        self.jobs[job_id] = job
+        self.masks[job_id] = mask
+        self.document_counts[job_id] = len(documents)
+
+    def set_types(self, job_id: str, doc_types: Iterable[str]):
+        self.masks[job_id] = self.mask(doc_types)
+
+    # ---------- Queries ----------
+
+    def types(self, job_id: str) -> List[str]:
+        mask = self.masks.get(job_id, 0)
+        return [doc_type for doc_type, bit in self._bits.items() if mask & bit]
+
+    def has(self, job_id: str, doc_type: str) -> bool:
+        return bool(self.masks.get(job_id, 0) & self.bit(doc_type))
+
+    def missing(self, job_id: str, doc_types: List[str]) -> List[str]:
+        """Types from doc_types the job does not have (in the given order)"""
+        mask = self.masks.get(job_id, 0)
+        return [doc_type for doc_type in doc_types if not mask & self.bit(doc_type)]
+
+    def is_complete(self, job_id: str, required: Iterable[str]) -> bool:
+        need = self.mask(required)
+        return self.masks.get(job_id, 0) & need == need
+
+    def jobs_missing(self, doc_type: str) -> List[str]:
+        bit = self.bit(doc_type)
+        return [job_id for job_id, mask in self.masks.items() if not mask & bit]
+
+    def rollup(
+        self,
+        key: Callable[[Dict[str, Any]], str],
+        required: Callable[[Dict[str, Any]], List[str]],
+    ) -> Dict[str, Dict[str, int]]:
+        """{group: {total, complete, incomplete}} without refetching anything"""
+        groups: Dict[str, Dict[str, int]] = {}
+        for job_id, job in self.jobs.items():
+            counts = groups.setdefault(key(job), {"total": 0, "complete": 0, "incomplete": 0})
+            counts["total"] += 1
+            counts["complete" if self.is_complete(job_id, required(job)) else "incomplete"] += 1
+        return groups
+
+    def missing_counts(self, required: Callable[[Dict[str, Any]], List[str]]) -> Dict[str, int]:
+        """{doc_type: number of jobs missing it}"""
+        counts: Dict[str, int] = {}
+        for job_id, job in self.jobs.items():
+            for doc_type in self.missing(job_id, required(job)):
+                counts[doc_type] = counts.get(doc_type, 0) + 1
+        return counts
+
+
+async def build_document_index(
+    jobs: List[Dict[str, Any]],
+    fetch_documents: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+    job_id: Callable[[Dict[str, Any]], Optional[str]] = lambda job: job.get("id"),
+    concurrency: int = DEFAULT_CONCURRENCY,
+    classifier: DocumentClassifier = DOC_CLASSIFIER,
+) -> DocumentIndex:
+    """Fetch every job's documents once (concurrently) and index them"""
+    index = DocumentIndex(classifier)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    # Jobs without an id get a positional key (nothing to fetch for them)
+    keys = [job_id(job) or f"#{position}" for position, job in enumerate(jobs)]
+
+    async def load(key: str) -> List[Dict[str, Any]]:
+        if key.startswith("#"):
+            return []
+        async with semaphore:
+            try:
+                return await fetch_documents(key) or []
+            except Exception as e:
+                index.errors[key] = str(e)
+                return []
+
+    results = await asyncio.gather(*(load(key) for key in keys))
+    for key, job, documents in zip(keys, jobs, results):
+        index.add_job(key, job, documents)
+    return index
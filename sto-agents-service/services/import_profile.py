@@ -0,0 +1,75 @@
+"""
+Import Profile - Measure cold import time of the service
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter
+and reports the total and the slowest modules, so regressions in
+startup time (e.g. an agent that imports pandas at module level) are
+easy to spot.
+
+Usage:
+    python -m services.import_profile                 # profile main
+    python -m services.import_profile main --top 20 --budget-ms 1000   # exit 1 above budget
+
+FastAPI and pydantic alone take several hundred ms to import, so check
+a budget against the numbers from your own deploy target (the startup
+time of a running service is exported as sto_startup_seconds).
+"""
+
+import re
+import sys
+import argparse
+import subprocess
+from typing import List, Tuple
+
+# "import time:      self [us] |  cumulative | imported package"
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile(module: str) -> Tuple[float, List[Tuple[str, float, float]]]:
+    """(total ms, [(module, self ms, cumulative ms)]) for a cold import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "import failed")
+
+    rows = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        rows.append((name, int(self_us) / 1000, int(cumulative_us) / 1000))
+        # Top-level imports (one space of indent) add up to the total
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+    return total_us / 1000, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile cold import time")
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, help="Exit 1 above this total")
+    args = parser.parse_args()
+
+    try:
+        total_ms, rows = profile(args.module)
+    except RuntimeError as e:
+        print(f"import {args.module} failed: {e}")
+        sys.exit(2)
+
+    budget = f" (budget {args.budget_ms:.0f} ms)" if args.budget_ms is not None else ""
+    print(f"import {args.module}: {total_ms:.1f} ms{budget}")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for name, self_ms, cumulative_ms in sorted(rows, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_ms:10.1f}ms {self_ms:8.1f}ms  {name}")
+
+    sys.exit(1 if args.budget_ms is not None and total_ms > args.budget_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,669 @@
+"""
+Job Queue - Durable background jobs for STO agent syncs
+
+Jobs live in a SQLite database (WAL mode) so they survive restarts and
+can be shared by several service replicas pointed at the same file.
+Workers claim jobs inside an IMMEDIATE transaction, which keeps the
+per-agent concurrency limits correct across processes.
+
+Job lifecycle:
+    queued -> running -> completed
+                      -> queued   (retry with backoff)
+                      -> failed   (attempts exhausted)
+"""
+
+import os
+import json
+import logging
+import uuid
+import time
+import socket
+import asyncio
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.logging_config import bind_job
+from services.metrics import AGENT_ERRORS, AGENT_RUN_SECONDS, JOBS_IN_FLIGHT, RECORDS_PROCESSED, RECORDS_PER_SECOND
+
+
+logger = logging.getLogger("sto.queue")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DEFAULT_DB_PATH = os.getenv("JOB_QUEUE_DB", "data/job_queue.db")
+
+# Lower number runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+# Max jobs of one agent running at the same time (across all workers)
+DEFAULT_AGENT_LIMIT = 1
+
+# A running job whose lease expires is assumed to belong to a dead worker
+DEFAULT_LEASE_SECONDS = 300
+
+# Workers renew the lease this many times per lease period while a handler runs
+HEARTBEATS_PER_LEASE = 3
+
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            TEXT PRIMARY KEY,
+    agent         TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    priority      INTEGER NOT NULL DEFAULT 5,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_attempts  INTEGER NOT NULL DEFAULT 3,
+    dedupe_key    TEXT,
+    payload       TEXT,
+    progress      TEXT,
+    result        TEXT,
+    error         TEXT,
+    created_at    REAL NOT NULL,
+    updated_at    REAL NOT NULL,
+    run_after     REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    worker_id     TEXT,
+    lease_expires REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, priority, run_after);
+CREATE INDEX IF NOT EXISTS idx_jobs_agent ON jobs(agent, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, status);
+"""
+
+
+# ============================================
+# DATA CLASSES
+# ============================================
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+def _loads(value: Optional[str]) -> Any:
+    return json.loads(value) if value else None
+
+
+@dataclass
+class Job:
+    """A single queued unit of agent work"""
+
+    id: str
+    agent: str
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    payload: Dict = field(default_factory=dict)
+    progress: Dict = field(default_factory=dict)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    run_after: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    worker_id: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "Job":
+        return cls(
+            id=row["id"],
+            agent=row["agent"],
+            status=row["status"],
+            priority=row["priority"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            payload=_loads(row["payload"]) or {},
+            progress=_loads(row["progress"]) or {},
+            result=_loads(row["result"]),
+            error=row["error"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            run_after=row["run_after"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            worker_id=row["worker_id"],
+        )
+
+    def to_dict(self) -> Dict:
+        """Convert to API response format"""
+        return {
+            "jobId": self.id,
+            "agent": self.agent,
+            "status": self.status,
+            "priority": self.priority,
+            "attempts": self.attempts,
+            "maxAttempts": self.max_attempts,
+            "payload": self.payload,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": _iso(self.created_at),
+            "startedAt": _iso(self.started_at),
+            "finishedAt": _iso(self.finished_at),
+            "runAfter": _iso(self.run_after),
+            "workerId": self.worker_id,
+        }
+
+
+# ============================================
+# JOB QUEUE
+# ============================================
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue.
+
+    Every method opens its own short-lived connection so the queue can be
+    used from worker threads (asyncio.to_thread) and from several
+    processes at once.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        agent_limits: Optional[Dict[str, int]] = None,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+    ):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.agent_limits = agent_limits or {}
+        self.lease_seconds = lease_seconds
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def limit_for(self, agent: str) -> int:
+        return self.agent_limits.get(agent, DEFAULT_AGENT_LIMIT)
+
+    # ---------- Producers ----------
+
+    def enqueue(
+        self,
+        agent: str,
+        payload: Optional[Dict] = None,
+        priority: int = PRIORITY_NORMAL,
+        max_attempts: int = 3,
+        delay: float = 0.0,
+        dedupe: bool = True,
+    ) -> Tuple[str, bool]:
+        """
+        Add a job to the queue.
+
+        Returns (job_id, created). When an identical job (same agent and
+        payload) is already waiting, its id is returned with created=False.
+        """
+        payload = payload or {}
+        payload_json = json.dumps(payload, sort_keys=True, default=str)
+        dedupe_key = f"{agent}:{payload_json}" if dedupe else None
+        now = time.time()
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if dedupe_key:
+                row = conn.execute(
+                    "SELECT id, priority FROM jobs WHERE dedupe_key = ? AND status = 'queued' LIMIT 1",
+                    (dedupe_key,),
+                ).fetchone()
+                if row:
+                    # A more urgent request bumps the waiting job
+                    if priority < row["priority"]:
+                        conn.execute(
+                            "UPDATE jobs SET priority = ?, updated_at = ? WHERE id = ?",
+                            (priority, now, row["id"]),
+                        )
+                    conn.execute("COMMIT")
+                    return row["id"], False
+
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                """
+                INSERT INTO jobs (id, agent, status, priority, max_attempts, dedupe_key,
+                                  payload, created_at, updated_at, run_after)
+                VALUES (?, ?, 'queued', ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (job_id, agent, priority, max_attempts, dedupe_key, payload_json, now, now, now + delay),
+            )
+            conn.execute("COMMIT")
+            return job_id, True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ---------- Consumers ----------
+
+    def claim(self, worker_id: str, agents: Optional[List[str]] = None) -> Optional[Job]:
+        """Claim the next runnable job, respecting per-agent limits"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._recover_stale(conn, now)
+
+            running = {
+                row["agent"]: row["n"]
+                for row in conn.execute(
+                    "SELECT agent, COUNT(*) AS n FROM jobs WHERE status = 'running' GROUP BY agent"
+                )
+            }
+
+            # Agents at their limit and agents this worker doesn't run are
+            # filtered in SQL, so runnable jobs behind them are still found
+            saturated = [
+                agent for agent in set(running) | set(self.agent_limits)
+                if running.get(agent, 0) >= self.limit_for(agent)
+            ]
+            clauses, params = ["status = 'queued'", "run_after <= ?"], [now]
+            if saturated:
+                clauses.append(f"agent NOT IN ({', '.join('?' * len(saturated))})")
+                params.extend(saturated)
+            if agents is not None:
+                clauses.append(f"agent IN ({', '.join('?' * len(agents))})" if agents else "0")
+                params.extend(agents)
+
+            row = conn.execute(
+                f"""
+                SELECT id FROM jobs
+                WHERE {' AND '.join(clauses)}
+                ORDER BY priority ASC, run_after ASC, created_at ASC
+                LIMIT 1
+                """,
+                params,
+            ).fetchone()
+
+            if row:
+                conn.execute(
+                    """
+                    UPDATE jobs
+                    SET status = 'running', attempts = attempts + 1, worker_id = ?,
+                        started_at = ?, updated_at = ?, lease_expires = ?, error = NULL
+                    WHERE id = ?
+                    """,
+                    (worker_id, now, now, now + self.lease_seconds, row["id"]),
+                )
+                claimed = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                conn.execute("COMMIT")
+                return Job.from_row(claimed)
+
+            conn.execute("COMMIT")
+            return None
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _recover_stale(self, conn: sqlite3.Connection, now: float):
+        """Requeue (or fail) running jobs whose worker stopped heartbeating"""
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'queued' END,
+                error = 'Worker lease expired', worker_id = NULL, lease_expires = NULL,
+                updated_at = ?, run_after = ?,
+                finished_at = CASE WHEN attempts >= max_attempts THEN ? ELSE NULL END
+            WHERE status = 'running' AND lease_expires < ?
+            """,
+            (now, now, now, now),
+        )
+
+    def update_progress(self, job_id: str, progress: Dict):
+        """Merge progress fields into the job and extend its lease"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT progress FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row:
+                merged = _loads(row["progress"]) or {}
+                merged.update(progress)
+                conn.execute(
+                    "UPDATE jobs SET progress = ?, updated_at = ?, lease_expires = ? WHERE id = ?",
+                    (json.dumps(merged, default=str), now, now + self.lease_seconds, job_id),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def renew_lease(self, job_id: str, worker_id: str) -> bool:
+        """
+        Extend a running job's lease (worker heartbeat). False when the
+        job is no longer running under this worker.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs SET lease_expires = ?, updated_at = ?
+                WHERE id = ? AND worker_id = ? AND status = 'running'
+                """,
+                (now + self.lease_seconds, now, job_id, worker_id),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, worker_id: str, result: Any = None) -> bool:
+        """
+        Record the result. Only the worker holding the job can complete
+        it; False when its lease was lost and the job moved on.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'completed', result = ?, finished_at = ?, updated_at = ?,
+                    lease_expires = NULL
+                WHERE id = ? AND worker_id = ? AND status = 'running'
+                """,
+                (json.dumps(result, default=str), now, now, job_id, worker_id),
+            )
+        return cursor.rowcount > 0
+
+    def release(self, job_id: str, worker_id: str):
+        """Put a running job back without counting the attempt (worker shutdown)"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'queued', attempts = MAX(attempts - 1, 0), run_after = ?,
+                    updated_at = ?, worker_id = NULL, lease_expires = NULL
+                WHERE id = ? AND worker_id = ? AND status = 'running'
+                """,
+                (now, now, job_id, worker_id),
+            )
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> str:
+        """
+        Record a failed attempt. The job is retried with exponential
+        backoff until max_attempts is reached. Returns the new status,
+        or "lost" when the job is no longer held by this worker.
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT attempts, max_attempts FROM jobs
+                WHERE id = ? AND worker_id = ? AND status = 'running'
+                """,
+                (job_id, worker_id),
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                return "lost"
+
+            if row["attempts"] < row["max_attempts"]:
+                backoff = min(RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1), RETRY_MAX_SECONDS)
+                status, run_after, finished_at = "queued", now + backoff, None
+            else:
+                status, run_after, finished_at = "failed", now, now
+
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = ?, error = ?, run_after = ?, finished_at = ?, updated_at = ?,
+                    worker_id = NULL, lease_expires = NULL
+                WHERE id = ? AND worker_id = ?
+                """,
+                (status, error, run_after, finished_at, now, job_id, worker_id),
+            )
+            conn.execute("COMMIT")
+            return status
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    # ---------- Queries ----------
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def list_jobs(
+        self, agent: Optional[str] = None, status: Optional[str] = None, limit: int = 50
+    ) -> List[Job]:
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params: List[Any] = []
+        if agent:
+            query += " AND agent = ?"
+            params.append(agent)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+
+        with closing(self._connect()) as conn:
+            return [Job.from_row(row) for row in conn.execute(query, params)]
+
+    def has_active(self, agent: str) -> bool:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE agent = ? AND status IN ('queued', 'running') LIMIT 1",
+                (agent,),
+            ).fetchone()
+        return row is not None
+
+    def depth(self) -> Dict[Tuple[str, str], int]:
+        """Count of waiting and running jobs by (agent, status)"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT agent, status, COUNT(*) AS n FROM jobs
+                WHERE status IN ('queued', 'running')
+                GROUP BY agent, status
+                """
+            ).fetchall()
+        return {(row["agent"], row["status"]): row["n"] for row in rows}
+
+    def agent_status(self, agent: str) -> Dict:
+        """Summarize one agent's queue state (shape of the old sync_status entries)"""
+        with closing(self._connect()) as conn:
+            counts = {
+                row["status"]: row["n"]
+                for row in conn.execute(
+                    "SELECT status, COUNT(*) AS n FROM jobs WHERE agent = ? GROUP BY status",
+                    (agent,),
+                )
+            }
+            last_done = conn.execute(
+                """
+                SELECT finished_at FROM jobs
+                WHERE agent = ? AND status = 'completed'
+                ORDER BY finished_at DESC LIMIT 1
+                """,
+                (agent,),
+            ).fetchone()
+            latest = conn.execute(
+                """
+                SELECT id, status, error FROM jobs
+                WHERE agent = ? AND attempts > 0
+                ORDER BY updated_at DESC LIMIT 1
+                """,
+                (agent,),
+            ).fetchone()
+
+        if counts.get("running"):
+            status = "running"
+        elif counts.get("queued"):
+            status = "queued"
+        elif latest:
+            status = latest["status"]
+        else:
+            status = "idle"
+
+        return {
+            "last_sync": _iso(last_done["finished_at"]) if last_done else None,
+            "status": status,
+            "error": latest["error"] if latest and latest["status"] != "completed" else None,
+            "last_job_id": latest["id"] if latest else None,
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+        }
+
+
+# ============================================
+# WORKER POOL
+# ============================================
+
+
+class JobContext:
+    """Passed to job handlers so they can report progress"""
+
+    def __init__(self, queue: JobQueue, job: Job):
+        self.queue = queue
+        self.job = job
+        self.records = 0
+
+    @property
+    def payload(self) -> Dict:
+        return self.job.payload
+
+    async def progress(self, **fields):
+        """Record progress (also extends the lease)"""
+        self.job.progress.update(fields)
+        await asyncio.to_thread(self.queue.update_progress, self.job.id, fields)
+
+    def count_records(self, kind: str, count: int):
+        """Count records processed by this job (feeds records/sec metrics)"""
+        self.records += count
+        RECORDS_PROCESSED.inc(count, agent=self.job.agent, kind=kind)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+class WorkerPool:
+    """
+    Async workers that poll the queue and run registered handlers.
+
+    Each replica runs its own pool; they coordinate only through the
+    queue database.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        workers: int = 2,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.worker_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self):
+        self._stopping.clear()
+        for n in range(self.workers):
+            worker_id = f"{self.worker_prefix}-{n}"
+            self._tasks.append(asyncio.create_task(self._worker(worker_id)))
+
+    async def stop(self):
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, worker_id: str):
+        agents = list(self.handlers.keys())
+        while not self._stopping.is_set():
+            try:
+                job = await asyncio.to_thread(self.queue.claim, worker_id, agents)
+            except Exception as e:
+                logger.error(f"{worker_id} claim error: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job, worker_id)
+
+    async def _heartbeat(self, job: Job, worker_id: str):
+        """Renew the job's lease while its handler runs, so long jobs aren't requeued"""
+        interval = self.queue.lease_seconds / HEARTBEATS_PER_LEASE
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await asyncio.to_thread(self.queue.renew_lease, job.id, worker_id):
+                    logger.warning(f"{job.agent} job lease lost")
+                    return
+            except Exception as e:
+                logger.error(f"{worker_id} heartbeat error: {e}")
+
+    async def _run(self, job: Job, worker_id: str):
+        handler = self.handlers[job.agent]
+        ctx = JobContext(self.queue, job)
+        bind_job(job.id, f"{job.id[:8]}-{job.attempts}")
+        logger.info(f"Running {job.agent} job (attempt {job.attempts}/{job.max_attempts})")
+        start = time.perf_counter()
+        outcome = "completed"
+        JOBS_IN_FLIGHT.inc(agent=job.agent)
+        heartbeat = asyncio.create_task(self._heartbeat(job, worker_id))
+        try:
+            result = await handler(ctx)
+            heartbeat.cancel()
+            if not await asyncio.to_thread(self.queue.complete, job.id, worker_id, result):
+                outcome = "lost"
+                logger.warning(f"{job.agent} job finished after its lease was lost; result dropped")
+        except asyncio.CancelledError:
+            # Shutting down: leave the job for another worker
+            outcome = "cancelled"
+            await asyncio.to_thread(self.queue.release, job.id, worker_id)
+            raise
+        except Exception as e:
+            outcome = "failed"
+            heartbeat.cancel()
+            AGENT_ERRORS.inc(agent=job.agent, stage="job")
+            status = await asyncio.to_thread(self.queue.fail, job.id, worker_id, str(e))
+            logger.exception(f"{job.agent} job failed ({status}): {e}")
+        finally:
+            heartbeat.cancel()
+            elapsed = time.perf_counter() - start
+            JOBS_IN_FLIGHT.dec(agent=job.agent)
+            AGENT_RUN_SECONDS.observe(elapsed, agent=job.agent, status=outcome)
+            if outcome == "completed" and elapsed > 0:
+                RECORDS_PER_SECOND.set(ctx.records / elapsed, agent=job.agent)
+            logger.info(f"{job.agent} job {outcome} in {elapsed:.2f}s", extra={"records": ctx.records})
+            bind_job(None, None)
@@ -0,0 +1,220 @@
+"""
+Logging - Structured, non-blocking logging for the agents service
+
+Log calls only put the record on an in-memory queue (QueueHandler). A
+background QueueListener thread formats and writes them, so logging
+never blocks the event loop on stdout or disk I/O.
+
+Every record carries the agent name plus the run and job ids of the
+current job (set through contextvars by the worker pool).
+
+Environment:
+    LOG_LEVEL               Default level (INFO)
+    LOG_LEVELS              Per-agent levels, e.g. "JobTracker=DEBUG,PlanManager=WARNING"
+    LOG_FORMAT              "json" (default) or "text" for the console
+    LOG_DIR                 Directory for rotating JSON log files (data/logs)
+    LOG_DEBUG_SAMPLE_RATE   Fraction of DEBUG records kept (1.0 = all)
+"""
+
+import os
+import sys
+import copy
+import json
+import queue
+import logging
+import itertools
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_DIR = os.getenv("LOG_DIR", "data/logs")
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUPS = 10
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+
+ROOT_LOGGER = "sto"
+AGENT_LOGGER_PREFIX = "sto.agents"
+
+# Standard LogRecord attributes; logging raises KeyError if extra= sets one
+RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Anything else passed via extra= is output as a field
+_RESERVED = RECORD_ATTRIBUTES | {"agent", "run_id", "job_id"}
+
+# Prefix for extra fields whose name clashes with a LogRecord attribute
+FIELD_PREFIX = "field_"
+
+
+# ============================================
+# CONTEXT
+# ============================================
+
+current_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("run_id", default=None)
+current_job_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("job_id", default=None)
+
+
+def bind_job(job_id: Optional[str], run_id: Optional[str]):
+    """Attach job/run ids to every log record in the current context"""
+    current_job_id.set(job_id)
+    current_run_id.set(run_id)
+
+
+class ContextFilter(logging.Filter):
+    """Copy contextvars onto the record (runs in the caller's context)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = current_run_id.get()
+        record.job_id = current_job_id.get()
+        if not hasattr(record, "agent"):
+            name = record.name
+            record.agent = name[len(AGENT_LOGGER_PREFIX) + 1:] if name.startswith(AGENT_LOGGER_PREFIX + ".") else None
+        return True
+
+
+def log_fields(fields: Dict) -> Dict:
+    """extra= dict for logging; keys that clash with LogRecord attributes get FIELD_PREFIX"""
+    return {FIELD_PREFIX + key if key in RECORD_ATTRIBUTES else key: value for key, value in fields.items()}
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of DEBUG records (deterministic 1-in-N)"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or self.every == 1:
+            return True
+        if self.every == 0:
+            return False
+        return next(self._counter) % self.every == 0
+
+
+# ============================================
+# FORMATTERS
+# ============================================
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "agent": getattr(record, "agent", None),
+            "run_id": getattr(record, "run_id", None),
+            "job_id": getattr(record, "job_id", None),
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        elif record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class StructuredQueueHandler(QueueHandler):
+    """
+    QueueHandler that keeps the message and traceback apart. The stock
+    prepare() folds the traceback into msg and clears exc_info/exc_text,
+    which loses the JSON "exc" field; here the traceback travels as
+    exc_text (exc_info can't be pickled or used after the frame is gone).
+    """
+
+    _exc_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self._exc_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s"
+
+
+# ============================================
+# SETUP
+# ============================================
+
+_listener: Optional[QueueListener] = None
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """'JobTracker=DEBUG,PlanManager=WARNING' -> {name: level}"""
+    levels = {}
+    for part in spec.split(","):
+        if "=" in part:
+            name, level = part.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> logging.Logger:
+    """Configure the 'sto' logger tree once per process"""
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    if _listener:
+        return root
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+    handlers = [console]
+
+    if LOG_DIR:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            os.path.join(LOG_DIR, "sto_agents_service.log"),
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUPS,
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = StructuredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(SamplingFilter(LOG_DEBUG_SAMPLE_RATE))
+
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+
+    for name, level in parse_levels(LOG_LEVELS).items():
+        logging.getLogger(f"{AGENT_LOGGER_PREFIX}.{name}").setLevel(level)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return root
+
+
+def shutdown_logging():
+    """Flush queued records (call on shutdown)"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+def get_agent_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{AGENT_LOGGER_PREFIX}.{name}")
@@ -0,0 +1,310 @@
+"""
+Metrics - Prometheus-style instrumentation for the agents service
+
+A small in-process registry (no prometheus_client dependency) with
+counters, gauges and histograms, rendered in the Prometheus text format
+by GET /metrics.
+
+Instrumented:
+- Agent runs and stages (duration histograms, error counters)
+- Outbound HTTP calls (latency by host, endpoint, method and status)
+- Records processed (total and per second of the last run)
+- Job queue depth and in-flight jobs
+"""
+
+import re
+import time
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+# ============================================
+# METRIC TYPES
+# ============================================
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {v}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, optionally computed at scrape time"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_text, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._collector: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def set_collector(self, collector: Callable[[], Dict[LabelValues, float]]):
+        """Compute the gauge's values when /metrics is scraped"""
+        self._collector = collector
+
+    def _samples(self) -> List[str]:
+        if self._collector:
+            try:
+                collected = self._collector()
+                with self._lock:
+                    self._values = dict(collected)
+            except Exception:
+                pass
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {v}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> float:
+        data = self._values.get(self._key(labels))
+        return data[-1] if data else 0.0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = []
+        for key, data in items:
+            for i, bound in enumerate(self.buckets):
+                labels = _format_labels(self.label_names, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {data[i]}")
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {data[-1]}")
+            plain = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{plain} {data[-2]}")
+            lines.append(f"{self.name}_count{plain} {data[-1]}")
+        return lines
+
+
+class Registry:
+    """Holds all metrics and renders them for /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels))
+
+    def histogram(
+        self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ============================================
+# SERVICE METRICS
+# ============================================
+
+AGENT_RUN_SECONDS = REGISTRY.histogram(
+    "sto_agent_run_duration_seconds", "Duration of a full agent job run", ["agent", "status"]
+)
+AGENT_STAGE_SECONDS = REGISTRY.histogram(
+    "sto_agent_stage_duration_seconds", "Duration of a timed agent stage", ["agent", "stage"]
+)
+AGENT_ERRORS = REGISTRY.counter(
+    "sto_agent_errors_total", "Errors raised by agent runs and stages", ["agent", "stage"]
+)
+RECORDS_PROCESSED = REGISTRY.counter(
+    "sto_records_processed_total", "Records processed by agents", ["agent", "kind"]
+)
+RECORDS_PER_SECOND = REGISTRY.gauge(
+    "sto_records_per_second", "Records processed per second during the last run", ["agent"]
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "sto_http_client_request_duration_seconds",
+    "Outbound HTTP request latency",
+    ["host", "endpoint", "method", "status"],
+)
+JOBS_IN_FLIGHT = REGISTRY.gauge("sto_jobs_in_flight", "Jobs currently running in this process", ["agent"])
+QUEUE_JOBS = REGISTRY.gauge("sto_queue_jobs", "Jobs in the queue by agent and status", ["agent", "status"])
+STARTUP_SECONDS = REGISTRY.gauge("sto_startup_seconds", "Time from first import until the app was ready")
+
+
+# ============================================
+# HTTP CLIENT INSTRUMENTATION
+# ============================================
+
+# Collapse ids so the endpoint label stays low-cardinality
+_ID_SEGMENT = re.compile(r"/(?:[0-9a-fA-F-]{16,}|\d+)(?=/|$)")
+
+
+def endpoint_label(path: str) -> str:
+    return _ID_SEGMENT.sub("/{id}", path) or "/"
+
+
+# AsyncClient options that configure its default transport
+TRANSPORT_OPTIONS = ("verify", "cert", "http1", "http2", "limits")
+
+
+def instrumented_client(**kwargs):
+    """
+    httpx.AsyncClient whose requests are timed into
+    sto_http_client_request_duration_seconds (status="error" on exceptions).
+
+    Transport options (verify, cert, http1, http2, limits) build the
+    wrapped transport; with an explicit transport they would be ignored,
+    so that combination raises ValueError.
+    """
+    import httpx
+
+    class InstrumentedTransport(httpx.AsyncBaseTransport):
+        def __init__(self, inner: httpx.AsyncBaseTransport):
+            self.inner = inner
+
+        async def handle_async_request(self, request):
+            start = time.perf_counter()
+            status = "error"
+            try:
+                response = await self.inner.handle_async_request(request)
+                status = str(response.status_code)
+                return response
+            finally:
+                HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start,
+                    host=request.url.host,
+                    endpoint=endpoint_label(request.url.path),
+                    method=request.method,
+                    status=status,
+                )
+
+        async def aclose(self):
+            await self.inner.aclose()
+
+    options = {name: kwargs.pop(name) for name in TRANSPORT_OPTIONS if name in kwargs}
+    transport = kwargs.pop("transport", None)
+    if transport is None:
+        transport = httpx.AsyncHTTPTransport(trust_env=kwargs.get("trust_env", True), **options)
+    elif options:
+        raise ValueError(f"Pass {', '.join(options)} to the transport, not with transport=")
+    return httpx.AsyncClient(transport=InstrumentedTransport(transport), **kwargs)
@@ -0,0 +1,203 @@
+"""
+Pipeline - Run a sync as a small async DAG of stages
+
+A stage declares the stages it depends on; every stage starts as soon as
+its dependencies have finished, so independent stages (e.g. the orders,
+deliveries and alerts pushes of the SupplyPro sync) run concurrently.
+
+Each stage has its own timeout and retry policy. Stage timings go to
+sto_agent_stage_duration_seconds and, through JobContext.progress, into
+the job's status (GET /jobs/{id}) while it runs.
+
+Usage:
+    pipeline = Pipeline("supplypro", [
+        Stage("fetch", fetch),
+        Stage("push_orders", push_orders, depends_on=("fetch",), retries=2),
+        Stage("push_alerts", push_alerts, depends_on=("fetch",)),
+        Stage("activity", log_activity, depends_on=("push_orders", "push_alerts"), required=False),
+    ])
+    result = await pipeline.run(ctx)
+
+A stage function receives a dict of the results of the stages it
+depends on and returns its own result.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from services.metrics import AGENT_ERRORS, AGENT_STAGE_SECONDS
+
+
+logger = logging.getLogger("sto.pipeline")
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+# ============================================
+# DATA CLASSES
+# ============================================
+
+
+@dataclass
+class Stage:
+    """One step of a pipeline"""
+
+    name: str
+    run: StageFunc
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = 120.0
+    retries: int = 0
+    retry_delay: float = 1.0        # doubled after every failed attempt
+    required: bool = True           # a failed optional stage does not fail the pipeline
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str = "pending"         # ok, failed, skipped
+    seconds: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+    value: Any = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"status": self.status, "seconds": round(self.seconds, 3), "attempts": self.attempts}
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class PipelineError(Exception):
+    """A required stage failed"""
+
+    def __init__(self, pipeline: str, failed: List[StageResult]):
+        self.failed = failed
+        details = ", ".join(f"{r.name}: {r.error}" for r in failed)
+        super().__init__(f"Pipeline {pipeline} failed ({details})")
+
+
+@dataclass
+class PipelineResult:
+    name: str
+    stages: Dict[str, StageResult] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> List[StageResult]:
+        return [r for r in self.stages.values() if r.status != "ok"]
+
+    def value(self, stage: str, default: Any = None) -> Any:
+        result = self.stages.get(stage)
+        return result.value if result and result.status == "ok" else default
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        return {name: result.to_dict() for name, result in self.stages.items()}
+
+
+# ============================================
+# PIPELINE
+# ============================================
+
+
+class Pipeline:
+    """DAG of stages, validated once and run any number of times"""
+
+    def __init__(self, name: str, stages: Sequence[Stage]):
+        self.name = name
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError(f"Pipeline {name} has duplicate stage names")
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: Tuple[str, ...]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Pipeline {self.name} has a cycle: {' -> '.join(path + (name,))}")
+            stage = self.stages.get(name)
+            if stage is None:
+                raise ValueError(f"Pipeline {self.name}: unknown stage '{name}' in {path[-1] if path else '?'}")
+            state[name] = "visiting"
+            for dependency in stage.depends_on:
+                visit(dependency, path + (name,))
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    async def run(self, ctx=None, raise_on_failure: bool = True) -> PipelineResult:
+        """
+        Run every stage once its dependencies are done. Stages depending on
+        a failed stage are skipped. Raises PipelineError at the end if a
+        required stage did not succeed (unless raise_on_failure=False).
+        """
+        result = PipelineResult(self.name)
+        tasks: Dict[str, asyncio.Task] = {}
+        started = time.perf_counter()
+
+        for name in self.order:
+            stage = self.stages[name]
+            result.stages[name] = StageResult(name)
+            dependencies = [tasks[d] for d in stage.depends_on]
+            tasks[name] = asyncio.create_task(self._run_stage(stage, dependencies, result, ctx))
+
+        await asyncio.gather(*tasks.values())
+        result.seconds = time.perf_counter() - started
+
+        failed = [r for r in result.failed if self.stages[r.name].required]
+        if failed and raise_on_failure:
+            raise PipelineError(self.name, failed)
+        return result
+
+    async def _run_stage(self, stage: Stage, dependencies: List[asyncio.Task], result: PipelineResult, ctx):
+        stage_result = result.stages[stage.name]
+        await asyncio.gather(*dependencies)
+
+        inputs = {}
+        for dependency in stage.depends_on:
+            upstream = result.stages[dependency]
+            if upstream.status != "ok":
+                stage_result.status = "skipped"
+                stage_result.error = f"{dependency} {upstream.status}"
+                await self._report(result, ctx)
+                return
+            inputs[dependency] = upstream.value
+
+        started = time.perf_counter()
+        delay = stage.retry_delay
+        while True:
+            stage_result.attempts += 1
+            try:
+                run = stage.run(inputs)
+                stage_result.value = await (asyncio.wait_for(run, stage.timeout) if stage.timeout else run)
+                stage_result.status = "ok"
+                stage_result.error = None
+                break
+            except Exception as e:
+                error = f"timed out after {stage.timeout}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+                stage_result.error = error
+                AGENT_ERRORS.inc(agent=self.name, stage=stage.name)
+                if stage_result.attempts > stage.retries:
+                    stage_result.status = "failed"
+                    logger.error(f"{self.name}.{stage.name} failed after {stage_result.attempts} attempt(s): {error}")
+                    break
+                logger.warning(f"{self.name}.{stage.name} attempt {stage_result.attempts} failed: {error}; retrying")
+                await asyncio.sleep(delay)
+                delay *= 2
+
+        stage_result.seconds = time.perf_counter() - started
+        AGENT_STAGE_SECONDS.observe(stage_result.seconds, agent=self.name, stage=stage.name)
+        await self._report(result, ctx)
+
+    async def _report(self, result: PipelineResult, ctx):
+        if ctx is not None:
+            await ctx.progress(stage=self.name, stages=result.timings())
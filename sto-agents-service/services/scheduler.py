@@ -0,0 +1,368 @@
+"""
+Scheduler - In-process cron/interval scheduling for STO agents
+
+Runs inside the FastAPI lifespan and turns schedules into jobs on the
+job queue, so scheduled and manually triggered syncs share the same
+workers, limits and retry handling.
+
+Each schedule supports:
+- cron ("*/15 * * * *") or a fixed interval in seconds
+- jitter (random delay added to every run)
+- misfire grace (a run that is too late is dropped, not run twice)
+- overlap policy when the previous run is still queued/running:
+    skip      - drop this run
+    coalesce  - queue at most one follow-up run
+    allow     - always queue a new run
+"""
+
+import os
+import json
+import random
+import logging
+import asyncio
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from services.job_queue import JobQueue, PRIORITY_NORMAL
+
+
+logger = logging.getLogger("sto.scheduler")
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+SCHEDULES_FILE = os.getenv("SCHEDULES_FILE", "data/schedules.json")
+
+# Longest time the loop sleeps between checks
+MAX_TICK_SECONDS = 30.0
+
+OVERLAP_POLICIES = ("skip", "coalesce", "allow")
+
+# Fields that can be changed through the API / overrides file
+EDITABLE_FIELDS = (
+    "cron",
+    "interval_seconds",
+    "jitter_seconds",
+    "misfire_grace_seconds",
+    "overlap",
+    "enabled",
+    "priority",
+)
+
+
+# ============================================
+# CRON EXPRESSIONS
+# ============================================
+
+
+class CronExpression:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month day-of-week
+
+    Supports *, lists (1,15), ranges (1-5) and steps (*/15, 8-18/2).
+    Day-of-week 0 and 7 are both Sunday. When both day fields are
+    restricted, a day matches if either one does (classic cron rule).
+    """
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: '{expression}'")
+
+        self.expression = expression
+        fields = [self._parse_field(part, lo, hi) for part, (lo, hi) in zip(parts, self.FIELD_RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = {d % 7 for d in weekdays}
+        self.day_restricted = parts[2] != "*"
+        self.weekday_restricted = parts[4] != "*"
+
+    @staticmethod
+    def _parse_field(field: str, lo: int, hi: int) -> Set[int]:
+        values: Set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+                if step < 1:
+                    raise ValueError(f"Invalid cron step: '{field}'")
+
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(part)
+                end = hi if step > 1 else start
+
+            if start < lo or end > hi or start > end:
+                raise ValueError(f"Cron value out of range ({lo}-{hi}): '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.isoweekday() % 7) in self.weekdays
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after the given time"""
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+
+        while dt < limit:
+            if dt.month not in self.months:
+                year = dt.year + (dt.month == 12)
+                month = dt.month % 12 + 1
+                dt = dt.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt
+
+        raise ValueError(f"Cron expression never matches: '{self.expression}'")
+
+
+# ============================================
+# SCHEDULES
+# ============================================
+
+
+@dataclass
+class Schedule:
+    """A recurring run of one agent"""
+
+    name: str
+    agent: str
+    cron: Optional[str] = None
+    interval_seconds: Optional[int] = None
+    jitter_seconds: int = 0
+    misfire_grace_seconds: int = 300
+    overlap: str = "skip"
+    enabled: bool = True
+    priority: int = PRIORITY_NORMAL
+    next_run: Optional[datetime] = None
+    last_run: Optional[datetime] = None
+    last_job_id: Optional[str] = None
+    last_outcome: Optional[str] = None
+
+    def validate(self):
+        if bool(self.cron) == bool(self.interval_seconds):
+            raise ValueError(f"Schedule '{self.name}' needs exactly one of cron or interval_seconds")
+        if self.cron:
+            CronExpression(self.cron)
+        if self.interval_seconds is not None and self.interval_seconds < 1:
+            raise ValueError(f"Schedule '{self.name}' interval must be positive")
+        if self.overlap not in OVERLAP_POLICIES:
+            raise ValueError(f"Schedule '{self.name}' overlap must be one of {OVERLAP_POLICIES}")
+
+    def compute_next(self, after: datetime) -> datetime:
+        if self.cron:
+            base = CronExpression(self.cron).next_after(after)
+        else:
+            base = after + timedelta(seconds=self.interval_seconds)
+        if self.jitter_seconds:
+            base += timedelta(seconds=random.uniform(0, self.jitter_seconds))
+        return base
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        for key in ("next_run", "last_run"):
+            data[key] = data[key].isoformat() if data[key] else None
+        return data
+
+
+# Default schedules (previously external cron jobs hitting /sync/*)
+DEFAULT_SCHEDULES = [
+    Schedule(name="supplypro", agent="supplypro", cron="*/15 * * * *", jitter_seconds=30),
+    Schedule(name="plan_intake", agent="plan_intake", cron="*/30 * * * *", jitter_seconds=30),
+    Schedule(name="completeness", agent="completeness", cron="0 3 * * *", misfire_grace_seconds=3600),
+    Schedule(name="job_tracker", agent="job_tracker", interval_seconds=3600, jitter_seconds=60),
+    Schedule(name="document_tracker", agent="document_tracker", interval_seconds=7200, jitter_seconds=60),
+    Schedule(name="plan_manager", agent="plan_manager", cron="0 4 * * *", misfire_grace_seconds=3600),
+]
+
+
+# ============================================
+# SCHEDULER
+# ============================================
+
+
+class Scheduler:
+    """Async loop that enqueues due schedules onto the job queue"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        schedules: Optional[List[Schedule]] = None,
+        overrides_file: Optional[str] = None,
+    ):
+        self.queue = queue
+        self.overrides_file = overrides_file or SCHEDULES_FILE
+        self.schedules: Dict[str, Schedule] = {}
+        for schedule in schedules if schedules is not None else DEFAULT_SCHEDULES:
+            self.schedules[schedule.name] = Schedule(**asdict(schedule))
+
+        self._load_overrides()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+        now = datetime.now()
+        for schedule in self.schedules.values():
+            schedule.validate()
+            schedule.next_run = schedule.compute_next(now)
+
+    # ---------- Persistence ----------
+
+    def _load_overrides(self):
+        """
+        Apply schedule changes saved through the API. An override that
+        doesn't validate is logged and skipped; that schedule keeps its
+        default, so one bad value can't stop the service from starting.
+        """
+        if not os.path.exists(self.overrides_file):
+            return
+        try:
+            with open(self.overrides_file, "r") as f:
+                overrides = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable {self.overrides_file}: {e}")
+            return
+
+        for name, fields in overrides.items():
+            schedule = self.schedules.get(name)
+            if not schedule:
+                continue
+            updated = Schedule(**asdict(schedule))
+            try:
+                for key, value in fields.items():
+                    if key in EDITABLE_FIELDS:
+                        setattr(updated, key, value)
+                updated.validate()
+                updated.compute_next(datetime.now())
+            except (TypeError, ValueError) as e:
+                logger.error(f"Ignoring saved override for schedule '{name}': {e}")
+                continue
+            self.schedules[name] = updated
+
+    def _save_overrides(self):
+        overrides = {
+            name: {key: getattr(schedule, key) for key in EDITABLE_FIELDS}
+            for name, schedule in self.schedules.items()
+        }
+        directory = os.path.dirname(self.overrides_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.overrides_file}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(overrides, f, indent=2)
+        os.replace(tmp_path, self.overrides_file)
+
+    # ---------- Lifecycle ----------
+
+    async def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            now = datetime.now()
+            for schedule in self.schedules.values():
+                if schedule.enabled and schedule.next_run and schedule.next_run <= now:
+                    try:
+                        await self._fire(schedule, now)
+                    except Exception as e:
+                        schedule.last_outcome = f"error: {e}"
+                        logger.error(f"{schedule.name} failed to enqueue: {e}")
+                    schedule.next_run = schedule.compute_next(now)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_next())
+            except asyncio.TimeoutError:
+                pass
+
+    def _seconds_until_next(self) -> float:
+        upcoming = [s.next_run for s in self.schedules.values() if s.enabled and s.next_run]
+        if not upcoming:
+            return MAX_TICK_SECONDS
+        delta = (min(upcoming) - datetime.now()).total_seconds()
+        return max(0.5, min(delta, MAX_TICK_SECONDS))
+
+    async def _fire(self, schedule: Schedule, now: datetime):
+        late = (now - schedule.next_run).total_seconds()
+        if late > schedule.misfire_grace_seconds:
+            schedule.last_outcome = f"misfired ({int(late)}s late)"
+            logger.warning(f"{schedule.name} {schedule.last_outcome}")
+            return
+
+        await self.enqueue(schedule, reason="schedule")
+
+    async def enqueue(self, schedule: Schedule, reason: str = "manual", force: bool = False) -> Optional[str]:
+        """Apply the overlap policy and queue a run. Returns the job id if queued."""
+        if not force and schedule.overlap == "skip":
+            if await asyncio.to_thread(self.queue.has_active, schedule.agent):
+                schedule.last_outcome = "skipped (previous run still active)"
+                return None
+
+        job_id, created = await asyncio.to_thread(
+            self.queue.enqueue,
+            schedule.agent,
+            None,
+            schedule.priority,
+            dedupe=schedule.overlap != "allow",
+        )
+        schedule.last_run = datetime.now()
+        schedule.last_job_id = job_id
+        schedule.last_outcome = f"queued ({reason})" if created else "coalesced into waiting run"
+        return job_id
+
+    # ---------- API helpers ----------
+
+    def list(self) -> List[Dict]:
+        return [schedule.to_dict() for schedule in self.schedules.values()]
+
+    def get(self, name: str) -> Optional[Schedule]:
+        return self.schedules.get(name)
+
+    def update(self, name: str, changes: Dict) -> Schedule:
+        """Change a schedule, validate it and persist the override"""
+        schedule = self.schedules[name]
+        updated = Schedule(**asdict(schedule))
+        for key, value in changes.items():
+            if key not in EDITABLE_FIELDS:
+                raise ValueError(f"Field '{key}' cannot be changed")
+            setattr(updated, key, value)
+
+        # Switching between cron and interval clears the other one
+        if changes.get("cron"):
+            updated.interval_seconds = None
+        elif changes.get("interval_seconds"):
+            updated.cron = None
+
+        updated.validate()
+        updated.next_run = updated.compute_next(datetime.now())
+        self.schedules[name] = updated
+        self._save_overrides()
+        self._wakeup.set()
+        return updated
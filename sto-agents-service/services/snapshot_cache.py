@@ -0,0 +1,236 @@
+"""
+Snapshot Cache - Shared, TTL-bound cache of MindFlow list endpoints
+
+CompletenessChecker, DocumentTracker and JobTracker each fetched the full
+job list, and /sync/all starts them within seconds of each other. The
+snapshot cache holds one copy of each list response (jobs, plans,
+communities) per process:
+
+- fresh for SNAPSHOT_TTL_SECONDS, then revalidated with If-None-Match /
+  If-Modified-Since (a 304 just renews the snapshot)
+- concurrent requests for the same list share a single in-flight fetch
+- data derived from a snapshot (parsed objects, secondary indexes by
+  community, customer, start date) is built once per snapshot
+
+Usage:
+    snapshot = await get_snapshot_cache().get(f"{api}/jobs", headers=headers)
+    by_community = snapshot.index("community", lambda job: job.get("communityId"))
+    starting = snapshot.range("start", start_key, now, cutoff)
+"""
+
+import os
+import time
+import asyncio
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from services.metrics import REGISTRY, instrumented_client
+
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+SNAPSHOT_TTL_SECONDS = float(os.getenv("SNAPSHOT_TTL_SECONDS", "60"))
+
+SNAPSHOT_REQUESTS = REGISTRY.counter(
+    "sto_snapshot_requests_total",
+    "Snapshot cache lookups by result (hit, coalesced, revalidated, miss)",
+    ["endpoint", "result"],
+)
+
+SnapshotKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class SnapshotError(Exception):
+    """The endpoint returned neither 200 nor 304"""
+
+
+# ============================================
+# SNAPSHOT
+# ============================================
+
+
+@dataclass
+class Snapshot:
+    """One list response plus everything derived from it"""
+
+    url: str
+    data: Any
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = field(default_factory=time.monotonic)
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    @property
+    def items(self) -> List[Any]:
+        """The list payload ({"jobs": [...]} style responses are unwrapped)"""
+        if isinstance(self.data, dict):
+            for value in self.data.values():
+                if isinstance(value, list):
+                    return value
+            return []
+        return self.data or []
+
+    def derive(self, name: str, build: Callable[[List[Any]], Any]) -> Any:
+        """Compute something from the items once per snapshot (e.g. parsed objects)"""
+        if name not in self._derived:
+            self._derived[name] = build(self.items)
+        return self._derived[name]
+
+    def index(
+        self,
+        name: str,
+        key: Callable[[Any], Optional[Hashable]],
+        source: Optional[str] = None,
+    ) -> Dict[Hashable, List[Any]]:
+        """
+        Secondary index {key: [items]} over the items, or over a list
+        previously built with derive(source, ...)
+        """
+        def build(_items):
+            groups: Dict[Hashable, List[Any]] = {}
+            for item in self._derived[source] if source else self.items:
+                value = key(item)
+                if value is not None:
+                    groups.setdefault(value, []).append(item)
+            return groups
+
+        return self.derive(f"index:{name}", build)
+
+    def range(
+        self,
+        name: str,
+        key: Callable[[Any], Any],
+        low: Any,
+        high: Any,
+        source: Optional[str] = None,
+    ) -> List[Any]:
+        """Items with low <= key(item) <= high, from a sorted index"""
+        def build(_items):
+            pairs = [(key(item), item) for item in (self._derived[source] if source else self.items)]
+            pairs = sorted((p for p in pairs if p[0] is not None), key=lambda p: p[0])
+            return [k for k, _ in pairs], [item for _, item in pairs]
+
+        keys, items = self.derive(f"range:{name}", build)
+        return items[bisect_left(keys, low):bisect_right(keys, high)]
+
+
+# ============================================
+# CACHE
+# ============================================
+
+
+class SnapshotCache:
+    """Process-wide cache of list endpoints with request coalescing"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, client_factory: Callable = instrumented_client):
+        self.ttl_seconds = SNAPSHOT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.client_factory = client_factory
+        self._snapshots: Dict[SnapshotKey, Snapshot] = {}
+        self._inflight: Dict[SnapshotKey, asyncio.Task] = {}
+
+    @staticmethod
+    def _key(url: str, params: Optional[Dict[str, Any]]) -> SnapshotKey:
+        return url, tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        max_age: Optional[float] = None,
+    ) -> Snapshot:
+        """Return a fresh snapshot, revalidating or fetching it if needed"""
+        key = self._key(url, params)
+        ttl = self.ttl_seconds if max_age is None else max_age
+        endpoint = url.rsplit("/", 1)[-1]
+
+        snapshot = self._snapshots.get(key)
+        if snapshot and snapshot.age < ttl:
+            SNAPSHOT_REQUESTS.inc(endpoint=endpoint, result="hit")
+            return snapshot
+
+        task = self._inflight.get(key)
+        if task:
+            SNAPSHOT_REQUESTS.inc(endpoint=endpoint, result="coalesced")
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._fetch(key, params, headers or {}, snapshot))
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self,
+        key: SnapshotKey,
+        params: Optional[Dict[str, Any]],
+        headers: Dict[str, str],
+        previous: Optional[Snapshot],
+    ) -> Snapshot:
+        url = key[0]
+        endpoint = url.rsplit("/", 1)[-1]
+        request_headers = dict(headers)
+        if previous:
+            if previous.etag:
+                request_headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                request_headers["If-Modified-Since"] = previous.last_modified
+
+        try:
+            async with self.client_factory(timeout=30.0) as client:
+                response = await client.get(url, params=params, headers=request_headers)
+        finally:
+            # Remove before waiters resume so the next lookup starts a new fetch
+            self._inflight.pop(key, None)
+
+        if response.status_code == 304 and previous:
+            SNAPSHOT_REQUESTS.inc(endpoint=endpoint, result="revalidated")
+            previous.fetched_at = time.monotonic()
+            return previous
+
+        if response.status_code != 200:
+            raise SnapshotError(f"GET {url} returned {response.status_code}")
+
+        SNAPSHOT_REQUESTS.inc(endpoint=endpoint, result="miss")
+        snapshot = Snapshot(
+            url=url,
+            data=response.json(),
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+        self._snapshots[key] = snapshot
+        return snapshot
+
+    def invalidate(self, url_prefix: Optional[str] = None):
+        """Drop snapshots (all, or those whose URL starts with the prefix) after a write"""
+        for key in list(self._snapshots):
+            if url_prefix is None or key[0].startswith(url_prefix):
+                del self._snapshots[key]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "url": key[0],
+                "params": dict(key[1]),
+                "items": len(snapshot.items),
+                "age_seconds": round(snapshot.age, 1),
+                "etag": snapshot.etag,
+            }
+            for key, snapshot in self._snapshots.items()
+        ]
+
+
+_default_cache: Optional[SnapshotCache] = None
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    """Shared cache for the process"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SnapshotCache()
+    return _default_cache
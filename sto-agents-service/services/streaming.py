@@ -0,0 +1,69 @@
+"""
+Streaming - Encode agent results as NDJSON or chunked JSON
+
+Agents expose large results as async generators of records. These
+helpers turn a generator into bytes chunks for a StreamingResponse, so
+each record is sent as soon as it is produced and the full payload is
+never held in memory.
+
+Formats:
+    ndjson  - one JSON object per line (application/x-ndjson)
+    json    - one JSON document, {"items": [...], "count": N}, written
+              item by item (application/json)
+
+Records are envelopes: {"kind": "job" | "order" | ... | "summary", "data": {...}}.
+An error after the response has started is reported in-band (a final
+{"kind": "error"} line, or an "error" field in the JSON document).
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+
+
+logger = logging.getLogger("sto.streaming")
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+async def ndjson_stream(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """One line per record"""
+    try:
+        async for record in records:
+            yield (_dumps(record) + "\n").encode()
+    except Exception as e:
+        logger.error(f"Stream failed: {e}")
+        yield (_dumps({"kind": "error", "data": {"error": str(e)}}) + "\n").encode()
+
+
+async def json_stream(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """A single JSON document, {"items": [...], "count": N}, written incrementally"""
+    count = 0
+    error = None
+    yield b'{"items": ['
+    try:
+        async for record in records:
+            yield ((", " if count else "") + _dumps(record)).encode()
+            count += 1
+    except Exception as e:
+        logger.error(f"Stream failed: {e}")
+        error = str(e)
+
+    tail = {"count": count}
+    if error:
+        tail["error"] = error
+    yield ("], " + _dumps(tail)[1:]).encode()
+
+
+def encode_stream(records: AsyncIterator[Dict[str, Any]], fmt: str) -> AsyncIterator[bytes]:
+    """Bytes chunks for the given format (see STREAM_FORMATS)"""
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Unknown stream format '{fmt}' (use {', '.join(STREAM_FORMATS)})")
+    return ndjson_stream(records) if fmt == "ndjson" else json_stream(records)
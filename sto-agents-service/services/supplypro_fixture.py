@@ -0,0 +1,158 @@
+"""
+SupplyPro Fixture - Local HTML stand-in for the SupplyPro portal
+
+Serves a login form, a dashboard, an EPO report with a CSV export and a
+paged new-documents table (no export), behind a session cookie. Used to
+exercise SupplyProScraper without portal credentials.
+
+Usage:
+    python -m services.supplypro_fixture          # scrape twice, check results
+    python -m services.supplypro_fixture --serve  # just run the server
+"""
+
+import sys
+import asyncio
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE_USERNAME = "fixture"
+FIXTURE_PASSWORD = "fixture"
+SESSION_COOKIE = "ASP.NET_SessionId=fixture-session"
+
+EPO_ROWS = [
+    ["Account", "Community", "Job", "Task", "Supplier Order", "Submitted", "Task Status", "EPO Status", "Amount"],
+    ["Sekisui House U.S., Inc.", "Luden Estates Phase 3", "36190093 - 13008 NE 111th St - 93/", "Missing hold downs",
+     "1332200-2004640-000", "11/17/2025", "Complete", "Approved", "$118.27"],
+    ["Sekisui House U.S., Inc.", "Luden Estates Phase 3", "36190095 - 11124 NE 131st Ave - 95/", "Stolen house wrap",
+     "1332200-2009548-000", "11/25/2025", "Skipped", "Pending Approval", "$1,579.81"],
+    ["Sekisui House U.S., Inc.", "Cascadia Ridge", "37120004 - 100 SE Main St - 4/", "Extra blocking",
+     "1332200-2011000-000", "11/26/2025", "Complete", "Approved", "$75.00"],
+]
+
+DOCUMENT_ROWS = [
+    ["Builder", "Folder", "Community", "Document", "Size", "Revision", "Date Added", "Uploaded By", "Viewed"],
+] + [
+    ["Sekisui House", "33750115 - 928 NW 178TH WAY - 115/", "North Haven Phase 4", f"FLOOR TRUSS CALCS NH {lot}.pdf",
+     "1.2 MB", "1", "11/28/2025", "Alyssa Munden", "No"]
+    for lot in range(115, 130)
+]
+
+DOCUMENTS_PER_PAGE = 10
+
+LOGIN_PAGE = """<html><body><form method="post" action="/Login.aspx">
+<input name="UserName"><input name="Password" type="password"><button type="submit">Sign In</button>
+</form></body></html>"""
+
+DASHBOARD_PAGE = """<html><body><h1>Dashboard</h1><ul>
+<li>New Orders <b>4,913</b></li><li>To Do <b>808</b></li><li>Change Orders <b>170</b></li>
+<li>Cancellations <b>1</b></li><li>Pending Back Charges <b>2</b></li><li>Completed Back Charges <b>34</b></li>
+</ul></body></html>"""
+
+
+def _table(rows) -> str:
+    head = "".join(f"<th>{c}</th>" for c in rows[0])
+    body = "".join("<tr>" + "".join(f"<td>{c}</td>" for c in row) + "</tr>" for row in rows[1:])
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    logins = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: str = "", content_type: str = "text/html", headers: dict = None):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authenticated(self) -> bool:
+        return SESSION_COOKIE in (self.headers.get("Cookie") or "")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode())
+        if form.get("UserName") == [FIXTURE_USERNAME] and form.get("Password") == [FIXTURE_PASSWORD]:
+            type(self).logins += 1
+            self._send(302, headers={"Set-Cookie": f"{SESSION_COOKIE}; Path=/", "Location": "/Dashboard.aspx"})
+        else:
+            self._send(200, LOGIN_PAGE)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if not self._authenticated():
+            self._send(200, LOGIN_PAGE)
+        elif url.path == "/Dashboard.aspx":
+            self._send(200, DASHBOARD_PAGE)
+        elif url.path == "/Reports/EPOReport.aspx":
+            self._send(200, (
+                '<html><body><form method="get"><input name="DateFrom"><input name="DateTo">'
+                '<button type="submit">Run</button></form>'
+                f'<a href="/Reports/EPOReport.csv">Export to Excel</a>{_table(EPO_ROWS)}</body></html>'
+            ))
+        elif url.path == "/Reports/EPOReport.csv":
+            body = "\n".join(",".join(f'"{c}"' for c in row) for row in EPO_ROWS)
+            self._send(200, body, "text/csv", {"Content-Disposition": 'attachment; filename="EPOReport.csv"'})
+        elif url.path == "/Documents/NewDocuments.aspx":
+            page = int(query.get("page", ["1"])[0])
+            start = 1 + (page - 1) * DOCUMENTS_PER_PAGE
+            rows = [DOCUMENT_ROWS[0]] + DOCUMENT_ROWS[start:start + DOCUMENTS_PER_PAGE]
+            pager = f'<a href="?page={page + 1}">Next</a>' if start + DOCUMENTS_PER_PAGE < len(DOCUMENT_ROWS) else ""
+            self._send(200, f"<html><body>{_table(rows)}{pager}</body></html>")
+        else:
+            self._send(404, "not found")
+
+
+def start_fixture_server(port: int = 0) -> ThreadingHTTPServer:
+    """Start the fixture portal in a background thread; base URL is http://127.0.0.1:<server_port>/"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def check_scraper() -> bool:
+    from services.supplypro_scraper import SupplyProScraper
+
+    server = start_fixture_server()
+    base_url = f"http://127.0.0.1:{server.server_port}/"
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = SupplyProScraper(base_url, FIXTURE_USERNAME, FIXTURE_PASSWORD, state_path=str(Path(tmp) / "state.json"))
+        for run, expect_login in ((1, True), (2, False)):
+            result = await scraper.scrape()
+            checks = {
+                "login": result.logged_in == expect_login,
+                "dashboard": result.dashboard.get("new_orders") == 4913,
+                "epos": len(result.epos) == len(EPO_ROWS) - 1 and result.sources.get("epo_report") == "export",
+                "documents": len(result.documents) == len(DOCUMENT_ROWS) - 1 and result.sources.get("new_documents") == "table",
+                "errors": not result.errors,
+            }
+            ok = ok and all(checks.values())
+            timings = ", ".join(f"{k} {v * 1000:.0f}ms" for k, v in result.timings.items())
+            print(f"run {run}: {'ok' if all(checks.values()) else 'FAILED'} {checks} ({timings})")
+    print(f"fixture logins: {FixtureHandler.logins}")
+    server.shutdown()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SupplyPro fixture portal")
+    parser.add_argument("--serve", action="store_true", help="Only run the server")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    if args.serve:
+        server = start_fixture_server(args.port)
+        print(f"SupplyPro fixture on http://127.0.0.1:{args.port}/ (user/password: {FIXTURE_USERNAME})")
+        threading.Event().wait()
+    sys.exit(0 if asyncio.run(check_scraper()) else 1)
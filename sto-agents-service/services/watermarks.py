@@ -0,0 +1,220 @@
+"""
+Watermarks - Per-record fingerprints for incremental (delta) syncs
+
+Agents push the same orders, documents, plans and alerts on every run.
+The watermark store remembers a content hash of every record that was
+successfully sent, so the next run only sends records that are new or
+changed. A full reconcile (send everything) happens periodically to
+repair any drift on the MindFlow side.
+
+Usage:
+    delta = store.filter_changed("supplypro.orders", orders, key=lambda o: o["external_id"])
+    if delta.records:
+        await post(...delta.records...)
+    store.commit(delta)          # only after the push succeeded
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from contextlib import closing
+from dataclasses import asdict, dataclass, field, is_dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# ============================================
+# CONFIGURATION
+# ============================================
+
+DEFAULT_DB_PATH = os.getenv("WATERMARKS_DB", "data/watermarks.db")
+
+# Send every record (not just changes) at least this often
+FULL_RECONCILE_HOURS = float(os.getenv("FULL_RECONCILE_HOURS", "24"))
+
+# Forget records that have not been seen for this long
+PRUNE_AFTER_DAYS = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS watermarks (
+    agent       TEXT NOT NULL,
+    record_key  TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    first_seen  REAL NOT NULL,
+    last_seen   REAL NOT NULL,
+    last_sent   REAL,
+    PRIMARY KEY (agent, record_key)
+);
+CREATE TABLE IF NOT EXISTS reconciles (
+    agent     TEXT PRIMARY KEY,
+    last_full REAL NOT NULL
+);
+"""
+
+
+def fingerprint(record: Any) -> str:
+    """Stable content hash of a JSON-serializable record (or dataclass)"""
+    if is_dataclass(record) and not isinstance(record, type):
+        record = asdict(record)
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# ============================================
+# DATA CLASSES
+# ============================================
+
+
+@dataclass
+class Delta:
+    """Records that need sending, plus what to record once they are sent"""
+
+    agent: str
+    records: List[Any] = field(default_factory=list)
+    total: int = 0
+    full: bool = False
+    # (record_key, fingerprint) for every record seen this run
+    seen: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def skipped(self) -> int:
+        return self.total - len(self.records)
+
+    def summary(self) -> Dict:
+        return {
+            "total": self.total,
+            "sent": len(self.records),
+            "unchanged": self.skipped,
+            "full_reconcile": self.full,
+        }
+
+
+# ============================================
+# WATERMARK STORE
+# ============================================
+
+
+class WatermarkStore:
+    """SQLite-backed record fingerprints, namespaced by agent"""
+
+    def __init__(self, db_path: Optional[str] = None, full_reconcile_hours: Optional[float] = None):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        self.full_reconcile_seconds = (
+            full_reconcile_hours if full_reconcile_hours is not None else FULL_RECONCILE_HOURS
+        ) * 3600
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    def needs_full_reconcile(self, agent: str) -> bool:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT last_full FROM reconciles WHERE agent = ?", (agent,)
+            ).fetchone()
+        return row is None or time.time() - row[0] >= self.full_reconcile_seconds
+
+    def filter_changed(
+        self,
+        agent: str,
+        records: Iterable[Any],
+        key: Callable[[Any], str],
+        force_full: bool = False,
+    ) -> Delta:
+        """Return the records whose fingerprint differs from the last sent one"""
+        records = list(records)
+        full = force_full or self.needs_full_reconcile(agent)
+        delta = Delta(agent=agent, total=len(records), full=full)
+
+        with closing(self._connect()) as conn:
+            known = dict(
+                conn.execute(
+                    "SELECT record_key, fingerprint FROM watermarks WHERE agent = ? AND last_sent IS NOT NULL",
+                    (agent,),
+                )
+            )
+
+        for record in records:
+            record_key = str(key(record))
+            digest = fingerprint(record)
+            delta.seen.append((record_key, digest))
+            if full or known.get(record_key) != digest:
+                delta.records.append(record)
+
+        return delta
+
+    def commit(self, delta: Delta):
+        """Record a delta as sent. Call only after the push succeeded."""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                """
+                INSERT INTO watermarks (agent, record_key, fingerprint, first_seen, last_seen, last_sent)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(agent, record_key) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    last_sent = CASE
+                        WHEN watermarks.fingerprint != excluded.fingerprint OR ? THEN excluded.last_sent
+                        ELSE watermarks.last_sent
+                    END,
+                    fingerprint = excluded.fingerprint
+                """,
+                [(delta.agent, k, fp, now, now, now, int(delta.full)) for k, fp in delta.seen],
+            )
+            if delta.full:
+                conn.execute(
+                    """
+                    INSERT INTO reconciles (agent, last_full) VALUES (?, ?)
+                    ON CONFLICT(agent) DO UPDATE SET last_full = excluded.last_full
+                    """,
+                    (delta.agent, now),
+                )
+                conn.execute(
+                    "DELETE FROM watermarks WHERE agent = ? AND last_seen < ?",
+                    (delta.agent, now - PRUNE_AFTER_DAYS * 86400),
+                )
+
+    def reset(self, agent: Optional[str] = None):
+        """Forget fingerprints so the next run sends everything"""
+        with closing(self._connect()) as conn, conn:
+            if agent:
+                conn.execute("DELETE FROM watermarks WHERE agent = ?", (agent,))
+                conn.execute("DELETE FROM reconciles WHERE agent = ?", (agent,))
+            else:
+                conn.execute("DELETE FROM watermarks")
+                conn.execute("DELETE FROM reconciles")
+
+    def stats(self) -> Dict[str, Dict]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                """
+                SELECT w.agent, COUNT(*), MAX(w.last_sent), r.last_full
+                FROM watermarks w LEFT JOIN reconciles r ON r.agent = w.agent
+                GROUP BY w.agent
+                """
+            ).fetchall()
+        return {
+            agent: {"records": count, "last_sent": last_sent, "last_full_reconcile": last_full}
+            for agent, count, last_sent, last_full in rows
+        }
+
+
+_default_store: Optional[WatermarkStore] = None
+
+
+def get_watermark_store() -> WatermarkStore:
+    """Shared store for the process"""
+    global _default_store
+    if _default_store is None:
+        _default_store = WatermarkStore()
+    return _default_store
@@ -0,0 +1,79 @@
+"""Alerts are not reconciled against mock data or failed fetches"""
+
+import asyncio
+
+import pytest
+
+import agents.base
+from agents.document_tracker import DocumentTracker
+from agents.job_tracker import JobTracker
+
+LIVE_JOB = {"id": "job-1", "jobNumber": "2026-001", "status": "IN_PROGRESS", "startDate": "2026-10-20T00:00:00"}
+
+
+class RecordingAlertStore:
+    def __init__(self):
+        self.calls = []
+
+    def reconcile(self, source, raised, resolve=True):
+        self.calls.append((source, len(raised), resolve))
+        return type("Reconciled", (), {"transitions": [], "suppressed": 0})()
+
+    def commit(self, reconciled, sent):
+        pass
+
+
+@pytest.fixture
+def alert_store(monkeypatch):
+    store = RecordingAlertStore()
+    monkeypatch.setattr(agents.base, "get_alert_store", lambda: store)
+    return store
+
+
+def _returns(value):
+    async def fetch(*args, **kwargs):
+        return value
+    return fetch
+
+
+async def _unreachable(*args, **kwargs):
+    raise ConnectionError("MindFlow unreachable")
+
+
+def test_job_tracker_skips_alerts_for_mock_jobs(alert_store):
+    tracker = JobTracker()
+    tracker.fetch_jobs = _returns((tracker._get_mock_jobs(), False))
+    results = asyncio.run(tracker.run())
+    assert results["jobs_checked"] > 0
+    assert results["errors"]
+    assert alert_store.calls == []
+
+
+def test_document_tracker_skips_alerts_for_mock_jobs(alert_store):
+    tracker = DocumentTracker()
+    tracker.fetch_active_jobs = _returns((tracker._get_mock_jobs(), False))
+    tracker.get_job_documents = _unreachable
+    results = asyncio.run(tracker.run())
+    assert results["jobs_checked"] == 3
+    assert alert_store.calls == []
+
+
+def test_document_tracker_does_not_resolve_when_documents_fail(alert_store):
+    tracker = DocumentTracker()
+    tracker.fetch_active_jobs = _returns(([LIVE_JOB], True))
+    tracker.get_job_documents = _unreachable
+    results = asyncio.run(tracker.run())
+    assert results["errors"]
+    # Nothing raised from mock documents, and nothing resolved
+    assert alert_store.calls == [("document_tracker", 0, False)]
+
+
+def test_document_tracker_reconciles_live_data(alert_store):
+    tracker = DocumentTracker()
+    tracker.fetch_active_jobs = _returns(([LIVE_JOB], True))
+    tracker.get_job_documents = _returns([])
+    results = asyncio.run(tracker.run())
+    assert results["errors"] == []
+    assert results["incomplete_jobs"] == 1
+    source, raised, resolve = alert_store.calls[0]
+    assert (source, resolve) == ("document_tracker", True) and raised > 0
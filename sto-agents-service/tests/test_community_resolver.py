@@ -0,0 +1,73 @@
+"""Community name and lot prefix lookups (services.community_resolver)"""
+
+from pathlib import Path
+
+import pytest
+
+from agents.supplypro_reporter import LOT_PREFIX_TO_COMMUNITY, SUPPLYPRO_CONFIG
+from services.community_resolver import CommunityResolver, _legacy_is_monitored
+
+MONITORED = SUPPLYPRO_CONFIG["monitored_communities"]
+
+# Names the old substring check accepted
+OLD_ALIASES = [
+    "North Haven",
+    "north haven",
+    "North Havens",
+    "NORTH HAVEN - PHASE 4",
+    "North Haven Phase 4 Lot 115",
+    "Haven",
+    "Luden Estates Phase 3",
+    "Luden Estates",
+    "Reserve at Battle Creek",
+    "The Reserve at Battle Creek HOA",
+    "Verona Heights",
+    "Verona",
+]
+
+
+@pytest.fixture
+def resolver():
+    return CommunityResolver(MONITORED, LOT_PREFIX_TO_COMMUNITY)
+
+
+@pytest.mark.parametrize("name", OLD_ALIASES)
+def test_old_aliases_are_still_monitored(resolver, name):
+    assert _legacy_is_monitored(name, MONITORED)
+    assert resolver.is_monitored(name)
+
+
+@pytest.mark.parametrize("name", ["Cascadia Ridge", "Kemper Grove", "Scholls Heights", ""])
+def test_other_communities_are_not_monitored(resolver, name):
+    assert not _legacy_is_monitored(name, MONITORED)
+    assert not resolver.is_monitored(name)
+
+
+def test_most_specific_community_wins(resolver):
+    assert resolver.resolve("North Havens") == "North Haven"
+    assert resolver.resolve("NORTH HAVEN - PHASE 4") == "North Haven Phase 4"
+    assert resolver.resolve("Luden Estates Ph 3 Lot 12") == "Luden Estates Phase 3"
+    assert resolver.resolve("Luden Estates") == "Luden Estates Phase 3"
+
+
+def test_lot_prefixes(resolver):
+    assert resolver.community_for_lot("33750115") == "North Haven Phase 4"
+    assert resolver.community_for_lot("36199004") == "Luden Estates Phase 3"
+    assert resolver.community_for_lot("99999001") == "Unknown"
+    assert resolver.community_for("", "34040012") == "Verona Heights"
+
+
+def test_docstring_example():
+    resolver = CommunityResolver(["North Haven", "Luden Estates Phase 3"], {"34040": "Verona Heights"})
+    assert resolver.resolve("NORTH HAVEN - PHASE 4") == "North Haven"
+    assert resolver.resolve("Luden Estates Ph 3 Lot 12") == "Luden Estates Phase 3"
+    assert resolver.is_monitored("north havens")
+    assert resolver.community_for_lot("34040012") == "Verona Heights"
+
+
+def test_complete_project_copy_is_identical():
+    here = Path(__file__).resolve().parents[1] / "services" / "community_resolver.py"
+    copy = Path(__file__).resolve().parents[2] / "sto-agents-complete" / "services" / "community_resolver.py"
+    if not copy.exists():
+        pytest.skip("sto-agents-complete not checked out next to the service")
+    assert copy.read_bytes().replace(b"\r\n", b"\n") == here.read_bytes().replace(b"\r\n", b"\n")
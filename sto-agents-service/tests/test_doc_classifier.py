@@ -0,0 +1,57 @@
+"""Document type classification (services.doc_classifier and the agents' label tables)"""
+
+from agents.completeness_checker import REQUIRED_DOCUMENTS
+from agents.plan_intake import INTAKE_CLASSIFIER
+from agents.supplypro_reporter import DOCUMENT_TYPE_CLASSIFIER
+from services.doc_classifier import DOC_CLASSIFIER, DocumentClassifier
+from services.document_index import DocumentIndex
+
+
+def test_structural_calcs_are_structural_and_calc_pkg():
+    for name in ("Structural Calcs.pdf", "Lot 12 Structural Calculations.pdf", "STRUCTURAL CALC PKG.pdf"):
+        assert DOC_CLASSIFIER.classify_all(name) == {"CALC_PKG", "STRUCTURAL"}, name
+        assert DOC_CLASSIFIER.classify(name) == "CALC_PKG"
+
+
+def test_holt_lot_with_structural_calcs_is_complete():
+    index = DocumentIndex()
+    index.add_job("lot-12", {}, [{"filename": "Lot 12 Plans.pdf"}, {"filename": "Structural Calcs.pdf"}])
+    assert index.missing("lot-12", REQUIRED_DOCUMENTS["holt_homes"]["required"]) == []
+
+
+def test_truss_phrases_shadow_the_keywords_inside_them():
+    assert DOC_CLASSIFIER.classify_all("FLOOR TRUSS CALCS NH 127.pdf") == {"FLOOR_TRUSS_CALCS", "TRUSS_CALCS"}
+    assert DOC_CLASSIFIER.classify_all("ROOF_TRUSS_LAYOUT.pdf") == {"ROOF_TRUSS_LAYOUT", "TRUSS_LAYOUT"}
+    assert DOC_CLASSIFIER.classify_all("Floor Truss Layout.pdf") == {"FLOOR_TRUSS_LAYOUT", "TRUSS_LAYOUT"}
+
+
+def test_overlapping_keywords_report_both_types():
+    assert DOC_CLASSIFIER.classify_all("Plot Plans.pdf") == {"PLOT_PLAN", "PLANS"}
+    assert DOC_CLASSIFIER.classify_all("Site Plan Set.pdf") == {"PLOT_PLAN", "PLANS"}
+    assert DOC_CLASSIFIER.classify_all("Plot Plan Lot 4.pdf") == {"PLOT_PLAN"}
+
+    # A keyword inside another can't be joined to it; the name is rescanned
+    classifier = DocumentClassifier([("OUTER", ["abcdef"]), ("INNER", ["bcde"])])
+    assert classifier.classify_all("x_abcdef_x") == {"OUTER", "INNER"}
+    assert classifier.classify("x_abcdef_x") == "OUTER"
+
+
+def test_unknown_names_have_no_type():
+    assert DOC_CLASSIFIER.classify("Invoice 12.pdf") is None
+    assert DOC_CLASSIFIER.classify_all("Invoice 12.pdf") == frozenset()
+
+
+def test_supplypro_labels_are_unchanged():
+    assert DOCUMENT_TYPE_CLASSIFIER.classify("ROOF TRUSS CALCS.pdf") == "TRUSS_CALCS"
+    assert DOCUMENT_TYPE_CLASSIFIER.classify("FLOOR TRUSS LAYOUT.pdf") == "FLOOR_TRUSS"
+    assert DOCUMENT_TYPE_CLASSIFIER.classify("ROOF TRUSS LAYOUT.pdf") == "ROOF_TRUSS"
+    assert DOCUMENT_TYPE_CLASSIFIER.classify("CALC PKG NH 127.pdf") == "CALC_PKG"
+    assert DOCUMENT_TYPE_CLASSIFIER.classify("Calc.pdf") is None
+
+
+def test_plan_intake_labels_are_unchanged():
+    assert INTAKE_CLASSIFIER.classify("Roof Truss.pdf") == "TRUSS_CALCS"
+    assert INTAKE_CLASSIFIER.classify("Floor Truss Calcs.pdf") == "CALC_PKG"
+    assert INTAKE_CLASSIFIER.classify("Floor System.pdf") == "FLOOR_TRUSS"
+    assert INTAKE_CLASSIFIER.classify("I-Joist Layout.pdf") == "IJOIST"
+    assert INTAKE_CLASSIFIER.classify("Structural Framing.pdf") == "STRUCTURAL"
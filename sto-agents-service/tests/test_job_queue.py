@@ -0,0 +1,35 @@
+"""Claiming jobs from the SQLite queue (services.job_queue)"""
+
+from services.job_queue import PRIORITY_HIGH, PRIORITY_LOW, JobQueue
+
+
+def _queue(tmp_path, **limits):
+    return JobQueue(str(tmp_path / "jobs.db"), agent_limits=limits)
+
+
+def test_claim_skips_past_agents_at_their_limit(tmp_path):
+    queue = _queue(tmp_path, supplypro=1)
+    for n in range(60):
+        queue.enqueue("supplypro", {"n": n}, priority=PRIORITY_HIGH)
+    queue.enqueue("plan_intake", priority=PRIORITY_LOW)
+
+    assert queue.claim("w1").agent == "supplypro"
+    # The remaining 59 supplypro jobs are ahead of plan_intake but blocked
+    assert queue.claim("w2").agent == "plan_intake"
+    assert queue.claim("w3") is None
+
+
+def test_claim_skips_past_agents_the_worker_does_not_run(tmp_path):
+    queue = _queue(tmp_path, supplypro=100)
+    for n in range(60):
+        queue.enqueue("supplypro", {"n": n}, priority=PRIORITY_HIGH)
+    queue.enqueue("plan_intake", priority=PRIORITY_LOW)
+
+    assert queue.claim("w1", agents=["plan_intake"]).agent == "plan_intake"
+    assert queue.claim("w1", agents=[]) is None
+
+
+def test_agent_with_zero_limit_is_never_claimed(tmp_path):
+    queue = _queue(tmp_path, supplypro=0)
+    queue.enqueue("supplypro")
+    assert queue.claim("w1") is None
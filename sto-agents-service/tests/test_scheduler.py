@@ -0,0 +1,36 @@
+"""Loading saved schedule overrides (services.scheduler)"""
+
+import json
+
+from services.job_queue import JobQueue
+from services.scheduler import DEFAULT_SCHEDULES, Scheduler
+
+DEFAULTS = {schedule.name: schedule for schedule in DEFAULT_SCHEDULES}
+
+
+def _scheduler(tmp_path, overrides):
+    path = tmp_path / "schedules.json"
+    path.write_text(json.dumps(overrides))
+    return Scheduler(JobQueue(str(tmp_path / "jobs.db")), overrides_file=str(path))
+
+
+def test_valid_overrides_are_applied(tmp_path):
+    scheduler = _scheduler(tmp_path, {"supplypro": {"cron": "*/5 * * * *", "enabled": False}})
+    assert scheduler.schedules["supplypro"].cron == "*/5 * * * *"
+    assert scheduler.schedules["supplypro"].enabled is False
+
+
+def test_invalid_overrides_keep_the_default(tmp_path):
+    scheduler = _scheduler(tmp_path, {
+        "supplypro": {"cron": "every 5 minutes"},
+        "job_tracker": {"interval_seconds": 0},
+        "document_tracker": {"interval_seconds": "7200"},
+        "completeness": {"cron": "0 0 31 2 *"},
+        "plan_manager": {"overlap": "queue"},
+        "plan_intake": {"cron": "0 6 * * *"},
+    })
+    for name in ("supplypro", "job_tracker", "document_tracker", "completeness", "plan_manager"):
+        assert scheduler.schedules[name].cron == DEFAULTS[name].cron
+        assert scheduler.schedules[name].interval_seconds == DEFAULTS[name].interval_seconds
+        assert scheduler.schedules[name].overlap == DEFAULTS[name].overlap
+    assert scheduler.schedules["plan_intake"].cron == "0 6 * * *"
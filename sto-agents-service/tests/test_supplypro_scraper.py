@@ -0,0 +1,46 @@
+"""SupplyPro scraper shared between the service and sto-agents-complete"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from services.supplypro_scraper import ScraperUnavailable, SupplyProScraper
+
+
+def test_complete_project_copy_is_identical():
+    here = Path(__file__).resolve().parents[1] / "services" / "supplypro_scraper.py"
+    copy = Path(__file__).resolve().parents[2] / "sto-agents-complete" / "services" / "supplypro_scraper.py"
+    if not copy.exists():
+        pytest.skip("sto-agents-complete not checked out next to the service")
+    assert copy.read_bytes().replace(b"\r\n", b"\n") == here.read_bytes().replace(b"\r\n", b"\n")
+
+
+def test_missing_playwright_is_reported_as_unavailable():
+    try:
+        import playwright  # noqa: F401
+        pytest.skip("playwright is installed")
+    except ImportError:
+        pass
+    scraper = SupplyProScraper("https://example.invalid/", "user", "pass")
+    with pytest.raises(ScraperUnavailable):
+        asyncio.run(scraper.scrape())
+
+
+def test_stream_records_serve_the_given_report_without_scraping(monkeypatch):
+    from agents.supplypro_reporter import SupplyProReporter, get_mock_report
+
+    reporter = SupplyProReporter()
+
+    async def fail():
+        raise AssertionError("streams must not scrape")
+
+    monkeypatch.setattr(reporter, "_fetch_report", fail)
+    report = get_mock_report()
+
+    async def collect():
+        return [record async for record in reporter.stream_records(report)]
+
+    records = asyncio.run(collect())
+    assert records[-1]["kind"] == "summary"
+    assert records[-1]["data"]["epos_total"] == len(report.epos)